@@ -1,19 +1,92 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 from graph.builder import build_graph
+from tools.es_search import (
+    close_es_clients,
+    aclose_es_clients,
+    get_translation_cache_stats,
+    get_embedding_cache_stats,
+)
+from tools.async_http import aclose_async_http_clients
+from tools.local_translator import get_local_translation_stats
+from tools.name_index import warm_restaurant_name_index
+from tools.vector_index import warm_local_vector_index
+from tools.admission import AdmissionController, AdmissionRejected, RequestWork, TrackingExecutor
+from contextlib import asynccontextmanager, nullcontext
 from uuid import uuid4
 import json
+import os
+import time
 import asyncio
 
+
+# 동시 실행 제한 (admission control)
+# - QUERY_MAX_CONCURRENCY: 동시에 실행할 그래프 수 (기본값 8)
+# - QUERY_MAX_QUEUE: 실행 슬롯을 기다릴 수 있는 요청 수, 넘으면 바로 429 (기본값 32)
+# - QUERY_QUEUE_TIMEOUT: 슬롯 대기 제한 시간(초), 넘으면 503 (기본값 5)
+# - QUERY_PER_SESSION_LIMIT: 세션 하나가 동시에 실행할 수 있는 그래프 수, 0이면 제한 없음 (기본값 1)
+# - QUERY_FAIR_QUEUE: 세션별 대기열을 번갈아 처리 (기본값 true)
+# - QUERY_TIMEOUT: /query 요청 하나의 그래프 실행 제한 시간(초), 넘으면 504 (기본값 120)
+#   응답 시간만 제한한다. 취소해도 스레드에서 돌던 동기 노드는 끝까지 실행되므로 슬롯은 그 뒤에 반납한다.
+# - QUERY_RETRY_AFTER: 429/503 응답의 최소 Retry-After 값(초) (기본값 2)
+# - GRAPH_EXECUTOR_WORKERS: 동기 노드/툴을 실행하는 기본 스레드 풀 크기 (기본값 32)
+QUERY_TIMEOUT = float(os.getenv("QUERY_TIMEOUT", "120"))
+GRAPH_EXECUTOR_WORKERS = int(os.getenv("GRAPH_EXECUTOR_WORKERS", "32"))
+
+admission = AdmissionController(
+    max_in_flight=int(os.getenv("QUERY_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("QUERY_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("QUERY_QUEUE_TIMEOUT", "5")),
+    retry_after=int(os.getenv("QUERY_RETRY_AFTER", "2")),
+    per_session_limit=int(os.getenv("QUERY_PER_SESSION_LIMIT", "1")),
+    fair=os.getenv("QUERY_FAIR_QUEUE", "true").strip().lower() in ("1", "true", "yes", "y", "on"),
+)
+
+
+async def acquire_query_slot(session_id: str) -> float:
+    """
+    그래프 실행 슬롯을 하나 얻는다. (대기 시간(초) 반환)
+    거절되면 429/503 + Retry-After 헤더로 바로 응답한다.
+    """
+    try:
+        return await admission.acquire(session_id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 그래프의 동기 노드/툴은 ainvoke/astream에서 이벤트 루프의 기본 executor로 실행된다
+    # (요청별로 제출한 작업을 기록해서, 시간 초과 후에도 돌고 있는 노드가 끝날 때까지 슬롯을 잡아 둔다)
+    asyncio.get_running_loop().set_default_executor(
+        TrackingExecutor(max_workers=GRAPH_EXECUTOR_WORKERS, thread_name_prefix="graph")
+    )
+    # 식당 이름 인덱스는 시작할 때 백그라운드에서 만든다 (첫 menu_price_tool 호출이 ES scan을 기다리지 않도록)
+    asyncio.get_running_loop().run_in_executor(None, warm_restaurant_name_index)
+    # DENSE_BACKEND=local이면 로컬 벡터 인덱스도 미리 로드 (첫 검색이 npz 로드/ES scan을 기다리지 않도록)
+    asyncio.get_running_loop().run_in_executor(None, warm_local_vector_index)
+    yield
+    # 앱 종료 시 공유 ES / HTTP 커넥션 풀 정리
+    close_es_clients()
+    await aclose_es_clients()
+    await aclose_async_http_clients()
+
+
 app = FastAPI(
     title="맛집 추천 API",
     description="사용자 쿼리를 받아 맛집을 추천하는 AI 에이전트 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 설정
@@ -32,6 +105,9 @@ graph = build_graph()
 class QueryRequest(BaseModel):
     user_query: str
     session_id: str | None = None  # 세션 ID 추가 (선택적)
+    # /query/stream 전용: 최종 답변 토큰 스트리밍 여부, supervisor 초안 미리 스트리밍 여부 (None이면 STREAM_OPTIMISTIC_DRAFT)
+    stream_tokens: bool = True
+    optimistic_draft: bool | None = None
 
     class Config:
         json_schema_extra = {
@@ -54,6 +130,7 @@ async def get_recommendation(request: QueryRequest):
 
     - session_id를 받으면 해당 세션의 대화 기록이 유지됩니다.
     - session_id가 없으면 새로운 세션을 생성합니다.
+    - 동시 실행 수를 넘으면 429/503, 실행 시간이 QUERY_TIMEOUT을 넘으면 504를 반환합니다.
     """
     # session_id가 없으면 새로 생성
     session_id = request.session_id or f"session-{uuid4()}"
@@ -66,13 +143,85 @@ async def get_recommendation(request: QueryRequest):
     # thread_id로 세션 구분 (MemorySaver가 이 ID로 상태를 저장/불러옴)
     config = {"configurable": {"thread_id": session_id}}
 
-    # 그래프 실행
-    final_state = graph.invoke(state, config=config)
+    # 그래프 실행 (이벤트 루프를 막지 않도록 ainvoke, 동기 노드는 기본 executor에서 실행)
+    await acquire_query_slot(session_id)
+    started = time.monotonic()
+    work = RequestWork()
+    try:
+        with work.track():
+            final_state = await asyncio.wait_for(graph.ainvoke(state, config=config), timeout=QUERY_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"답변 생성 시간이 {QUERY_TIMEOUT:g}초를 초과했습니다.")
+    finally:
+        # 시간 초과로 그래프를 취소해도 스레드에서 돌던 동기 노드는 끝까지 실행되므로, 그때까지 슬롯을 반납하지 않는다
+        admission.release_after(work, session_id, started)
     answer = final_state.get("final_answer", "답변을 생성하지 못했습니다.")
 
     return QueryResponse(answer=answer, session_id=session_id)
 
 
+# 노드별 한글 이름 매핑
+NODE_NAMES_KR = {
+    "coordinator": "코디네이터",
+    "planner": "계획 수립",
+    "search_agent": "검색 에이전트",
+    "places_agent": "장소 정보 수집",
+    "supervisor": "최종 답변 생성",
+    "budget_agent": "예산 분석",
+    "merge_results": "결과 병합",
+}
+
+# supervisor 초안을 evaluator 평가 전에 미리 스트리밍할지 (요청의 optimistic_draft로 덮어쓸 수 있음)
+STREAM_OPTIMISTIC_DRAFT = os.getenv("STREAM_OPTIMISTIC_DRAFT", "false").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def _token_event(message, metadata: dict, stream_tokens: bool, optimistic_draft: bool) -> dict | None:
+    """
+    messages 스트림의 LLM 토큰을 SSE 이벤트로 변환한다.
+    - final_output 노드 토큰 → "token" (최종 답변)
+    - supervisor 노드 토큰 → "draft_token" (optimistic_draft일 때만, evaluator가 폐기할 수 있음)
+    나머지 노드(coordinator/planner의 JSON, sub agent의 툴 호출 등)의 토큰은 보내지 않는다.
+    """
+    content = getattr(message, "content", None)
+    if not content or not isinstance(content, str):
+        return None
+    node = metadata.get("langgraph_node")
+    if node == "final_output" and stream_tokens:
+        return {"type": "token", "node": node, "content": content}
+    if node == "supervisor" and optimistic_draft:
+        return {"type": "draft_token", "node": node, "content": content}
+    return None
+
+
+async def _with_deadline(stream, timeout: float, work: RequestWork | None = None):
+    """
+    async iterator를 timeout(초) 안에 끝나도록 감싼다. 넘으면 stream을 닫고 asyncio.TimeoutError
+    work를 주면 stream이 기본 executor에 넘긴 작업을 work에 기록한다.
+    """
+    deadline = time.monotonic() + timeout
+    iterator = stream.__aiter__()
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            try:
+                # wait_for가 만드는 task는 지금 context를 복사하므로 track() 안에서 만들어야 작업이 기록된다
+                with work.track() if work is not None else nullcontext():
+                    item = await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
 @app.post("/query/stream")
 async def get_recommendation_stream(request: QueryRequest):
     """
@@ -81,10 +230,31 @@ async def get_recommendation_stream(request: QueryRequest):
     - session_id를 받으면 해당 세션의 대화 기록이 유지됩니다.
     - session_id가 없으면 새로운 세션을 생성합니다.
     - Server-Sent Events (SSE) 형식으로 응답합니다.
+    - 이벤트 종류: session_id, node_start, node_update, node_complete, done, error
+      + token (최종 답변 토큰, stream_tokens=true)
+      + draft_token / draft_accepted / draft_discarded (supervisor 초안 미리보기, optimistic_draft=true)
     """
     # session_id가 없으면 새로 생성
     session_id = request.session_id or f"session-{uuid4()}"
 
+    # 스트리밍 시작 전에 슬롯을 얻고 (거절 시 429/503), 스트림이 끝나거나 끊기면 반납
+    await acquire_query_slot(session_id)
+    started = time.monotonic()
+    work = RequestWork()
+    released = False
+
+    def release_slot():
+        # event_generator의 finally와 BackgroundTask 중 먼저 실행되는 쪽에서 한 번만 반납
+        # (클라이언트가 끊으면 Starlette는 BackgroundTask를 실행하지 않는다)
+        # 스레드에서 돌던 동기 노드가 남아 있으면 끝난 뒤에 반납 (/query와 같음)
+        nonlocal released
+        if not released:
+            released = True
+            admission.release_after(work, session_id, started)
+
+    stream_tokens = request.stream_tokens
+    optimistic_draft = STREAM_OPTIMISTIC_DRAFT if request.optimistic_draft is None else request.optimistic_draft
+
     async def event_generator():
         try:
             # 첫 번째로 session_id 전송
@@ -99,32 +269,37 @@ async def get_recommendation_stream(request: QueryRequest):
             config = {"configurable": {"thread_id": session_id}}
 
             # 스트리밍 실행
-            async for event in graph.astream(state, config=config):
+            # - updates: 노드가 끝날 때마다 {"node_name": {...}}
+            # - messages: 노드 안의 LLM 호출 토큰 (message_chunk, metadata)
+            # 전체 실행 시간은 /query와 같이 QUERY_TIMEOUT으로 제한한다
+            async for mode, chunk in _with_deadline(
+                graph.astream(state, config=config, stream_mode=["updates", "messages"]),
+                QUERY_TIMEOUT,
+                work,
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    token_event = _token_event(message, metadata, stream_tokens, optimistic_draft)
+                    if token_event is not None:
+                        yield _sse(token_event)
+                    continue
+
                 # event는 {"node_name": {...}} 형식
-                for node_name, node_state in event.items():
+                for node_name, node_state in chunk.items():
+                    node_state = node_state or {}
                     # 노드 시작 알림
                     node_start_event = {
                         "type": "node_start",
                         "node": node_name,
                         "message": f"🔄 {node_name} 실행 중..."
                     }
-                    yield f"data: {json.dumps(node_start_event, ensure_ascii=False)}\n\n"
-
-                    # 노드별 한글 이름 매핑
-                    node_names_kr = {
-                        "coordinator": "코디네이터",
-                        "planner": "계획 수립",
-                        "search_agent": "검색 에이전트",
-                        "places_agent": "장소 정보 수집",
-                        "supervisor": "최종 답변 생성",
-                        "budget_agent": "예산 분석",
-                    }
+                    yield _sse(node_start_event)
 
                     # 각 노드의 상태를 스트리밍
                     event_data = {
                         "type": "node_update",
                         "node": node_name,
-                        "node_kr": node_names_kr.get(node_name, node_name),
+                        "node_kr": NODE_NAMES_KR.get(node_name, node_name),
                         "data": {}
                     }
 
@@ -155,6 +330,20 @@ async def get_recommendation_stream(request: QueryRequest):
                         event_data["data"]["tool_trace"] = trace
                         has_data = True
 
+                    # sub agent 결과 (병렬 실행되는 agent별로 따로 도착)
+                    sections = node_state.get("tool_sections")
+                    if sections and "tool_trace" not in event_data["data"]:
+                        trace = "\n\n".join(sections.values())
+                        if len(trace) > 1000:
+                            trace = trace[:1000] + "... (생략)"
+                        event_data["data"]["tool_trace"] = trace
+                        has_data = True
+
+                    # planner가 정한 sub agent 실행 계획
+                    if node_state.get("agent_plan"):
+                        event_data["data"]["agent_plan"] = node_state["agent_plan"]
+                        has_data = True
+
                     # answer가 있으면 전송
                     if "answer" in node_state and node_state["answer"]:
                         event_data["data"]["answer"] = node_state["answer"]
@@ -162,15 +351,22 @@ async def get_recommendation_stream(request: QueryRequest):
 
                     # 데이터가 있으면 전송
                     if has_data:
-                        yield f"data: {json.dumps(event_data, ensure_ascii=False)}\n\n"
+                        yield _sse(event_data)
+
+                    # 미리 보낸 초안을 평가 결과에 따라 확정/폐기
+                    if optimistic_draft and node_name == "evaluator":
+                        if node_state.get("needs_revision"):
+                            yield _sse({"type": "draft_discarded", "feedback": node_state.get("eval_feedback", "")})
+                        else:
+                            yield _sse({"type": "draft_accepted"})
 
                     # 노드 완료 알림
                     node_complete_event = {
                         "type": "node_complete",
                         "node": node_name,
-                        "message": f"✅ {node_names_kr.get(node_name, node_name)} 완료"
+                        "message": f"✅ {NODE_NAMES_KR.get(node_name, node_name)} 완료"
                     }
-                    yield f"data: {json.dumps(node_complete_event, ensure_ascii=False)}\n\n"
+                    yield _sse(node_complete_event)
 
                 # 약간의 딜레이 (클라이언트가 이벤트를 처리할 수 있도록)
                 await asyncio.sleep(0.01)
@@ -178,6 +374,12 @@ async def get_recommendation_stream(request: QueryRequest):
             # 완료 이벤트 전송
             yield f"data: {json.dumps({'type': 'done', 'session_id': session_id})}\n\n"
 
+        except asyncio.TimeoutError:
+            yield _sse({
+                "type": "error",
+                "error": f"답변 생성 시간이 {QUERY_TIMEOUT:g}초를 초과했습니다.",
+                "status_code": 504,
+            })
         except Exception as e:
             # 에러 발생 시 에러 이벤트 전송
             error_data = {
@@ -185,6 +387,8 @@ async def get_recommendation_stream(request: QueryRequest):
                 "error": str(e)
             }
             yield f"data: {json.dumps(error_data)}\n\n"
+        finally:
+            release_slot()
 
     return StreamingResponse(
         event_generator(),
@@ -193,10 +397,37 @@ async def get_recommendation_stream(request: QueryRequest):
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no"  # Nginx 버퍼링 비활성화
-        }
+        },
+        background=BackgroundTask(release_slot),
     )
 
 
+@app.get("/stats")
+async def stats():
+    """
+    admission control 상태 (실행/대기 수, 거절 수, 대기 시간 분포), 캐시 통계,
+    로컬 번역 커버리지 (LLM 번역을 건너뛴 비율), checkpoint 크기
+    """
+    return {
+        "admission": admission.stats(),
+        "translation_cache": get_translation_cache_stats(),
+        "local_translation": get_local_translation_stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "checkpoints": graph.checkpointer.stats(),
+    }
+
+
+@app.get("/stats/sessions/{session_id}")
+async def session_stats(session_id: str):
+    """
+    세션 하나의 checkpoint 크기 (최근 상태 / 채널별 / 마지막 저장 바이트)
+    """
+    stats = graph.checkpointer.stats(session_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다.")
+    return stats
+
+
 @app.get("/")
 async def root():
     """
@@ -2,10 +2,10 @@ import os
 import csv
 import random
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
-from elasticsearch import Elasticsearch, helpers
+from elasticsearch import Elasticsearch
 
 # =====================
 # 환경 변수 & ES 클라이언트 설정
@@ -737,13 +737,26 @@ SAMPLE_MENUS_BY_CUISINE = {
 }
 
 
+import argparse
 import random
 import csv
+import json
 import re
-from elasticsearch import Elasticsearch, helpers
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from elasticsearch import Elasticsearch
+
+# tools 모듈 import (프로젝트 루트 기준)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.menu_columnar import columns_dir_for, csv_to_menu_columns
 
 
 OUTPUT_CSV = "data/restaurants_menus.csv"
+# 런타임(MenuStore)이 메모리 매핑으로 여는 컬럼형 바이너리는 기본적으로 data/restaurants_menus.columns/
 
 
 def parse_cuisines(value):
@@ -765,104 +778,354 @@ def parse_cuisines(value):
     return []
 
 
-def fetch_restaurants(es: Elasticsearch):
+SOURCE_FIELDS = ["restaurant_id", "restaurant_name", "cuisines"]
+
+
+def to_restaurant(doc: Dict) -> Dict:
     """
-    restaurants 인덱스에서 모든 레스토랑의
-    restaurant_id, restaurant_name, cuisines 만 가져오기
+    ES 문서 하나를 {restaurant_id, restaurant_name, cuisines_parsed}로 변환
     """
-    query = {"query": {"match_all": {}}}
+    src = doc["_source"]
 
-    for doc in helpers.scan(
-        es,
-        index=RESTAURANT_INDEX,
-        query=query,
-        _source=["restaurant_id", "restaurant_name", "cuisines"],
-    ):
-        src = doc["_source"]
+    restaurant_id = src.get("restaurant_id") or src.get("id") or doc["_id"]
+    restaurant_name = src.get("restaurant_name") or src.get("name")
 
-        restaurant_id = src.get("restaurant_id") or src.get("id") or doc["_id"]
-        restaurant_name = src.get("restaurant_name") or src.get("name")
+    cuisines_raw = src.get("cuisines")
+    cuisines_parsed = parse_cuisines(cuisines_raw)
 
-        cuisines_raw = src.get("cuisines")
-        cuisines_parsed = parse_cuisines(cuisines_raw)
+    return {
+        "restaurant_id": restaurant_id,
+        "restaurant_name": restaurant_name,
+        "cuisines_parsed": cuisines_parsed,
+    }
 
-        yield {
-            "restaurant_id": restaurant_id,
-            "restaurant_name": restaurant_name,
-            "cuisines_parsed": cuisines_parsed,
-        }
 
-
-def generate_price():
+def generate_price(rng=random):
     """7,000 ~ 35,000원 사이 500원 단위 랜덤 가격"""
-    return random.randrange(7000, 35001, 500)
+    return rng.randrange(7000, 35001, 500)
 
 
-def generate_is_recommended(p=0.8):
+def generate_is_recommended(p=0.8, rng=random):
     """80% 확률로 1, 20% 확률로 0"""
-    return 1 if random.random() < p else 0
+    return 1 if rng.random() < p else 0
 
 
-def main():
-    es = Elasticsearch(ES_HOST)
+def restaurant_rng(seed, restaurant_id):
+    """
+    레스토랑별 RNG. seed가 같으면 어떤 slice/순서로 처리해도 같은 가격이 나온다.
+    seed가 None이면 전역 random 사용 (기존 동작)
+    """
+    if seed is None:
+        return random
+    return random.Random(f"{seed}:{restaurant_id}")
 
-    # 1) 레스토랑 전체 가져오기
-    restaurants = list(fetch_restaurants(es))
-    print(f"총 레스토랑 수: {len(restaurants)}")
 
-    rows = []
+def generate_menu_rows(restaurant: Dict, seed=None):
+    """
+    레스토랑 하나의 메뉴 row들을 만든다. (cuisine별 샘플 메뉴 3개씩)
+    """
+    restaurant_id = restaurant["restaurant_id"]
+    restaurant_name = restaurant["restaurant_name"]
+    cuisines_parsed = restaurant["cuisines_parsed"]  # 예: ["Korean", "BBQ"]
+    rng = restaurant_rng(seed, restaurant_id)
 
-    for r in restaurants:
-        restaurant_id = r["restaurant_id"]
-        restaurant_name = r["restaurant_name"]
-        cuisines_parsed = r["cuisines_parsed"]  # 예: ["Korean", "BBQ"]
+    for cuisine in cuisines_parsed:
+        cuisine = cuisine.strip()
+        if not cuisine:
+            continue
 
-        if not cuisines_parsed:
+        # dict에서 해당 cuisine의 샘플 메뉴 3개 가져오기
+        menus = SAMPLE_MENUS_BY_CUISINE.get(cuisine)
+        if not menus:
+            # ES에 있는 cuisine 문자열이 dict 키랑 안 맞으면 스킵됨
             continue
 
-        for cuisine in cuisines_parsed:
-            cuisine = cuisine.strip()
-            if not cuisine:
-                continue
-
-            # dict에서 해당 cuisine의 샘플 메뉴 3개 가져오기
-            menus = SAMPLE_MENUS_BY_CUISINE.get(cuisine)
-            if not menus:
-                # ES에 있는 cuisine 문자열이 dict 키랑 안 맞으면 스킵됨
-                continue
-
-            for menu_name, menu_category in menus:
-                row = {
-                    "restaurant_id": restaurant_id,
-                    "restaurant_name": restaurant_name,
-                    # 여기 menu_type 에는 ES의 cuisine 값 그대로
-                    "menu_type": cuisine,
-                    "menu_name": menu_name,
-                    # main / side / dessert / drink 등
-                    "menu_category": menu_category,
-                    "price": generate_price(),
-                    "is_recommended": generate_is_recommended(p=0.8),
+        for menu_name, menu_category in menus:
+            yield {
+                "restaurant_id": restaurant_id,
+                "restaurant_name": restaurant_name,
+                # 여기 menu_type 에는 ES의 cuisine 값 그대로
+                "menu_type": cuisine,
+                "menu_name": menu_name,
+                # main / side / dessert / drink 등
+                "menu_category": menu_category,
+                "price": generate_price(rng=rng),
+                "is_recommended": generate_is_recommended(p=0.8, rng=rng),
+            }
+
+
+FIELDNAMES = [
+    "restaurant_id",
+    "restaurant_name",
+    "menu_type",      # = cuisine
+    "menu_name",
+    "menu_category",  # main / side / dessert / drink ...
+    "price",
+    "is_recommended",
+]
+
+
+class Progress:
+    """
+    진행 상황 출력 (레스토랑 수, 메뉴 row 수, 처리 속도)
+    """
+
+    def __init__(self, every: int = 10000):
+        self.every = every
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.restaurants = 0
+        self.with_menus = 0
+        self.rows = 0
+
+    def update(self, n_rows: int) -> None:
+        with self._lock:
+            self.restaurants += 1
+            self.rows += n_rows
+            if n_rows:
+                self.with_menus += 1
+            if self.every and self.restaurants % self.every == 0:
+                self.report()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = time.perf_counter() - self.start
+        rate = self.restaurants / elapsed if elapsed > 0 else 0.0
+        label = "완료" if final else "진행 중"
+        print(
+            f"[{label}] 레스토랑 {self.restaurants}개 (메뉴 있음 {self.with_menus}개), "
+            f"메뉴 row {self.rows}개, {elapsed:.1f}s ({rate:.0f} 레스토랑/s)"
+        )
+
+
+# =====================
+# 병렬 export (point-in-time + slice + search_after, slice별 체크포인트)
+# =====================
+
+class SliceExporter:
+    """
+    PIT(point-in-time)를 slice로 나눠 여러 스레드가 동시에 읽고, slice마다 별도 파일에 쓴다.
+    (slices=1이면 slice 없이 PIT 하나를 순서대로 읽는다)
+
+    - <output>.parts/slice-0000.csv : 해당 slice의 메뉴 row (헤더 없음)
+    - <output>.parts/slice-0000.json : 체크포인트
+        {docs_done, rows, offset(CSV 바이트 위치), search_after, done}
+    - <output>.parts/run.json : 사용 중인 PIT id (keep_alive 안에 다시 실행하면 같은 PIT를 이어서 사용)
+    - 페이지를 하나 쓸 때마다 CSV를 flush하고 체크포인트를 갱신한다.
+      중단 후 다시 실행하면 CSV를 offset까지 잘라내고 search_after부터 이어서 읽는다.
+    - 정렬은 restaurant_id(고유 keyword) 기준이라 search_after 값은 새 PIT에서도 유효하다.
+      다만 slice 분할은 PIT에 묶여 있으므로, slices>1에서 PIT가 만료됐으면 끝나지 않은 slice는 처음부터 다시 읽는다.
+    - 가격/추천 여부는 레스토랑별 seed RNG로 만들어서 slice 분할과 무관하게 같은 결과가 나온다.
+    """
+
+    def __init__(self, es: Elasticsearch, output_csv: str, slices: int, seed, page_size: int = 1000,
+                 keep_alive: str = "5m", progress: Optional[Progress] = None):
+        self.es = es
+        self.output_path = Path(output_csv)
+        self.parts_dir = self.output_path.with_name(self.output_path.name + ".parts")
+        self.slices = slices
+        self.seed = seed
+        self.page_size = page_size
+        self.keep_alive = keep_alive
+        self.progress = progress or Progress(every=0)
+        self.run_config = {"index": RESTAURANT_INDEX, "slices": slices, "seed": seed, "sort": "restaurant_id"}
+        self._run_lock = threading.Lock()
+
+    def _part_path(self, slice_id: int) -> Path:
+        return self.parts_dir / f"slice-{slice_id:04d}.csv"
+
+    def _checkpoint_path(self, slice_id: int) -> Path:
+        return self.parts_dir / f"slice-{slice_id:04d}.json"
+
+    def _run_state_path(self) -> Path:
+        return self.parts_dir / "run.json"
+
+    def _save_run_state(self, pit_id: str) -> None:
+        path = self._run_state_path()
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"config": self.run_config, "pit_id": pit_id}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _reuse_pit(self) -> Optional[str]:
+        """
+        이전 실행의 PIT가 아직 살아 있으면 그 id (없거나 만료됐으면 None)
+        """
+        path = self._run_state_path()
+        if not path.exists():
+            return None
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("config") != self.run_config or not state.get("pit_id"):
+            return None
+        try:
+            res = self.es.search(body={"size": 0, "pit": {"id": state["pit_id"], "keep_alive": self.keep_alive}})
+        except Exception as e:
+            print(f"이전 PIT를 사용할 수 없어 새로 엽니다: {str(e)[:200]}")
+            return None
+        return res.get("pit_id", state["pit_id"])
+
+    def _open_pit(self) -> str:
+        pit_id = self._reuse_pit()
+        if pit_id is not None:
+            print("이전 실행의 PIT를 이어서 사용합니다.")
+        else:
+            pit_id = self.es.open_point_in_time(index=RESTAURANT_INDEX, keep_alive=self.keep_alive)["id"]
+            if self.slices > 1:
+                # slice 분할은 PIT마다 달라질 수 있으므로 끝나지 않은 slice는 처음부터 다시 읽는다
+                for slice_id in range(self.slices):
+                    checkpoint = self._load_checkpoint(slice_id)
+                    if checkpoint["docs_done"] and not checkpoint["done"]:
+                        print(f"[slice {slice_id}] 새 PIT에서는 이어서 읽을 수 없어 처음부터 다시 시작합니다.")
+                        self._checkpoint_path(slice_id).unlink(missing_ok=True)
+        self._save_run_state(pit_id)
+        return pit_id
+
+    def _load_checkpoint(self, slice_id: int) -> Dict:
+        path = self._checkpoint_path(slice_id)
+        if path.exists():
+            checkpoint = json.loads(path.read_text(encoding="utf-8"))
+            if checkpoint.get("config") == self.run_config:
+                return checkpoint
+            print(f"[slice {slice_id}] 설정이 달라 체크포인트를 무시하고 처음부터 시작합니다.")
+        return {"config": self.run_config, "docs_done": 0, "rows": 0, "offset": 0,
+                "search_after": None, "done": False}
+
+    def _save_checkpoint(self, slice_id: int, checkpoint: Dict) -> None:
+        path = self._checkpoint_path(slice_id)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(checkpoint, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _export_slice(self, pit_id: str, slice_id: int) -> Dict:
+        checkpoint = self._load_checkpoint(slice_id)
+        if checkpoint["done"]:
+            print(f"[slice {slice_id}] 이미 완료됨 (레스토랑 {checkpoint['docs_done']}개) → 건너뜀")
+            return checkpoint
+        if checkpoint["docs_done"]:
+            print(f"[slice {slice_id}] 체크포인트에서 재개: 레스토랑 {checkpoint['docs_done']}개 이후부터")
+
+        part_path = self._part_path(slice_id)
+        mode = "r+" if part_path.exists() else "w"
+        with open(part_path, mode, newline="", encoding="utf-8") as f:
+            # 마지막 체크포인트 이후에 쓰인 (중복될) 내용은 버린다
+            f.seek(checkpoint["offset"])
+            f.truncate()
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+
+            while True:
+                body = {
+                    "size": self.page_size,
+                    "query": {"match_all": {}},
+                    "_source": SOURCE_FIELDS,
+                    "pit": {"id": pit_id, "keep_alive": self.keep_alive},
+                    "sort": [{"restaurant_id": "asc"}],
                 }
-                rows.append(row)
-
-    # 2) CSV로 저장
-    fieldnames = [
-        "restaurant_id",
-        "restaurant_name",
-        "menu_type",      # = cuisine
-        "menu_name",
-        "menu_category",  # main / side / dessert / drink ...
-        "price",
-        "is_recommended",
-    ]
-
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
-    print(f"총 생성된 메뉴 row 수: {len(rows)}")
-    print(f"CSV 저장 완료: {OUTPUT_CSV}")
+                if self.slices > 1:
+                    body["slice"] = {"id": slice_id, "max": self.slices}
+                if checkpoint["search_after"] is not None:
+                    body["search_after"] = checkpoint["search_after"]
+
+                res = self.es.search(body=body)
+                if res.get("pit_id", pit_id) != pit_id:
+                    pit_id = res["pit_id"]
+                    with self._run_lock:
+                        self._save_run_state(pit_id)
+                hits = res.get("hits", {}).get("hits", [])
+                if not hits:
+                    break
+
+                for doc in hits:
+                    n_rows = 0
+                    for row in generate_menu_rows(to_restaurant(doc), seed=self.seed):
+                        writer.writerow(row)
+                        n_rows += 1
+                    checkpoint["rows"] += n_rows
+                    self.progress.update(n_rows)
+
+                f.flush()
+                checkpoint["docs_done"] += len(hits)
+                checkpoint["offset"] = f.tell()
+                checkpoint["search_after"] = hits[-1]["sort"]
+                self._save_checkpoint(slice_id, checkpoint)
+
+        checkpoint["done"] = True
+        self._save_checkpoint(slice_id, checkpoint)
+        print(f"[slice {slice_id}] 완료: 레스토랑 {checkpoint['docs_done']}개, 메뉴 row {checkpoint['rows']}개")
+        return checkpoint
+
+    def run(self, workers: Optional[int] = None, fresh: bool = False) -> List[Dict]:
+        if fresh and self.parts_dir.exists():
+            shutil.rmtree(self.parts_dir)
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+
+        pit_id = self._open_pit()
+        with ThreadPoolExecutor(max_workers=workers or self.slices) as executor:
+            futures = [executor.submit(self._export_slice, pit_id, i) for i in range(self.slices)]
+            # 하나라도 실패하면 예외를 올린다. PIT는 닫지 않고 남겨 두어 keep_alive 안에 다시 실행하면 이어서 사용
+            # (완료된 slice는 체크포인트가 남아 다음 실행에서 건너뜀)
+            results = [future.result() for future in futures]
+
+        try:
+            self.es.close_point_in_time(id=pit_id)
+        except Exception as e:
+            print(f"PIT 종료 실패 (무시): {e}")
+        self._run_state_path().unlink(missing_ok=True)
+        return results
+
+    def merge(self, keep_parts: bool = False) -> None:
+        """
+        slice 파일들을 slice 번호 순서대로 이어 붙여 최종 CSV를 만든다. (결과가 항상 같은 순서)
+        """
+        tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8-sig") as out:
+            csv.DictWriter(out, fieldnames=FIELDNAMES).writeheader()
+            for slice_id in range(self.slices):
+                with open(self._part_path(slice_id), "r", newline="", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp_path, self.output_path)
+        if not keep_parts:
+            shutil.rmtree(self.parts_dir)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ES 레스토랑 데이터로 메뉴 CSV 생성")
+    parser.add_argument("--output", type=str, default=OUTPUT_CSV, help="출력 CSV 경로")
+    parser.add_argument("--columns-dir", type=str, default=None,
+                        help="컬럼형 바이너리 출력 경로 (기본값: <CSV 이름>.columns)")
+    parser.add_argument("--no-columns", action="store_true", help="컬럼형 바이너리를 만들지 않음")
+    parser.add_argument("--page-size", type=int, default=1000, help="한 번에 가져올 문서 수")
+    parser.add_argument("--keep-alive", "--scroll", dest="keep_alive", type=str, default="5m",
+                        help="PIT keep-alive (예: 5m, 이 시간 안에 다시 실행하면 같은 PIT로 재개, --scroll은 예전 이름)")
+    parser.add_argument("--progress-every", type=int, default=10000,
+                        help="레스토랑 N개마다 진행 상황 출력 (0이면 끔)")
+    parser.add_argument("--slices", type=int, default=1,
+                        help="병렬 export slice 수 (2 이상이면 PIT + slice로 병렬 처리, 1이어도 중단 시 재개 가능)")
+    parser.add_argument("--workers", type=int, default=None, help="병렬 export 스레드 수 (기본값: slice 수)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="가격/추천 여부 RNG seed (레스토랑별로 고정, 병렬 export 기본값 42)")
+    parser.add_argument("--fresh", action="store_true", help="이전 체크포인트를 지우고 처음부터 실행")
+    parser.add_argument("--keep-parts", action="store_true", help="병합 후 slice 파일을 지우지 않음")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    es = Elasticsearch(ES_HOST, api_key=ES_API_KEY) if ES_API_KEY else Elasticsearch(ES_HOST)
+
+    progress = Progress(every=args.progress_every)
+    # 1) PIT를 slice로 나눠 export (slice 1개면 순서대로) → slice 번호 순서로 병합
+    #    중단되면 같은 명령으로 다시 실행해서 체크포인트부터 이어서 진행
+    seed = 42 if args.seed is None and args.slices > 1 else args.seed
+    exporter = SliceExporter(es, args.output, max(1, args.slices), seed, page_size=args.page_size,
+                             keep_alive=args.keep_alive, progress=progress)
+    exporter.run(workers=args.workers, fresh=args.fresh)
+    exporter.merge(keep_parts=args.keep_parts)
+    progress.report(final=True)
+    print(f"CSV 저장 완료: {args.output}")
+
+    # 2) 컬럼형 바이너리로도 저장 (price/is_recommended는 정수 컬럼)
+    if not args.no_columns:
+        columns_dir = args.columns_dir or str(columns_dir_for(args.output))
+        csv_to_menu_columns(args.output, columns_dir)
+        print(f"컬럼형 데이터 저장 완료: {columns_dir}")
 
 
 if __name__ == "__main__":
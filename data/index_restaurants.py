@@ -0,0 +1,291 @@
+import os
+import csv
+import itertools
+import json
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+# tools 모듈 import (프로젝트 루트 기준)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.es_search import get_embeddings_batch, get_es_client
+from tools.vector_index import LocalVectorIndex
+
+# =====================
+# 레스토랑 문서 색인 (CSV/JSONL → bge-m3 임베딩 → ES bulk)
+# =====================
+#
+# 사용 예:
+#   python data/index_restaurants.py data/restaurants.jsonl --index restaurant_docs
+#   python data/index_restaurants.py data/restaurants_mock.csv --dry-run --local-index data/cache/vectors.npz
+
+load_dotenv()
+
+# text_content가 없을 때 임베딩/검색용 텍스트를 만들 필드 (있는 것만 사용)
+TEXT_FIELDS = [
+    "restaurant_name", "name", "cuisines", "category", "city", "area",
+    "locality", "locality_verbose", "address", "keywords", "review_snippet",
+]
+
+
+def read_records(path: str | Path) -> Iterator[Dict]:
+    """
+    CSV 또는 JSONL 파일에서 레스토랑 레코드를 하나씩 읽는다.
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        with path.open("r", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+def to_document(record: Dict, position: int) -> Dict:
+    """
+    레코드를 ES 문서 형식으로 맞춘다.
+    - restaurant_id / restaurant_name 필드 보장 (mock CSV의 name 등도 허용)
+    - text_content가 없으면 주요 필드를 이어 붙여 만든다
+    """
+    doc = {k: v for k, v in record.items() if v not in (None, "")}
+    doc["restaurant_id"] = str(doc.get("restaurant_id") or doc.get("id") or position)
+    if "restaurant_name" not in doc and "name" in doc:
+        doc["restaurant_name"] = doc["name"]
+    if not doc.get("text_content"):
+        doc["text_content"] = " ".join(str(doc[f]) for f in TEXT_FIELDS if doc.get(f))
+    return doc
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embedded_documents(records: Iterable[Dict], embed_batch: int, embed_concurrency: int,
+                       embed: bool = True, stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    레코드를 임베딩하고 embedding 필드를 붙여서 내보낸다.
+    (embed_batch개씩 요청 embed_concurrency개를 동시에 보낼 수 있도록 그만큼 모아서 get_embeddings_batch 호출)
+    문서 텍스트는 다시 조회할 일이 없으므로 쿼리 임베딩 캐시에 넣지 않는다.
+    """
+    stats = stats if stats is not None else {}
+    position = 0
+    for batch in batched(records, embed_batch * max(1, embed_concurrency)):
+        docs = []
+        for record in batch:
+            docs.append(to_document(record, position))
+            position += 1
+        if embed:
+            start = time.perf_counter()
+            vectors = get_embeddings_batch(
+                [doc["text_content"] for doc in docs],
+                batch_size=embed_batch,
+                max_concurrency=embed_concurrency,
+                use_cache=False,
+            )
+            stats["embed_seconds"] = stats.get("embed_seconds", 0.0) + time.perf_counter() - start
+            for doc, vector in zip(docs, vectors):
+                doc["embedding"] = vector.tolist()
+        stats["docs"] = stats.get("docs", 0) + len(docs)
+        yield from docs
+
+
+def index_mapping(dims: int) -> Dict:
+    return {
+        "properties": {
+            "restaurant_id": {"type": "keyword"},
+            "restaurant_name": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}},
+            "cuisines": {"type": "text"},
+            "text_content": {"type": "text"},
+            "embedding": {"type": "dense_vector", "dims": dims, "index": True, "similarity": "cosine"},
+        }
+    }
+
+
+class BulkLoadSettings:
+    """
+    대량 색인 동안 refresh를 끄고 replica를 0으로 내렸다가, 끝나면 원래 값으로 되돌린다.
+    index가 alias면 alias가 가리키는 실제 인덱스마다 원래 값을 저장하고 복원한다.
+    """
+
+    def __init__(self, es, index: str):
+        self.es = es
+        self.index = index
+        # 실제 인덱스 이름 → 원래 설정
+        self.original: Dict[str, Dict[str, Optional[str]]] = {}
+
+    def __enter__(self):
+        # get_settings 응답은 alias가 아니라 실제 인덱스 이름을 키로 쓴다
+        response = self.es.indices.get_settings(index=self.index)
+        for name, body in response.items():
+            settings = body["settings"]["index"]
+            self.original[name] = {
+                "refresh_interval": settings.get("refresh_interval"),  # None이면 기본값(1s)
+                "number_of_replicas": settings.get("number_of_replicas", "1"),
+            }
+        for name in self.original:
+            self.es.indices.put_settings(
+                index=name,
+                settings={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+            )
+        print(f"색인 설정 변경: refresh_interval=-1, number_of_replicas=0 (원래 값: {self.original})")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for name, original in self.original.items():
+            self.es.indices.put_settings(
+                index=name,
+                settings={"index": {
+                    "refresh_interval": original.get("refresh_interval"),
+                    "number_of_replicas": original.get("number_of_replicas"),
+                }},
+            )
+            self.es.indices.refresh(index=name)
+        print(f"색인 설정 복원: {self.original}")
+        return False
+
+
+def bulk_index(es, index: str, docs: Iterable[Dict], chunk_size: int, max_chunk_bytes: int,
+               thread_count: int, queue_size: int) -> Dict[str, int]:
+    """
+    helpers.parallel_bulk로 문서를 색인한다. 실패한 문서는 개수만 세고 처음 몇 개를 출력한다.
+    """
+    from elasticsearch import helpers
+
+    actions = (
+        {"_index": index, "_id": doc["restaurant_id"], "_source": doc}
+        for doc in docs
+    )
+    result = {"ok": 0, "failed": 0}
+    for ok, item in helpers.parallel_bulk(
+        es,
+        actions,
+        thread_count=thread_count,
+        queue_size=queue_size,
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        raise_on_error=False,
+        raise_on_exception=False,
+    ):
+        if ok:
+            result["ok"] += 1
+        else:
+            result["failed"] += 1
+            if result["failed"] <= 5:
+                print(f"색인 실패: {item}")
+    return result
+
+
+def dry_run(docs: Iterable[Dict], local_index: Optional[str]) -> Dict[str, int]:
+    """
+    ES 없이 파이프라인만 실행한다. (입력 파싱 + 임베딩 + LocalVectorIndex 생성)
+    local_index 경로를 주면 DENSE_BACKEND=local에서 쓸 수 있는 .npz로 저장한다.
+    임베딩 없이 실행하면(--no-embed) 문서 변환만 확인하고 벡터 인덱스는 만들지 않는다.
+    """
+    ids, sources, vectors = [], [], []
+    n_docs = 0
+    for doc in docs:
+        n_docs += 1
+        vector = doc.pop("embedding", None)
+        if vector is None:
+            continue
+        ids.append(doc["restaurant_id"])
+        sources.append(doc)
+        vectors.append(vector)
+
+    if vectors:
+        index = LocalVectorIndex(vectors, ids, sources)
+        print(f"로컬 벡터 인덱스 생성: 문서 {len(index)}개, 차원 {index.dim}")
+        if local_index:
+            index.save(local_index)
+    elif n_docs:
+        print(f"임베딩이 없어 로컬 벡터 인덱스는 만들지 않았습니다 (문서 {n_docs}개 변환 확인)")
+    return {"ok": n_docs, "failed": 0}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="레스토랑 문서 + bge-m3 임베딩 ES 색인")
+    parser.add_argument("source", type=str, help="입력 파일 (CSV 또는 JSONL)")
+    parser.add_argument("--index", type=str, default=os.getenv("ES_INDEX", "restaurant_docs"), help="대상 인덱스")
+    parser.add_argument("--create", action="store_true", help="인덱스가 없으면 dense_vector 매핑으로 생성")
+    parser.add_argument("--embed-batch", type=int, default=64, help="임베딩 요청 하나에 넣을 문서 수")
+    parser.add_argument("--embed-concurrency", type=int, default=4, help="동시 임베딩 요청 수")
+    parser.add_argument("--no-embed", action="store_true", help="임베딩 없이 텍스트 필드만 색인")
+    parser.add_argument("--chunk-size", type=int, default=500, help="bulk 요청 하나의 문서 수")
+    parser.add_argument("--max-chunk-bytes", type=int, default=20 * 1024 * 1024, help="bulk 요청 하나의 최대 바이트")
+    parser.add_argument("--threads", type=int, default=4, help="parallel_bulk 스레드 수")
+    parser.add_argument("--queue-size", type=int, default=4, help="parallel_bulk 대기 chunk 수")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="ES에 쓰지 않고 로컬 벡터 인덱스로만 실행 (OPENROUTER_API_KEY가 없으면 임베딩 없이 변환만 확인)")
+    parser.add_argument("--local-index", type=str, default=None, help="dry-run 결과를 저장할 .npz 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    stats: Dict = {}
+
+    embed = not args.no_embed
+    if embed and args.dry_run and not os.getenv("OPENROUTER_API_KEY"):
+        # dry-run은 ES/외부 API 없이도 입력 파싱과 문서 변환을 확인할 수 있어야 한다
+        print("OPENROUTER_API_KEY가 없어 임베딩 없이 dry-run을 실행합니다 (--no-embed와 같음)")
+        embed = False
+
+    docs = embedded_documents(
+        read_records(args.source),
+        embed_batch=args.embed_batch,
+        embed_concurrency=args.embed_concurrency,
+        embed=embed,
+        stats=stats,
+    )
+
+    if args.dry_run:
+        result = dry_run(docs, args.local_index)
+    else:
+        es = get_es_client()
+        if args.create and not es.indices.exists(index=args.index):
+            # 첫 문서의 임베딩 차원으로 매핑 생성
+            first = next(docs, None)
+            if first is None:
+                print("입력 문서가 없습니다.")
+                return
+            dims = len(first.get("embedding") or []) or 1024
+            es.indices.create(index=args.index, mappings=index_mapping(dims))
+            print(f"인덱스 생성: {args.index} (embedding dims={dims})")
+            docs = itertools.chain([first], docs)
+
+        with BulkLoadSettings(es, args.index):
+            result = bulk_index(
+                es, args.index, docs,
+                chunk_size=args.chunk_size,
+                max_chunk_bytes=args.max_chunk_bytes,
+                thread_count=args.threads,
+                queue_size=args.queue_size,
+            )
+
+    elapsed = time.perf_counter() - start
+    n_docs = stats.get("docs", 0)
+    print(
+        f"완료: 문서 {n_docs}개 (성공 {result['ok']}, 실패 {result['failed']}), "
+        f"{elapsed:.1f}s ({n_docs / elapsed if elapsed > 0 else 0:.0f} docs/s, "
+        f"임베딩 {stats.get('embed_seconds', 0.0):.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
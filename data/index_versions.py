@@ -0,0 +1,267 @@
+import os
+import re
+import sys
+import time
+import argparse
+import itertools
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# tools 모듈 import (프로젝트 루트 기준)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.es_search import build_bm25_body, get_embedding_from_openrouter, get_es_client
+from data.index_restaurants import BulkLoadSettings, bulk_index, embedded_documents, index_mapping, read_records
+
+# =====================
+# 인덱스 버전 관리 (restaurant_docs_vN + alias 교체)
+# =====================
+#
+# 검색 코드는 ES_INDEX(=alias, 예: restaurant_docs)만 읽는다.
+# 새 데이터는 restaurant_docs_v{N+1}에 색인 → 검증 → 워밍업 → alias를 한 번에 교체한다.
+#
+# 사용 예:
+#   python data/index_versions.py build data/restaurants.jsonl   # 새 버전 색인 + 검증 + 워밍업 + 교체
+#   python data/index_versions.py build data/restaurants.jsonl --no-swap
+#   python data/index_versions.py build data/restaurants.jsonl --sample-query "korean bbq" --sample-query pizza
+#   python data/index_versions.py swap restaurant_docs_v3
+#   python data/index_versions.py rollback
+#   python data/index_versions.py list
+
+load_dotenv()
+
+ALIAS = os.getenv("ES_INDEX", "restaurant_docs")
+
+# 검증/워밍업용 기본 샘플 쿼리 (--sample-query로 바꿀 수 있다, 영어 쿼리는 번역 LLM 호출 없이 바로 BM25 쿼리가 된다)
+SAMPLE_QUERIES = ["korean bbq", "pizza", "sushi", "cafe", "chinese noodles"]
+
+
+def list_versions(es, alias: str = ALIAS) -> List[str]:
+    """
+    alias_v{N} 형식의 인덱스를 버전 순서대로 반환
+    """
+    pattern = re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+    names = [name for name in es.indices.get(index=f"{alias}_v*") if pattern.match(name)]
+    return sorted(names, key=lambda name: int(pattern.match(name).group(1)))
+
+
+def current_targets(es, alias: str = ALIAS) -> List[str]:
+    """
+    지금 alias가 가리키는 인덱스들
+    """
+    if not es.indices.exists_alias(name=alias):
+        return []
+    return list(es.indices.get_alias(name=alias).keys())
+
+
+def next_version_name(es, alias: str = ALIAS) -> str:
+    versions = list_versions(es, alias)
+    last = int(versions[-1].rsplit("_v", 1)[1]) if versions else 0
+    return f"{alias}_v{last + 1}"
+
+
+def build_version(es, source: str, index: str, args) -> Dict[str, int]:
+    """
+    새 버전 인덱스를 만들고 source 파일을 색인한다. (refresh/replica는 BulkLoadSettings가 관리)
+    """
+    docs = embedded_documents(
+        read_records(source),
+        embed_batch=args.embed_batch,
+        embed_concurrency=args.embed_concurrency,
+    )
+    first = next(docs, None)
+    if first is None:
+        raise RuntimeError(f"입력 문서가 없습니다: {source}")
+
+    dims = len(first.get("embedding") or [])
+    es.indices.create(index=index, mappings=index_mapping(dims))
+    print(f"[build] 인덱스 생성: {index} (embedding dims={dims})")
+
+    with BulkLoadSettings(es, index):
+        result = bulk_index(
+            es, index, itertools.chain([first], docs),
+            chunk_size=args.chunk_size,
+            max_chunk_bytes=args.max_chunk_bytes,
+            thread_count=args.threads,
+            queue_size=args.queue_size,
+        )
+    print(f"[build] 색인 완료: 성공 {result['ok']}개, 실패 {result['failed']}개")
+    return result
+
+
+def validate_version(es, index: str, alias: str = ALIAS, min_ratio: float = 0.95,
+                     queries: Optional[List[str]] = None) -> bool:
+    """
+    교체 전에 새 인덱스를 확인한다. (debug_es_index.py와 같은 항목)
+    - 문서 개수: 0보다 크고, 현재 alias 문서 수의 min_ratio 이상
+    - embedding 필드가 dense_vector로 매핑되어 있는지
+    - 샘플 쿼리가 모두 결과를 반환하는지
+    """
+    ok = True
+    es.indices.refresh(index=index)
+    count = es.count(index=index)["count"]
+    print(f"[validate] {index} 문서 개수: {count:,}개")
+    if count == 0:
+        print("[validate] ❌ 문서가 없습니다.")
+        ok = False
+
+    targets = current_targets(es, alias)
+    if targets:
+        live_count = es.count(index=alias)["count"]
+        if live_count and count < live_count * min_ratio:
+            print(f"[validate] ❌ 현재 버전({live_count:,}개)의 {min_ratio:.0%} 미만입니다.")
+            ok = False
+
+    props = es.indices.get_mapping(index=index)[index]["mappings"].get("properties", {})
+    if props.get("embedding", {}).get("type") != "dense_vector":
+        print("[validate] ❌ embedding 필드가 dense_vector가 아닙니다.")
+        ok = False
+
+    for query in queries or SAMPLE_QUERIES:
+        body, _ = build_bm25_body(query, 5)
+        hits = es.search(index=index, body=body)["hits"]["hits"]
+        mark = "✅" if hits else "❌"
+        print(f"[validate] {mark} '{query}': {len(hits)}개 결과")
+        ok = ok and bool(hits)
+
+    return ok
+
+
+def warm_up(es, index: str, queries: Optional[List[str]] = None, rounds: int = 2, dense: bool = True) -> None:
+    """
+    alias 교체 전에 새 인덱스에 샘플 쿼리를 보내서 캐시/세그먼트를 미리 데운다.
+    (BM25 + KNN 모두, dense=False면 KNN은 생략)
+    """
+    queries = queries or SAMPLE_QUERIES
+    start = time.perf_counter()
+    vectors = {}
+    if dense:
+        for query in queries:
+            try:
+                vectors[query] = get_embedding_from_openrouter(query)
+            except Exception as e:
+                print(f"[warm-up] 임베딩 실패로 KNN 워밍업 생략 ('{query}'): {e}")
+
+    for _ in range(rounds):
+        for query in queries:
+            body, _ = build_bm25_body(query, 10)
+            es.search(index=index, body=body, request_cache=True)
+            if query in vectors:
+                es.search(index=index, body={"knn": {
+                    "field": "embedding",
+                    "query_vector": vectors[query],
+                    "k": 10,
+                    "num_candidates": 20,
+                }})
+    print(f"[warm-up] {index}: 쿼리 {len(queries)}개 x {rounds}회 완료 ({time.perf_counter() - start:.1f}s)")
+
+
+def swap_alias(es, index: str, alias: str = ALIAS) -> List[str]:
+    """
+    alias를 index로 원자적으로 교체한다. (remove + add를 한 번의 update_aliases 요청으로)
+
+    Returns:
+        이전에 alias가 가리키던 인덱스들
+    """
+    if es.indices.exists(index=alias) and not es.indices.exists_alias(name=alias):
+        raise RuntimeError(
+            f"'{alias}'는 alias가 아니라 실제 인덱스입니다. "
+            f"먼저 데이터를 {alias}_v1 로 옮기고(reindex) 기존 인덱스를 삭제한 뒤 alias를 만드세요."
+        )
+    previous = current_targets(es, alias)
+    actions = [{"remove": {"index": name, "alias": alias}} for name in previous if name != index]
+    actions.append({"add": {"index": index, "alias": alias}})
+    es.indices.update_aliases(actions=actions)
+    print(f"[swap] {alias}: {previous or '(없음)'} → {index}")
+    return previous
+
+
+def cleanup_old_versions(es, keep: int, alias: str = ALIAS) -> None:
+    """
+    alias가 가리키지 않는 오래된 버전을 최근 keep개만 남기고 삭제
+    """
+    live = set(current_targets(es, alias))
+    old = [name for name in list_versions(es, alias) if name not in live]
+    for name in old[:-keep] if keep > 0 else old:
+        es.indices.delete(index=name)
+        print(f"[cleanup] 삭제: {name}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="restaurant_docs 인덱스 버전 관리 (alias 무중단 교체)")
+    parser.add_argument("--alias", type=str, default=ALIAS, help="검색에서 사용하는 alias (ES_INDEX)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="새 버전 색인 → 검증 → 워밍업 → alias 교체")
+    build.add_argument("source", type=str, help="입력 파일 (CSV 또는 JSONL)")
+    build.add_argument("--no-swap", action="store_true", help="검증/워밍업까지만 하고 alias는 바꾸지 않음")
+    build.add_argument("--min-ratio", type=float, default=0.95, help="현재 버전 대비 최소 문서 수 비율")
+    build.add_argument("--warmup-rounds", type=int, default=2)
+    build.add_argument("--no-dense-warmup", action="store_true", help="KNN 워밍업 생략 (임베딩 API 호출 안 함)")
+    build.add_argument("--keep", type=int, default=2, help="교체 후 남겨 둘 이전 버전 수")
+    build.add_argument("--embed-batch", type=int, default=64)
+    build.add_argument("--embed-concurrency", type=int, default=4)
+    build.add_argument("--chunk-size", type=int, default=500)
+    build.add_argument("--max-chunk-bytes", type=int, default=20 * 1024 * 1024)
+    build.add_argument("--threads", type=int, default=4)
+    build.add_argument("--queue-size", type=int, default=4)
+    build.add_argument("--sample-query", dest="sample_queries", action="append", default=None,
+                       help="검증/워밍업 쿼리 (여러 번 지정 가능, 기본값: SAMPLE_QUERIES)")
+
+    swap = sub.add_parser("swap", help="지정한 인덱스로 alias 교체 (검증 + 워밍업 후)")
+    swap.add_argument("index", type=str)
+    swap.add_argument("--force", action="store_true", help="검증 실패해도 교체")
+    swap.add_argument("--sample-query", dest="sample_queries", action="append", default=None,
+                      help="검증/워밍업 쿼리 (여러 번 지정 가능, 기본값: SAMPLE_QUERIES)")
+
+    sub.add_parser("rollback", help="alias를 바로 이전 버전으로 되돌림")
+    sub.add_parser("list", help="버전 목록과 현재 alias 대상 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    es = get_es_client()
+    alias = args.alias
+
+    if args.command == "list":
+        live = set(current_targets(es, alias))
+        for name in list_versions(es, alias):
+            count = es.count(index=name)["count"]
+            print(f"{'*' if name in live else ' '} {name} ({count:,}개)")
+        return
+
+    if args.command == "rollback":
+        versions = list_versions(es, alias)
+        live = current_targets(es, alias)
+        if not live or live[0] not in versions or versions.index(live[0]) == 0:
+            print("되돌릴 이전 버전이 없습니다.")
+            sys.exit(1)
+        swap_alias(es, versions[versions.index(live[0]) - 1], alias)
+        return
+
+    if args.command == "swap":
+        if not validate_version(es, args.index, alias, queries=args.sample_queries) and not args.force:
+            print("검증 실패: alias를 교체하지 않습니다. (--force로 강제 교체)")
+            sys.exit(1)
+        warm_up(es, args.index, queries=args.sample_queries)
+        swap_alias(es, args.index, alias)
+        return
+
+    # build
+    index = next_version_name(es, alias)
+    build_version(es, args.source, index, args)
+    if not validate_version(es, index, alias, min_ratio=args.min_ratio, queries=args.sample_queries):
+        print(f"검증 실패: {index}는 남겨 두고 alias는 그대로 둡니다.")
+        sys.exit(1)
+    warm_up(es, index, queries=args.sample_queries, rounds=args.warmup_rounds, dense=not args.no_dense_warmup)
+    if args.no_swap:
+        print(f"--no-swap: {index} 준비 완료 (python data/index_versions.py swap {index} 로 교체)")
+        return
+    swap_alias(es, index, alias)
+    cleanup_old_versions(es, keep=args.keep, alias=alias)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ except ImportError:
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from tools.es_search import get_es_client
+from tools.es_search import get_es_client, get_index_stats
 
 print("=" * 60)
 print("ES 인덱스 구조 및 데이터 확인")
@@ -60,8 +60,8 @@ try:
     
     # 3. 문서 개수 확인
     print(f"\n[3] 문서 개수 확인...")
-    count_result = es.count(index=es_index)
-    total_docs = count_result.get("count", 0)
+    stats = get_index_stats(es_index, es=es, refresh=True) or {}
+    total_docs = stats.get("count", 0)
     print(f"총 문서 개수: {total_docs:,}개")
     
     if total_docs == 0:
@@ -1,6 +1,11 @@
+from typing import List
+
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from tools.records import CHECKPOINT_RECORD_TYPES
 
+from .checkpoint import create_checkpointer
 from .nodes import (
     AgentState,
     coordinator_node,
@@ -8,141 +13,41 @@ from .nodes import (
     search_agent_node,
     places_agent_node,
     budget_agent_node,
+    merge_results_node,
     supervisor_node,
     evaluator_node,
     final_output_node,
 )
 
 
-def planner_router(state: AgentState) -> str:
+def planner_router(state: AgentState) -> List[str]:
     """
-    planner에서 처음 호출될 때 어떤 sub agent를 시작할지 결정.
-    planner에서는 절대 supervisor로 가지 않고, 항상 sub agent 중 하나를 선택.
+    planner가 정한 agent_plan에서 먼저 기다릴 agent가 없는 sub agent들을 동시에 시작한다.
+    planner에서는 절대 supervisor로 가지 않고, 항상 sub agent 중 하나 이상을 선택.
     """
-    tool_mode = state.get("tool_mode", "mixed")
-    user_query = state.get("user_query", "").lower()
-    subtask = state.get("subtask", "").lower()
-    
-    # 예산 관련 키워드
-    budget_keywords = ["예산", "비용", "가격", "돈", "얼마", "계산"]
-    needs_budget = (
-        tool_mode == "budget"
-        or "budget" in tool_mode
-        or any(keyword in user_query for keyword in budget_keywords)
-        or any(keyword in subtask for keyword in budget_keywords)
-    )
-    
-    # 맛집 검색 관련 키워드
-    search_keywords = ["맛집", "식당", "추천", "찾아", "검색", "근처"]
-    needs_search = any(keyword in user_query for keyword in search_keywords) or any(
-        keyword in subtask for keyword in search_keywords
-    )
-    
-    # 리뷰/상세 정보 관련 키워드
-    review_keywords = ["리뷰", "평점", "후기", "어때", "추천할만", "정보"]
-    needs_review = any(keyword in user_query for keyword in review_keywords) or any(
-        keyword in subtask for keyword in review_keywords
-    )
-    
-    # 특정 식당 이름이 명확히 언급된 경우
-    specific_restaurant_keywords = ["텐동야", "파스타노바", "비스트로온", "돈카츠모노", "김치찌개연구소"]
-    has_specific_restaurant = any(keyword in user_query for keyword in specific_restaurant_keywords) or any(
-        keyword in subtask for keyword in specific_restaurant_keywords
-    )
-    
-    # 실행 순서 결정 (planner에서는 항상 sub agent 중 하나를 선택)
-    
-    # 1. 예산 계산이 필요한 경우
-    if needs_budget:
-        return "budget_agent"
-    
-    # 2. 특정 식당이 명시된 경우 → places_agent부터 시작
-    if has_specific_restaurant:
-        return "places_agent"
-    
-    # 3. 일반 맛집 검색 → search_agent부터 시작
-    if needs_search:
-        return "search_agent"
-    
-    # 4. 리뷰가 필요한 경우 → places_agent (하지만 search가 먼저 필요할 수 있음)
-    if needs_review:
-        return "places_agent"
-    
-    # 5. 기본값: search_agent부터 시작
-    return "search_agent"
+    plan = state.get("agent_plan") or {"search_agent": []}
+    ready = [name for name, deps in plan.items() if not deps]
+    return ready or ["search_agent"]
 
 
-def sub_agent_router(state: AgentState) -> str:
+def make_sub_agent_router(node_name: str):
     """
-    sub agent들에서 다음 단계를 결정하는 router.
-    필요한 sub agent가 더 있으면 계속 실행하고, 모두 완료되면 supervisor로 이동.
+    sub agent가 끝났을 때 다음 단계를 결정하는 router를 만든다.
+    node_name을 기다리던 agent 중 필요한 agent가 모두 끝난 것들을 실행하고,
+    더 실행할 agent가 없으면 merge_results로 이동 (merge_results는 defer=True라서 병렬 가지가 모두 끝난 뒤 한 번만 실행).
     """
-    tool_mode = state.get("tool_mode", "mixed")
-    user_query = state.get("user_query", "").lower()
-    subtask = state.get("subtask", "").lower()
-    
-    # 예산 관련 키워드
-    budget_keywords = ["예산", "비용", "가격", "돈", "얼마", "계산"]
-    needs_budget = (
-        tool_mode == "budget"
-        or "budget" in tool_mode
-        or any(keyword in user_query for keyword in budget_keywords)
-        or any(keyword in subtask for keyword in budget_keywords)
-    )
-    
-    # 맛집 검색 관련 키워드
-    search_keywords = ["맛집", "식당", "추천", "찾아", "검색", "근처"]
-    needs_search = any(keyword in user_query for keyword in search_keywords) or any(
-        keyword in subtask for keyword in search_keywords
-    )
-    
-    # 리뷰/상세 정보 관련 키워드
-    review_keywords = ["리뷰", "평점", "후기", "어때", "추천할만", "정보"]
-    needs_review = any(keyword in user_query for keyword in review_keywords) or any(
-        keyword in subtask for keyword in review_keywords
-    )
-    
-    # 특정 식당 이름이 명확히 언급된 경우
-    specific_restaurant_keywords = ["텐동야", "파스타노바", "비스트로온", "돈카츠모노", "김치찌개연구소"]
-    has_specific_restaurant = any(keyword in user_query for keyword in specific_restaurant_keywords) or any(
-        keyword in subtask for keyword in specific_restaurant_keywords
-    )
-    
-    # 현재 실행 상태 확인
-    tool_trace = state.get("tool_trace", "")
-    has_search_result = "[Search Agent 결과]" in tool_trace
-    has_places_result = "[Places Agent 결과]" in tool_trace
-    has_budget_result = "[Budget Agent 결과]" in tool_trace
-    
-    # 실행 순서 결정
-    
-    # 1. 예산 계산이 필요한 경우
-    if needs_budget and not has_budget_result:
-        return "budget_agent"
-    
-    # 2. 특정 식당이 명시된 경우
-    if has_specific_restaurant:
-        if not has_places_result:
-            return "places_agent"
-        elif needs_budget and not has_budget_result:
-            return "budget_agent"
-        else:
-            return "supervisor"  # 모든 필요한 agent 실행 완료
-    
-    # 3. 일반 맛집 검색
-    if needs_search and not has_search_result:
-        return "search_agent"
-    
-    # 4. search_agent 결과가 있으면 places_agent 실행
-    if has_search_result and not has_places_result:
-        return "places_agent"
-    
-    # 5. 리뷰가 필요한 경우 places_agent 실행
-    if needs_review and not has_places_result:
-        return "places_agent"
-    
-    # 6. 모든 필요한 agent 실행 완료
-    return "supervisor"
+
+    def sub_agent_router(state: AgentState) -> List[str]:
+        plan = state.get("agent_plan") or {}
+        done = set(state.get("tool_sections") or {}) | {node_name}
+        ready = [
+            name for name, deps in plan.items()
+            if node_name in deps and name not in done and all(dep in done for dep in deps)
+        ]
+        return ready or ["merge_results"]
+
+    sub_agent_router.__name__ = f"{node_name}_router"
+    return sub_agent_router
 
 
 def eval_router(state: AgentState) -> str:
@@ -173,53 +78,29 @@ def build_graph():
     workflow.add_node("search_agent", search_agent_node)
     workflow.add_node("places_agent", places_agent_node)
     workflow.add_node("budget_agent", budget_agent_node)
+    # 병렬로 실행된 sub agent 결과를 모아서 tool_trace로 합침 (모든 가지가 끝난 뒤 실행)
+    workflow.add_node("merge_results", merge_results_node, defer=True)
 
     workflow.set_entry_point("coordinator")
 
     # Super Agent Flow
     workflow.add_edge("coordinator", "planner")
     
-    # Planner에서 Sub Agent 선택 (절대 supervisor로 가지 않음)
-    workflow.add_conditional_edges(
-        "planner",
-        planner_router,
-        {
-            "search_agent": "search_agent",
-            "places_agent": "places_agent",
-            "budget_agent": "budget_agent",
-        },
-    )
-    
-    # Sub Agent들에서 다음 단계로
-    workflow.add_conditional_edges(
-        "search_agent",
-        sub_agent_router,
-        {
-            "places_agent": "places_agent",
-            "budget_agent": "budget_agent",
-            "supervisor": "supervisor",
-        },
-    )
-    
-    workflow.add_conditional_edges(
-        "places_agent",
-        sub_agent_router,
-        {
-            "budget_agent": "budget_agent",
-            "supervisor": "supervisor",
-        },
-    )
-    
-    workflow.add_conditional_edges(
-        "budget_agent",
-        sub_agent_router,
-        {
-            "search_agent": "search_agent",
-            "places_agent": "places_agent",
-            "supervisor": "supervisor",
-        },
-    )
-    
+    # Planner에서 Sub Agent 선택 (절대 supervisor로 가지 않음, 서로 의존하지 않는 agent는 병렬 실행)
+    sub_agents = ["search_agent", "places_agent", "budget_agent"]
+    workflow.add_conditional_edges("planner", planner_router, sub_agents)
+
+    # Sub Agent들에서 다음 단계로 (의존하던 agent가 끝나면 실행, 모두 끝나면 결과 병합)
+    for name in sub_agents:
+        workflow.add_conditional_edges(
+            name,
+            make_sub_agent_router(name),
+            [other for other in sub_agents if other != name] + ["merge_results"],
+        )
+
+    # 결과 병합 → Supervisor
+    workflow.add_edge("merge_results", "supervisor")
+
     # Supervisor → Evaluator
     workflow.add_edge("supervisor", "evaluator")
 
@@ -236,8 +117,9 @@ def build_graph():
     workflow.add_edge("final_output", END)
 
 
-    # MEMORY SAVER 추가
-    memory = MemorySaver()
+    # MEMORY SAVER 추가 (세션별 checkpoint 크기 기록 + 오래된 checkpoint 정리)
+    # (state의 툴 결과 레코드 타입은 역직렬화를 명시적으로 허용)
+    memory = create_checkpointer(serde=JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_RECORD_TYPES))
 
     # checkpointer 적용해 compile
     app = workflow.compile(checkpointer=memory)
@@ -0,0 +1,165 @@
+import os
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+
+logger = logging.getLogger(__name__)
+
+
+class MeteredMemorySaver(MemorySaver):
+    """
+    thread(=세션)별 checkpoint 크기를 기록하고 오래된 checkpoint를 정리하는 MemorySaver.
+
+    - keep_last: thread마다 남길 최근 checkpoint 수 (0이면 모두 보관)
+      최신 상태만 다음 턴에 사용하므로 오래된 checkpoint와, 남은 checkpoint가 참조하지 않는 채널 값은 지운다.
+      루트 namespace("")가 새 checkpoint를 쓰면 하위 그래프가 남긴 namespace("agent:<task-id>")는 모두 지운다.
+    - stats(): thread별 최근 상태 크기 / 채널별 크기 / 이번 저장에 쓴 바이트 / checkpoint 수
+      (상태 크기와 채널별 크기는 루트 namespace 기준)
+    """
+
+    def __init__(self, *, keep_last: int = 0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.keep_last = max(0, keep_last)
+        self._lock = threading.Lock()
+        # (thread_id, checkpoint_ns, checkpoint_id) → channel_versions
+        self._versions: Dict[tuple, Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "checkpoints_written": 0,
+            "bytes_written": 0,
+            "last_write_bytes": 0,
+            "state_bytes": 0,
+            "max_state_bytes": 0,
+            "channels": {},
+            "pruned": 0,
+        })
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        with self._lock:
+            versions = dict(checkpoint["channel_versions"])
+            self._versions[(thread_id, checkpoint_ns, checkpoint["id"])] = versions
+
+            # 채널별 현재 크기 (새로 쓴 값 + 이전 checkpoint에서 이어지는 값)
+            channels = {}
+            for channel, version in versions.items():
+                blob = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+                if blob is not None:
+                    channels[channel] = len(blob[1])
+            saved = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            written = len(saved[0]) + len(saved[1]) + sum(
+                channels.get(channel, 0) for channel in new_versions
+            )
+
+            stats = self._stats[thread_id]
+            stats["checkpoints_written"] += 1
+            stats["bytes_written"] += written
+            stats["last_write_bytes"] = written
+            if checkpoint_ns == "":
+                stats["state_bytes"] = sum(channels.values())
+                stats["max_state_bytes"] = max(stats["max_state_bytes"], stats["state_bytes"])
+                stats["channels"] = channels
+
+            if self.keep_last:
+                if checkpoint_ns == "":
+                    self._prune_child_namespaces(thread_id)
+                self._prune(thread_id, checkpoint_ns)
+        return next_config
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """
+        최근 keep_last개보다 오래된 checkpoint와 그 pending writes, 더 이상 참조되지 않는 채널 값을 지운다.
+        """
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_last:
+            return
+        # checkpoint id는 시간 순으로 정렬된다 (uuid6)
+        old_ids = sorted(checkpoints)[: len(checkpoints) - self.keep_last]
+        for checkpoint_id in old_ids:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        referenced = {
+            (channel, version)
+            for (tid, ns, _), versions in self._versions.items()
+            if tid == thread_id and ns == checkpoint_ns
+            for channel, version in versions.items()
+        }
+        for key in [k for k in self.blobs if k[0] == thread_id and k[1] == checkpoint_ns]:
+            if (key[2], key[3]) not in referenced:
+                del self.blobs[key]
+        self._stats[thread_id]["pruned"] += len(old_ids)
+
+    def _prune_child_namespaces(self, thread_id: str) -> None:
+        """
+        하위 그래프 namespace의 checkpoint / pending writes / 채널 값을 모두 지운다.
+        (하위 그래프는 실행이 끝나면 다시 읽히지 않고, 루트가 다음 checkpoint를 쓰는 시점엔 이미 끝나 있다)
+        """
+        namespaces = self.storage.get(thread_id, {})
+        children = [ns for ns in namespaces if ns != ""]
+        if not children:
+            return
+        pruned = 0
+        for ns in children:
+            pruned += len(namespaces.pop(ns))
+        for key in [k for k in self.writes if k[0] == thread_id and k[1] != ""]:
+            del self.writes[key]
+        for key in [k for k in self.blobs if k[0] == thread_id and k[1] != ""]:
+            del self.blobs[key]
+        for key in [k for k in self._versions if k[0] == thread_id and k[1] != ""]:
+            del self._versions[key]
+        self._stats[thread_id]["pruned"] += pruned
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._stats.pop(thread_id, None)
+            for key in [k for k in self._versions if k[0] == thread_id]:
+                del self._versions[key]
+
+    def stats(self, thread_id: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+        """
+        thread_id를 주면 해당 세션의 통계, 아니면 전체 요약 + 최근 상태가 큰 세션 top개
+        """
+        with self._lock:
+            if thread_id is not None:
+                stats = self._stats.get(thread_id)
+                if stats is None:
+                    return {}
+                return {
+                    **stats,
+                    "checkpoints_stored": sum(len(c) for c in self.storage.get(thread_id, {}).values()),
+                }
+
+            threads = sorted(self._stats.items(), key=lambda item: item[1]["state_bytes"], reverse=True)
+            return {
+                "threads": len(self._stats),
+                "keep_last": self.keep_last,
+                "checkpoints_stored": sum(len(c) for ns in self.storage.values() for c in ns.values()),
+                "blob_bytes": sum(len(blob[1]) for blob in self.blobs.values()),
+                "state_bytes_total": sum(s["state_bytes"] for _, s in threads),
+                "largest": [
+                    {
+                        "thread_id": tid,
+                        "state_bytes": s["state_bytes"],
+                        "max_state_bytes": s["max_state_bytes"],
+                        "last_write_bytes": s["last_write_bytes"],
+                        "checkpoints_written": s["checkpoints_written"],
+                    }
+                    for tid, s in threads[:top]
+                ],
+            }
+
+
+def create_checkpointer(**kwargs: Any) -> MeteredMemorySaver:
+    """
+    CHECKPOINT_KEEP_LAST 환경변수로 thread별 보관 checkpoint 수를 정한다 (기본값 50, 0이면 모두 보관)
+    """
+    keep_last = int(os.getenv("CHECKPOINT_KEEP_LAST", "50"))
+    return MeteredMemorySaver(keep_last=keep_last, **kwargs)
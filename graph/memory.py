@@ -0,0 +1,107 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# 세션 메모리 압축 정책
+# =====================
+#
+# session_memory는 MemorySaver가 매 노드마다 checkpoint로 저장하므로 세션이 길어져도 크기가 일정해야 한다.
+# - recent_turns: 최근 SESSION_MAX_TURNS개 턴만 유지 (ring buffer)
+# - 밀려난 턴은 한 줄 요약으로 digest에 추가 (digest도 SESSION_DIGEST_CHARS 이내로 유지)
+# - 전체 크기가 SESSION_MEMORY_MAX_BYTES를 넘으면 오래된 턴부터 digest로 접고, 그래도 크면 답변/다이제스트를 줄인다
+
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "5"))
+SESSION_DIGEST_CHARS = int(os.getenv("SESSION_DIGEST_CHARS", "1500"))
+SESSION_MEMORY_MAX_BYTES = int(os.getenv("SESSION_MEMORY_MAX_BYTES", "16384"))
+TURN_ANSWER_CHARS = int(os.getenv("SESSION_TURN_ANSWER_CHARS", "500"))
+
+
+def memory_bytes(session: Dict[str, Any]) -> int:
+    """
+    session_memory의 대략적인 저장 크기 (UTF-8 JSON 기준)
+    """
+    return len(json.dumps(session, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def digest_line(turn: Dict[str, Any]) -> str:
+    """
+    recent_turns에서 밀려난 턴 하나를 한 줄로 요약한다. (질문 + 추천 식당 또는 답변 앞부분)
+    """
+    query = _truncate((turn.get("user_query") or "").strip().replace("\n", " "), 60)
+    names = [r.get("name", "") for r in turn.get("last_reco") or [] if r.get("name")]
+    if names:
+        outcome = "추천: " + ", ".join(names[:5])
+    else:
+        outcome = _truncate((turn.get("final_answer") or "").strip().replace("\n", " "), 80)
+    return f"- {query} → {outcome}" if outcome else f"- {query}"
+
+
+def _fold_into_digest(session: Dict[str, Any], turn: Dict[str, Any]) -> None:
+    digest: List[str] = list(session.get("digest") or [])
+    digest.append(digest_line(turn))
+    # 오래된 줄부터 버려서 SESSION_DIGEST_CHARS 이내로 유지
+    while len(digest) > 1 and sum(len(line) + 1 for line in digest) > SESSION_DIGEST_CHARS:
+        digest.pop(0)
+        session["digest_dropped"] = session.get("digest_dropped", 0) + 1
+    session["digest"] = digest
+
+
+def compact_turn(turn: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    recent_turns에 저장할 턴 기록 (답변은 TURN_ANSWER_CHARS자까지만)
+    """
+    return {**turn, "final_answer": _truncate(turn.get("final_answer") or "", TURN_ANSWER_CHARS)}
+
+
+def compact_session_memory(session: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    session_memory를 턴 수 / 바이트 예산 안으로 줄인다. (session을 직접 수정하고 반환)
+    """
+    turns: List[Dict[str, Any]] = list(session.get("recent_turns") or [])
+
+    # 1) ring buffer: 최근 SESSION_MAX_TURNS개만 유지
+    while len(turns) > max(1, SESSION_MAX_TURNS):
+        _fold_into_digest(session, turns.pop(0))
+    session["recent_turns"] = turns
+
+    # 2) 바이트 예산: 오래된 턴부터 digest로 접는다 (직전 턴은 남김)
+    while len(turns) > 1 and memory_bytes(session) > SESSION_MEMORY_MAX_BYTES:
+        _fold_into_digest(session, turns.pop(0))
+
+    # 3) 그래도 크면 직전 턴의 큰 필드를 줄인다
+    if memory_bytes(session) > SESSION_MEMORY_MAX_BYTES:
+        session["last_final_answer"] = _truncate(session.get("last_final_answer") or "", TURN_ANSWER_CHARS)
+        turns[:] = [{k: v for k, v in turn.items() if k != "tool_trace_summary"} for turn in turns]
+
+    # 4) 마지막으로 digest를 오래된 줄부터 버린다
+    digest = session["digest"] = list(session.get("digest") or [])
+    while digest and memory_bytes(session) > SESSION_MEMORY_MAX_BYTES:
+        digest.pop(0)
+        session["digest_dropped"] = session.get("digest_dropped", 0) + 1
+
+    size = memory_bytes(session)
+    if size > SESSION_MEMORY_MAX_BYTES:
+        logger.warning("[session_memory] 압축 후에도 %d bytes (예산 %d bytes)", size, SESSION_MEMORY_MAX_BYTES)
+    return session
+
+
+def render_digest(session: Dict[str, Any]) -> str:
+    """
+    coordinator/evaluator 프롬프트에 넣을 이전 대화 요약 (digest가 없으면 빈 문자열)
+    """
+    digest = session.get("digest") or []
+    if not digest:
+        return ""
+    header = "더 이전 대화 요약:"
+    if session.get("digest_dropped"):
+        header += f" (그 이전 {session['digest_dropped']}개 턴은 생략)"
+    return header + "\n" + "\n".join(digest)
@@ -2,9 +2,9 @@ import os
 import json
 import logging
 import re
-from typing import TypedDict, List, Dict, Any
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
 from langgraph.prebuilt import create_react_agent
 
 from agents.llm import get_llm
@@ -15,7 +15,10 @@ from tools.llm_tools import (
     google_places_by_location_tool,
     calculator_tool,
     menu_price_tool,
+    enrich_search_hits,
 )
+from tools.records import SearchHit, PlaceDetail, MenuQuote
+from .memory import compact_session_memory, compact_turn, render_digest
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -31,9 +34,47 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
+def merge_tool_sections(left: Optional[Dict[str, str]], right: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """
+    tool_sections reducer: 병렬로 실행된 sub agent 결과를 agent 이름 기준으로 합친다.
+    right가 None이면 초기화 (coordinator가 턴/재시도 시작 시 사용)
+    """
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
+def append_records(left: Optional[List[Any]], right: Optional[List[Any]]) -> List[Any]:
+    """
+    search_hits / place_details / menu_quotes reducer: 툴 결과 레코드를 이어 붙인다.
+    right가 None이면 초기화 (coordinator가 턴/재시도 시작 시, final_output이 턴 종료 시 사용)
+    """
+    if right is None:
+        return []
+    return [*(left or []), *right]
+
+
+# history에 남길 최대 항목 수 / 항목 하나의 최대 글자 수 (checkpoint 크기 제한)
+HISTORY_MAX_ENTRIES = int(os.getenv("HISTORY_MAX_ENTRIES", "20"))
+HISTORY_ENTRY_CHARS = int(os.getenv("HISTORY_ENTRY_CHARS", "500"))
+
+
+def append_history(left: Optional[List[Dict[str, str]]], right: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    history reducer: 최근 HISTORY_MAX_ENTRIES개만 남기는 ring buffer
+    """
+    history = [*(left or []), *(right or [])]
+    if HISTORY_MAX_ENTRIES > 0 and len(history) > HISTORY_MAX_ENTRIES:
+        history = history[-HISTORY_MAX_ENTRIES:]
+    return history
+
+
 class AgentState(TypedDict, total=False):
     """
     LangGraph 전체에서 공유할 상태.
+
+    sub agent들은 병렬로 실행될 수 있으므로 모든 노드는 바뀐 키만 반환한다.
+    (history / tool_sections는 reducer로 합쳐짐)
     """
 
     user_query: str
@@ -41,7 +82,13 @@ class AgentState(TypedDict, total=False):
     core_plan: str          # coordinator에서 만든 high-level plan
     subtask: str            # planner가 만든 이번 턴의 구체 서브태스크
     tool_mode: str          # planner가 추천하는 모드(restaurant/review/budget/...)
-    tool_trace: str         # tool-agent에서 나온 중간 reasoning + 결과 요약
+    agent_plan: Dict[str, List[str]]  # planner가 정한 이번 턴 sub agent → 먼저 끝나야 하는 sub agent 목록
+    tool_sections: Annotated[Dict[str, str], merge_tool_sections]  # 이번 턴 sub agent별 결과
+    # 이번 턴 툴 결과 레코드 (ToolMessage.artifact, tools/records.py)
+    search_hits: Annotated[List[SearchHit], append_records]      # es_search_tool 검색 결과
+    place_details: Annotated[List[PlaceDetail], append_records]  # Google Places 상세 정보
+    menu_quotes: Annotated[List[MenuQuote], append_records]      # menu_price_tool 메뉴/가격
+    tool_trace: str         # tool_sections를 merge_results에서 합친 결과 (supervisor/evaluator가 참고)
     draft_answer: str       # supervisor가 만든 초안
     final_answer: str       # evaluator 통과한 최종 답변
 
@@ -49,7 +96,7 @@ class AgentState(TypedDict, total=False):
     needs_revision: bool    # evaluator가 재수정 필요 여부
     loop_count: int         # 몇 번째 루프인지
 
-    history: List[Dict[str, str]]  # 선택사항: 전체 에이전트 로그
+    history: Annotated[List[Dict[str, str]], append_history]  # 선택사항: 최근 에이전트 로그 (ring buffer)
 
     # 세션 단위 Short-term Memory
     # 같은 thread_id 에서 다음 질문이 들어왔을 때 참고할 정보들
@@ -63,149 +110,143 @@ class AgentState(TypedDict, total=False):
 llm = get_llm(model_name=os.getenv("BASE_LLM_MODEL", "qwen/qwen3-30b-a3b:free"))
 
 
-def _append_history(state: AgentState, role: str, content: str) -> None:
-    history = state.get("history") or []
-    history.append({"role": role, "content": content})
-    state["history"] = history
+def _history_entry(role: str, content: str) -> List[Dict[str, str]]:
+    """
+    history에 추가할 항목 (history는 append_history reducer로 최근 항목만 누적됨)
+    """
+    if len(content) > HISTORY_ENTRY_CHARS:
+        content = content[:HISTORY_ENTRY_CHARS] + "... (생략)"
+    return [{"role": role, "content": content}]
+
+
+# sub agent 결과를 tool_trace로 합칠 때의 순서와 헤더 (_extract_key_info_from_tool_trace가 이 헤더로 섹션을 나눔)
+TOOL_SECTION_HEADERS = {
+    "search_agent": "[Search Agent 결과]",
+    "places_agent": "[Places Agent 결과]",
+    "budget_agent": "[Budget Agent 결과]",
+}
 
 
-def _extract_key_info_from_tool_trace(tool_trace: str) -> Dict[str, Any]:
+def render_tool_trace(sections: Dict[str, str]) -> str:
     """
-    tool_trace를 섹션별로 파싱하여 핵심 정보만 추출합니다.
+    tool_sections를 고정된 순서(search → places → budget)의 tool_trace 문자열로 만든다.
+    (병렬 실행으로 끝나는 순서가 달라도 결과 문자열은 같음)
     """
-    if not tool_trace:
-        return {}
-    
-    key_info = {
+    return "\n\n".join(
+        f"{header}\n{sections[name]}"
+        for name, header in TOOL_SECTION_HEADERS.items()
+        if sections.get(name)
+    )
+
+
+def _reference_trace(state: AgentState) -> str:
+    """
+    places/budget agent가 참고할 검색 결과.
+    이번 턴에 search_agent가 돌았으면 그 결과를, 아니면 직전 턴의 tool_trace를 사용한다.
+    (예: "두번째 식당 리뷰 알려줘" 같은 후속 질문)
+    """
+    sections = state.get("tool_sections") or {}
+    current = render_tool_trace(sections)
+    if sections.get("search_agent"):
+        return current
+    previous = state.get("tool_trace", "")
+    return "\n\n".join(part for part in (previous, current) if part)
+
+
+def _tool_artifacts(messages: List[Any], *tools: Any) -> List[Any]:
+    """
+    ReAct agent 실행 결과 메시지에서 지정한 툴들이 돌려준 artifact 레코드를 모은다.
+    """
+    names = {t.name for t in tools}
+    return [
+        record
+        for msg in messages
+        if isinstance(msg, ToolMessage) and msg.name in names and msg.artifact
+        for record in msg.artifact
+    ]
+
+
+def _unique_by_name(records: List[Any], key: str = "name") -> List[Any]:
+    """
+    같은 식당을 여러 번 조회한 경우 마지막 결과만 남긴다. (처음 나온 순서 유지)
+    """
+    latest: Dict[str, Any] = {}
+    for record in records:
+        latest[getattr(record, key)] = record
+    return list(latest.values())
+
+
+# supervisor에 넘길 레코드 수 제한 (프롬프트 크기를 일정하게 유지)
+MAX_PROMPT_RECORDS = 10
+
+
+def render_tool_records(state: AgentState) -> str:
+    """
+    툴 결과 레코드를 supervisor 프롬프트용 간단한 텍스트로 만든다. (레코드가 없으면 빈 문자열)
+    """
+    parts = []
+    hits = _unique_by_name(state.get("search_hits") or [])[:MAX_PROMPT_RECORDS]
+    if hits:
+        parts.append("[맛집 검색 결과]\n" + "\n".join(hit.to_line() for hit in hits))
+    details = _unique_by_name(state.get("place_details") or [], key="query_name")[:MAX_PROMPT_RECORDS]
+    if details:
+        parts.append("[Google Places 상세 정보]\n" + "\n".join(f"- {detail.to_line()}" for detail in details))
+    quotes = _unique_by_name(state.get("menu_quotes") or [], key="restaurant")[:MAX_PROMPT_RECORDS]
+    if quotes:
+        parts.append("[메뉴 정보]\n" + "\n".join(f"- {quote.to_line()}" for quote in quotes))
+    return "\n\n".join(parts)
+
+
+def _key_info_from_records(state: AgentState) -> Dict[str, Any]:
+    """
+    이번 턴의 툴 결과 레코드에서 세션 메모리에 남길 핵심 정보만 추린다.
+    """
+    key_info: Dict[str, Any] = {
         "search_results": [],
         "places_results": [],
         "budget_results": {},
     }
-    
-    # 1. Search Agent 결과 추출
-    # [Search Agent 결과] 섹션 또는 [맛집 검색 결과] 섹션 찾기
-    search_patterns = [
-        r'\[Search Agent 결과\](.*?)(?=\n\n\[|$)',
-        r'\[맛집 검색 결과\](.*?)(?=\n\n\[|$)',
-    ]
-    
-    search_content = None
-    for pattern in search_patterns:
-        search_matches = re.findall(pattern, tool_trace, re.DOTALL)
-        if search_matches:
-            search_content = search_matches[-1]  # 가장 최근 결과
-            break
-    
-    if search_content:
-        # 식당 목록 추출: [1] 식당명 (지역, 카테고리) 형식
-        restaurant_pattern = r'\[(\d+)\]\s+([^\n(]+?)(?:\s*\([^)]+\))?'
-        restaurants = re.findall(restaurant_pattern, search_content)
-        for idx, name in restaurants[:5]:  # 최대 5개
-            name = name.strip()
-            # 괄호 안의 지역명 제거
-            name = re.sub(r'\s*\([^)]+\)\s*$', '', name).strip()
-            
-            # 해당 식당의 평점 정보도 추출
-            rating_match = re.search(
-                rf'\[{idx}\].*?평점:\s*([\d.]+)점\s*\((\d+)개 리뷰\)',
-                search_content,
-                re.DOTALL
-            )
-            restaurant_info = {
-                "index": int(idx),
-                "name": name,
-            }
-            if rating_match:
-                restaurant_info["rating"] = rating_match.group(1)
-                restaurant_info["review_count"] = rating_match.group(2)
-            key_info["search_results"].append(restaurant_info)
-    
-    # 2. Places Agent 결과 추출
-    places_pattern = r'\[Places Agent 결과\](.*?)(?=\n\n\[|$)'
-    places_matches = re.findall(places_pattern, tool_trace, re.DOTALL)
-    if places_matches:
-        places_content = places_matches[-1]
-        # 각 식당별 정보 추출
-        restaurant_info_pattern = r'\[Google Places 상세 정보\]\s*([^\n]+)(.*?)(?=\[Google Places|$)'
-        restaurant_infos = re.findall(restaurant_info_pattern, places_content, re.DOTALL)
-        
-        for name, info in restaurant_infos[:5]:  # 최대 5개
-            name = name.strip()
-            place_info = {"name": name}
-            
-            # 주소 추출
-            address_match = re.search(r'주소:\s*([^\n]+)', info)
-            if address_match:
-                place_info["address"] = address_match.group(1).strip()
-            
-            # 평점 추출
-            rating_match = re.search(r'평점:\s*([\d.]+)점\s*\(전체 리뷰\s*(\d+)개\)', info)
-            if rating_match:
-                place_info["rating"] = rating_match.group(1)
-                place_info["review_count"] = rating_match.group(2)
-            
-            # 전화번호 추출
-            phone_match = re.search(r'전화번호:\s*([^\n]+)', info)
-            if phone_match:
-                place_info["phone"] = phone_match.group(1).strip()
-            
-            key_info["places_results"].append(place_info)
-    
-    # 3. Budget Agent 결과 추출 (메뉴 정보는 중요하므로 전체 포함)
-    budget_pattern = r'\[Budget Agent 결과\](.*?)(?=\n\n\[|$)'
-    budget_matches = re.findall(budget_pattern, tool_trace, re.DOTALL)
-    if budget_matches:
-        budget_content = budget_matches[-1]
-        
-        # 식당명 추출 (여러 패턴 지원)
-        restaurant_match = re.search(r'(?:\*\*식당\*\*|식당)[:\s]+([^\n]+)', budget_content)
-        if restaurant_match:
-            key_info["budget_results"]["restaurant"] = restaurant_match.group(1).strip()
-        
-        # 메뉴 목록 추출 (여러 패턴 지원)
-        menu_patterns = [
-            r'(?:선택 메뉴|메뉴 목록)[:\s]*(.*?)(?=\*\*계산식|\*\*총 예산|이 정보|이 메뉴|$)',
-            r'메뉴 목록[:\s]*(.*?)(?=\*\*계산식|\*\*총 예산|이 정보|이 메뉴|$)',
-        ]
-        menu_items = []
-        for menu_pattern in menu_patterns:
-            menu_match = re.search(menu_pattern, budget_content, re.DOTALL)
-            if menu_match:
-                menu_text = menu_match.group(1).strip()
-                # 메뉴 항목 파싱
-                for line in menu_text.split('\n'):
-                    line = line.strip()
-                    if line and (line.startswith('-') or line.startswith('*')):
-                        menu_items.append(line)
-                if menu_items:
-                    break
-        
-        if menu_items:
-            key_info["budget_results"]["menu_items"] = menu_items
-        
-        # 계산식 추출
-        calc_match = re.search(r'(?:\*\*계산식\*\*|계산식)[:\s]+([^\n]+)', budget_content)
-        if calc_match:
-            key_info["budget_results"]["calculation"] = calc_match.group(1).strip()
-        
-        # 총 예산 추출
-        total_match = re.search(r'(?:\*\*총 예산\*\*|총 예산)[:\s]+([^\n]+)', budget_content)
-        if total_match:
-            key_info["budget_results"]["total_budget"] = total_match.group(1).strip()
-    
+
+    for hit in _unique_by_name(state.get("search_hits") or [])[:5]:
+        restaurant_info = {"index": hit.rank, "name": hit.name}
+        if hit.rating is not None:
+            restaurant_info["rating"] = hit.rating
+            restaurant_info["review_count"] = hit.votes or 0
+        key_info["search_results"].append(restaurant_info)
+
+    for detail in _unique_by_name(state.get("place_details") or [], key="query_name")[:5]:
+        if detail.error:
+            continue
+        place_info = {"name": detail.name}
+        if detail.address:
+            place_info["address"] = detail.address
+        if detail.rating is not None:
+            place_info["rating"] = detail.rating
+            place_info["review_count"] = detail.user_ratings_total
+        if detail.phone_number:
+            place_info["phone"] = detail.phone_number
+        key_info["places_results"].append(place_info)
+
+    quotes = state.get("menu_quotes") or []
+    if quotes:
+        quote = quotes[-1]
+        key_info["budget_results"] = {
+            "restaurant": quote.restaurant,
+            "menu_items": quote.menu_lines(),
+        }
+
     return key_info
 
 
 def update_session_memory(state: AgentState) -> None:
     """
     한 턴이 끝났을 때 세션 단위 메모리/프로필/직전 추천을 업데이트한다.
-    tool_trace를 섹션별로 파싱하여 핵심 정보만 추출하여 저장합니다.
+    툴 결과 레코드(search_hits / place_details / menu_quotes)에서 핵심 정보만 추출하여 저장합니다.
     """
-    session = state.get("session_memory") or {}
+    session = dict(state.get("session_memory") or {})
 
     user_query = state.get("user_query", "")
     final_answer = state.get("final_answer", "")
-    tool_trace = state.get("tool_trace", "")
 
     # 직전 턴 요약 정보
     session["last_user_query"] = user_query
@@ -216,8 +257,8 @@ def update_session_memory(state: AgentState) -> None:
     else:
         session["last_final_answer"] = final_answer
     
-    # tool_trace를 섹션별로 파싱하여 핵심 정보만 추출
-    key_info = _extract_key_info_from_tool_trace(tool_trace)
+    # 툴 결과 레코드에서 핵심 정보만 추출
+    key_info = _key_info_from_records(state)
     session["last_tool_trace_summary"] = key_info
     
     # final_answer에서 추천된 식당 목록 추출 (last_reco)
@@ -269,18 +310,15 @@ def update_session_memory(state: AgentState) -> None:
     
     session["last_reco"] = last_reco
 
-    # 최근 턴 리스트(recent_turns)에 현재 턴 추가 (최대 5개 유지)
-    recent_turns = session.get("recent_turns") or []
+    # 최근 턴 리스트(recent_turns)에 현재 턴 추가 (오래된 턴은 compact_session_memory가 digest로 접음)
+    recent_turns = list(session.get("recent_turns") or [])
     current_turn = {
         "user_query": user_query,
         "final_answer": session.get("last_final_answer", ""),
         "tool_trace_summary": key_info,
         "last_reco": last_reco,
     }
-    recent_turns.append(current_turn)
-    # 뒤에서부터 최대 5개만 유지
-    if len(recent_turns) > 5:
-        recent_turns = recent_turns[-5:]
+    recent_turns.append(compact_turn(current_turn))
     session["recent_turns"] = recent_turns
 
     # 디버깅용 로그
@@ -302,12 +340,11 @@ def update_session_memory(state: AgentState) -> None:
     if key_info.get("budget_results", {}).get("restaurant"):
         budget = key_info["budget_results"]
         summary_parts.append(f"[예산 정보] 식당: {budget.get('restaurant')}")
-        if budget.get("total_budget"):
-            summary_parts.append(f"  총 예산: {budget['total_budget']}")
     
     session["last_tool_trace"] = "\n".join(summary_parts) if summary_parts else ""
 
-    state["session_memory"] = session
+    # 턴 수 / 바이트 예산 안으로 압축
+    state["session_memory"] = compact_session_memory(session)
 
 
 
@@ -370,6 +407,11 @@ def coordinator_node(state: AgentState) -> AgentState:
                 # final_answer에서 핵심 정보만 추출 (식당명, 메뉴 등)
                 content += f"\n이전 답변 요약:\n{last_final_answer[:500]}\n"
 
+        # recent_turns에서 밀려난 더 이전 턴들의 요약
+        digest = render_digest(session_memory)
+        if digest:
+            content += f"\n{digest}\n"
+
     messages = [
         SystemMessage(content=system_prompt + "\n\n" + instruct),
         HumanMessage(content=content),
@@ -390,15 +432,75 @@ def coordinator_node(state: AgentState) -> AgentState:
             f"[사용자 질문]\n{user_query}\n"
         )
 
-    state["core_plan"] = plan
-    _append_history(state, "coordinator", plan)
     logger.info("[Coordinator] plan: %s", plan[:200])
-    return state
+    return {
+        "core_plan": plan,
+        # 이번 턴(또는 재시도)의 sub agent 결과는 새로 모은다
+        "tool_sections": None,
+        "search_hits": None,
+        "place_details": None,
+        "menu_quotes": None,
+        "history": _history_entry("coordinator", plan),
+    }
 
 
 # ---------------- Planner ----------------
 
 
+# 키워드 기반 sub agent 선택
+BUDGET_KEYWORDS = ["예산", "비용", "가격", "돈", "얼마", "계산"]
+SEARCH_KEYWORDS = ["맛집", "식당", "추천", "찾아", "검색", "근처"]
+REVIEW_KEYWORDS = ["리뷰", "평점", "후기", "어때", "추천할만", "정보"]
+SPECIFIC_RESTAURANT_KEYWORDS = ["텐동야", "파스타노바", "비스트로온", "돈카츠모노", "김치찌개연구소"]
+
+
+def plan_sub_agents(user_query: str, subtask: str, tool_mode: str) -> Dict[str, List[str]]:
+    """
+    이번 턴에 실행할 sub agent와 각 agent가 기다려야 하는 agent를 정한다.
+
+    - search_agent → places_agent: places는 검색된 식당 이름이 필요하므로 search 뒤에 실행
+    - budget_agent: 메뉴 DB만 사용하므로 search와 동시에 실행
+      (특정 식당이 명시된 경우만 places 결과를 보고 실행)
+
+    Returns:
+        {agent 이름: [먼저 끝나야 하는 agent 이름, ...]}
+    """
+    user_query = (user_query or "").lower()
+    subtask = (subtask or "").lower()
+    tool_mode = tool_mode or "mixed"
+
+    def mentions(keywords: List[str]) -> bool:
+        return any(k in user_query for k in keywords) or any(k in subtask for k in keywords)
+
+    needs_budget = tool_mode == "budget" or "budget" in tool_mode or mentions(BUDGET_KEYWORDS)
+    needs_search = mentions(SEARCH_KEYWORDS)
+    needs_review = mentions(REVIEW_KEYWORDS)
+    has_specific_restaurant = mentions(SPECIFIC_RESTAURANT_KEYWORDS)
+
+    plan: Dict[str, List[str]] = {}
+
+    # 1. 특정 식당이 명시된 경우 → places_agent부터, 예산은 places 결과를 보고 계산
+    if has_specific_restaurant:
+        plan["places_agent"] = []
+        if needs_budget:
+            plan["budget_agent"] = ["places_agent"]
+        return plan
+
+    # 2. 예산 계산 (다른 agent와 병렬)
+    if needs_budget:
+        plan["budget_agent"] = []
+
+    # 3. 일반 맛집 검색 → search 후 places로 상세 정보 보강 (아무것도 해당 없으면 기본값)
+    if needs_search or not (needs_budget or needs_review):
+        plan["search_agent"] = []
+        plan["places_agent"] = ["search_agent"]
+    # 4. 리뷰만 필요한 경우 → 직전 턴 결과로 places_agent
+    elif needs_review:
+        plan["places_agent"] = []
+
+    return plan
+
+
 def planner_node(state: AgentState) -> AgentState:
     """
     core_plan + user_query를 보고,
@@ -534,10 +636,15 @@ def planner_node(state: AgentState) -> AgentState:
     
     logger.info("[Planner] 최종 결과 - tool_mode: %s, subtask: %s", tool_mode, subtask[:100])
 
-    state["tool_mode"] = tool_mode
-    state["subtask"] = subtask
-    _append_history(state, "planner", f"tool_mode={tool_mode}\nsubtask={subtask}")
-    return state
+    agent_plan = plan_sub_agents(user_query, subtask, tool_mode)
+    logger.info("[Planner] 실행 계획: %s", agent_plan)
+
+    return {
+        "tool_mode": tool_mode,
+        "subtask": subtask,
+        "agent_plan": agent_plan,
+        "history": _history_entry("planner", f"tool_mode={tool_mode}\nsubtask={subtask}\nagent_plan={agent_plan}"),
+    }
 
 
 # ---------------- Sub Agents (ReAct) ----------------
@@ -545,10 +652,13 @@ def planner_node(state: AgentState) -> AgentState:
 # Sub Agent용 LLM (tool use를 지원하는 모델 필요)
 sub_agent_llm = get_llm(model_name=os.getenv("TOOL_LLM_MODEL", "openai/gpt-4o-mini"))
 
+# Sub Agent는 노드 안에서 한 번 실행하고 결과만 state에 담으므로 checkpoint를 남기지 않는다.
+# (checkpointer=False가 아니면 부모 checkpointer를 이어받아 "search_agent:<task-id>" 같은 하위 namespace가 턴마다 쌓인다)
+
 
 # ---------------- Search Agent ----------------
 
-search_agent = create_react_agent(sub_agent_llm, [es_search_tool])
+search_agent = create_react_agent(sub_agent_llm, [es_search_tool], checkpointer=False)
 
 
 def search_agent_node(state: AgentState) -> AgentState:
@@ -579,37 +689,56 @@ def search_agent_node(state: AgentState) -> AgentState:
     final_msg = result["messages"][-1]
     trace = final_msg.content
     
-    # 기존 tool_trace에 추가 (여러 sub agent 결과를 합치기 위해)
-    existing_trace = state.get("tool_trace", "")
-    if existing_trace:
-        state["tool_trace"] = existing_trace + "\n\n[Search Agent 결과]\n" + trace
-    else:
-        state["tool_trace"] = "[Search Agent 결과]\n" + trace
-    
-    _append_history(state, "search_agent", trace)
+    # es_search_tool이 텍스트와 함께 넘긴 식당 목록 (places 단계에서 좌표를 그대로 사용)
+    search_hits = _tool_artifacts(result["messages"], es_search_tool)
     
     # 전체 trace를 로그에 출력
     logger.info("[SearchAgent] ===== 전체 Trace 시작 (총 %d자) =====", len(trace))
     logger.info("[SearchAgent] 전체 내용:\n%s", trace)
     logger.info("[SearchAgent] ===== 전체 Trace 종료 =====")
+    logger.info("[SearchAgent] 검색된 식당 %d개", len(search_hits))
     
-    return state
+    # 다른 sub agent 결과와는 tool_sections reducer로 합쳐진다
+    return {
+        "search_hits": search_hits,
+        "tool_sections": {"search_agent": trace},
+        "history": _history_entry("search_agent", trace),
+    }
 
 
 # ---------------- Places Agent ----------------
 
-places_agent = create_react_agent(sub_agent_llm, [google_places_tool, google_places_by_location_tool])
+places_agent = create_react_agent(sub_agent_llm, [google_places_tool, google_places_by_location_tool], checkpointer=False)
+
+# 이번 턴 검색 결과 중 상세 정보를 일괄 조회할 최대 식당 수
+PLACES_ENRICH_LIMIT = int(os.getenv("PLACES_ENRICH_LIMIT", "5"))
 
 
 def places_agent_node(state: AgentState) -> AgentState:
     """
     Google Places 정보를 가져오는 Sub Agent.
-    google_places_tool 또는 google_places_by_location_tool을 사용합니다.
+
+    - 이번 턴에 search_agent가 식당을 찾았으면: 검색된 식당들의 상세 정보를 LLM 없이 병렬로 한 번에 조회
+    - 그 외 (후속 질문, 특정 식당 질문, 일괄 조회 실패): google_places_tool 또는
+      google_places_by_location_tool을 사용하는 ReAct agent
     """
+    sections = state.get("tool_sections") or {}
+    if "search_agent" in sections and state.get("search_hits"):
+        trace, details = enrich_search_hits(state["search_hits"], limit=PLACES_ENRICH_LIMIT)
+        succeeded = sum(1 for detail in details if not detail.error)
+        if succeeded:
+            logger.info("[PlacesAgent] 검색 결과 %d개 식당 상세 정보 일괄 조회 완료", succeeded)
+            return {
+                "place_details": details,
+                "tool_sections": {"places_agent": trace},
+                "history": _history_entry("places_agent", trace),
+            }
+        logger.warning("[PlacesAgent] 일괄 조회 실패, ReAct agent로 진행")
+
     user_query = state["user_query"]
     core_plan = state.get("core_plan", "")
     subtask = state.get("subtask", "")
-    tool_trace = state.get("tool_trace", "")  # search_agent 결과가 있을 수 있음
+    tool_trace = _reference_trace(state)  # search_agent 결과가 있을 수 있음
     
     system_prompt = apply_prompt_template("places_agent")
     
@@ -634,26 +763,21 @@ def places_agent_node(state: AgentState) -> AgentState:
     final_msg = result["messages"][-1]
     trace = final_msg.content
     
-    # 기존 tool_trace에 추가
-    existing_trace = state.get("tool_trace", "")
-    if existing_trace:
-        state["tool_trace"] = existing_trace + "\n\n[Places Agent 결과]\n" + trace
-    else:
-        state["tool_trace"] = "[Places Agent 결과]\n" + trace
-    
-    _append_history(state, "places_agent", trace)
-    
     # 전체 trace를 로그에 출력
     logger.info("[PlacesAgent] ===== 전체 Trace 시작 (총 %d자) =====", len(trace))
     logger.info("[PlacesAgent] 전체 내용:\n%s", trace)
     logger.info("[PlacesAgent] ===== 전체 Trace 종료 =====")
     
-    return state
+    return {
+        "place_details": _tool_artifacts(result["messages"], google_places_tool, google_places_by_location_tool),
+        "tool_sections": {"places_agent": trace},
+        "history": _history_entry("places_agent", trace),
+    }
 
 
 # ---------------- Budget Agent ----------------
 
-budget_agent = create_react_agent(sub_agent_llm, [calculator_tool, menu_price_tool])
+budget_agent = create_react_agent(sub_agent_llm, [calculator_tool, menu_price_tool], checkpointer=False)
 
 
 def budget_agent_node(state: AgentState) -> AgentState:
@@ -664,7 +788,7 @@ def budget_agent_node(state: AgentState) -> AgentState:
     user_query = state["user_query"]
     core_plan = state.get("core_plan", "")
     subtask = state.get("subtask", "")
-    tool_trace = state.get("tool_trace", "")  # search_agent나 places_agent 결과가 있을 수 있음
+    tool_trace = _reference_trace(state)  # search_agent나 places_agent 결과가 있을 수 있음
     session_memory = state.get("session_memory", {})
     
     system_prompt = apply_prompt_template("budget_agent")
@@ -675,27 +799,18 @@ def budget_agent_node(state: AgentState) -> AgentState:
         f"[이번 턴 서브태스크]\n{subtask}\n\n"
     )
     
-    # tool_trace에서 식당명 추출하여 명시적으로 제공
-    restaurant_names = []
     if tool_trace:
-        # Search Agent 결과에서 식당명 추출
-        search_pattern = r'\[Search Agent 결과\].*?\[(\d+)\]\s+([^\n(]+?)(?:\s*\([^)]+\))?'
-        search_matches = re.findall(search_pattern, tool_trace, re.DOTALL)
-        for idx, name in search_matches:
-            name = name.strip()
-            if name and name not in restaurant_names:
-                restaurant_names.append(name)
-        
-        # Places Agent 결과에서 식당명 추출
-        places_pattern = r'\[Google Places 상세 정보\]\s*([^\n]+)'
-        places_matches = re.findall(places_pattern, tool_trace)
-        for name in places_matches:
-            name = name.strip()
-            if name and name not in restaurant_names:
-                restaurant_names.append(name)
-        
         content += f"[이전 검색 결과 (참고용)]\n{tool_trace}\n\n"
     
+    # 이번 턴 툴 결과 레코드에서 식당명을 가져와 명시적으로 제공 (검색 순위 → Places 순)
+    restaurant_names = []
+    for hit in sorted(state.get("search_hits") or [], key=lambda h: h.rank):
+        if hit.name and hit.name not in restaurant_names:
+            restaurant_names.append(hit.name)
+    for detail in state.get("place_details") or []:
+        if not detail.error and detail.name not in restaurant_names:
+            restaurant_names.append(detail.name)
+    
     # session_memory에서도 식당명 추출 (last_reco 우선)
     if session_memory:
         # last_reco에서 추천된 식당 목록 추출 (final_answer에서 추출한 것)
@@ -762,21 +877,30 @@ def budget_agent_node(state: AgentState) -> AgentState:
     final_msg = result["messages"][-1]
     trace = final_msg.content
     
-    # 기존 tool_trace에 추가
-    existing_trace = state.get("tool_trace", "")
-    if existing_trace:
-        state["tool_trace"] = existing_trace + "\n\n[Budget Agent 결과]\n" + trace
-    else:
-        state["tool_trace"] = "[Budget Agent 결과]\n" + trace
-    
-    _append_history(state, "budget_agent", trace)
-    
     # 전체 trace를 로그에 출력
     logger.info("[BudgetAgent] ===== 전체 Trace 시작 (총 %d자) =====", len(trace))
     logger.info("[BudgetAgent] 전체 내용:\n%s", trace)
     logger.info("[BudgetAgent] ===== 전체 Trace 종료 =====")
     
-    return state
+    return {
+        "menu_quotes": _tool_artifacts(result["messages"], menu_price_tool),
+        "tool_sections": {"budget_agent": trace},
+        "history": _history_entry("budget_agent", trace),
+    }
+
+
+# ---------------- Merge Results ----------------
+
+
+def merge_results_node(state: AgentState) -> AgentState:
+    """
+    병렬로 실행된 sub agent 결과(tool_sections)를 하나의 tool_trace로 합친다.
+    (builder에서 defer=True로 등록되어 이번 턴의 모든 sub agent가 끝난 뒤 한 번만 실행)
+    """
+    sections = state.get("tool_sections") or {}
+    tool_trace = render_tool_trace(sections)
+    logger.info("[MergeResults] %s 결과 병합 (총 %d자)", list(sections), len(tool_trace))
+    return {"tool_trace": tool_trace}
 
 
 
@@ -799,9 +923,25 @@ def supervisor_node(state: AgentState) -> AgentState:
     
     system_prompt = apply_prompt_template("supervisor")
     
-    # tool_trace가 너무 길면 Budget Agent 결과를 우선 포함하도록 처리
+    # 툴 결과 레코드가 있으면 레코드를 간단한 텍스트로 사용하고,
+    # 레코드로 남지 않는 agent 결과(예산 계산 과정 등)만 텍스트로 덧붙인다.
     MAX_TRACE_LENGTH = 3000
-    if len(tool_trace) > MAX_TRACE_LENGTH:
+    MAX_SECTION_LENGTH = 1500
+    records_text = render_tool_records(state)
+    if records_text:
+        sections = state.get("tool_sections") or {}
+        covered = {
+            "search_agent": bool(state.get("search_hits")),
+            "places_agent": bool(state.get("place_details")),
+        }
+        extra = [
+            f"{header}\n{sections[name][:MAX_SECTION_LENGTH]}"
+            for name, header in TOOL_SECTION_HEADERS.items()
+            if sections.get(name) and not covered.get(name)
+        ]
+        tool_trace_preview = "\n\n".join([records_text, *extra])
+        logger.info("[Supervisor] 툴 결과 레코드 사용: tool_trace %d자 -> %d자", len(tool_trace), len(tool_trace_preview))
+    elif len(tool_trace) > MAX_TRACE_LENGTH:
         # Budget Agent 결과 위치 찾기
         budget_section = tool_trace.find("[Budget Agent 결과]")
         
@@ -867,10 +1007,11 @@ def supervisor_node(state: AgentState) -> AgentState:
             f"툴 실행 결과에서 다음 정보를 확인했습니다:\n{tool_trace[:500]}"
         )
 
-    state["draft_answer"] = draft
-    _append_history(state, "supervisor", draft)
     logger.info("[Supervisor] 완료")
-    return state
+    return {
+        "draft_answer": draft,
+        "history": _history_entry("supervisor", draft),
+    }
 
 
 # ---------------- Evaluator ----------------
@@ -885,7 +1026,6 @@ def evaluator_node(state: AgentState) -> AgentState:
     user_query = state["user_query"]
     draft = state.get("draft_answer", "")
     session_memory = state.get("session_memory", {})
-    tool_trace = state.get("tool_trace", "")
 
     system_prompt = apply_prompt_template("evaluator")
     instruct = (
@@ -920,11 +1060,16 @@ def evaluator_node(state: AgentState) -> AgentState:
             # 이전 답변 요약
             if last_final_answer:
                 content += f"\n이전 답변 요약:\n{last_final_answer[:500]}\n\n"
+
+        # 더 이전 턴 요약 ("아까 그 식당" 같은 지시어 확인용)
+        digest = render_digest(session_memory)
+        if digest:
+            content += f"{digest}\n\n"
     
     # Budget Agent 결과가 있으면 명시적으로 제공
-    if "[Budget Agent 결과]" in tool_trace:
-        budget_section = tool_trace.find("[Budget Agent 결과]")
-        budget_content = tool_trace[budget_section:budget_section + 1000]  # Budget Agent 결과 일부
+    budget_trace = (state.get("tool_sections") or {}).get("budget_agent")
+    if budget_trace:
+        budget_content = f"{TOOL_SECTION_HEADERS['budget_agent']}\n{budget_trace}"[:1000]  # Budget Agent 결과 일부
         content += f"[도구 실행 결과 (참고용)]\n{budget_content}\n\n"
     
     content += f"[초안 답변]\n{draft}"
@@ -944,19 +1089,18 @@ def evaluator_node(state: AgentState) -> AgentState:
 
         # loop_count 업데이트
         loop = state.get("loop_count", 0) + 1
-        state["loop_count"] = loop
 
         # 더 이상 재수정 시도 X → 지금 draft를 최종 답변으로 사용
-        state["needs_revision"] = False
-        state["eval_feedback"] = f"LLM 평가 중 오류 발생: {e}"
-        state["final_answer"] = draft or "죄송합니다. 현재 답변을 평가하는 데 문제가 발생했습니다."
-
-        _append_history(
-            state,
-            "evaluator",
-            f"[ERROR] LLM 호출 실패, draft를 그대로 최종으로 사용\nerror={e}",
-        )
-        return state
+        return {
+            "loop_count": loop,
+            "needs_revision": False,
+            "eval_feedback": f"LLM 평가 중 오류 발생: {e}",
+            "final_answer": draft or "죄송합니다. 현재 답변을 평가하는 데 문제가 발생했습니다.",
+            "history": _history_entry(
+                "evaluator",
+                f"[ERROR] LLM 호출 실패, draft를 그대로 최종으로 사용\nerror={e}",
+            ),
+        }
 
 
     needs_revision = False
@@ -995,29 +1139,28 @@ def evaluator_node(state: AgentState) -> AgentState:
 
     # loop_count 업데이트
     loop = state.get("loop_count", 0) + 1
-    state["loop_count"] = loop
+    update: AgentState = {"loop_count": loop}
 
     # 너무 많이 루프 돌면 강제로 종료 (최대 2번: 첫 실행 + 재시도 1번)
     if loop >= 2:
         needs_revision = False
         logger.info("[Evaluator] 최대 루프 횟수(2번) 도달, 강제 종료")
 
-    state["needs_revision"] = needs_revision
-    state["eval_feedback"] = feedback
+    update["needs_revision"] = needs_revision
+    update["eval_feedback"] = feedback
 
     if not needs_revision:
         # 최종 답변 확정
-        state["final_answer"] = draft
+        update["final_answer"] = draft
         logger.info("[Evaluator] 최종 답변 확정: %s", draft[:200])
     else:
         logger.info("[Evaluator] 재검토 필요, coordinator로 복귀. feedback: %s", feedback[:200])
 
-    _append_history(
-        state,
+    update["history"] = _history_entry(
         "evaluator",
         f"needs_revision={needs_revision}\nfeedback={feedback}",
     )
-    return state
+    return update
 
 
 # ---------------- Final Output ----------------
@@ -1030,6 +1173,8 @@ def final_output_node(state: AgentState) -> AgentState:
     """
     final_answer = state.get("final_answer", "")
     user_query = state.get("user_query", "")
+    # 이번 턴 툴 결과 레코드는 session_memory에 요약한 뒤 비운다 (checkpoint 크기 유지)
+    update: AgentState = {"search_hits": None, "place_details": None, "menu_quotes": None}
     
     if final_answer:
         # LLM을 사용해서 가독성 좋게 정리 (질문과 관련된 정보만 포함)
@@ -1053,10 +1198,12 @@ def final_output_node(state: AgentState) -> AgentState:
             formatted_answer = resp.content
             
             # 포맷팅된 답변을 state에 저장 (LangGraph Studio에서 확인 가능)
-            state["final_answer"] = formatted_answer
+            update["final_answer"] = formatted_answer
 
             # 세션 단위 메모리 업데이트
-            update_session_memory(state)
+            turn_state = {**state, "final_answer": formatted_answer}
+            update_session_memory(turn_state)
+            update["session_memory"] = turn_state["session_memory"]
             
             # 터미널에 출력
             print("\n" + "="*80)
@@ -1077,4 +1224,4 @@ def final_output_node(state: AgentState) -> AgentState:
         print("\n[경고] final_answer가 설정되지 않았습니다.\n")
         logger.warning("[FinalOutput] final_answer가 없습니다.")
     
-    return state
+    return update
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 모듈 import 시점에 읽는 환경변수 (외부 서비스 없이 테스트가 돌도록)
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("EMBEDDING_CACHE_DB", "")
+os.environ.setdefault("NAME_INDEX_FROM_ES", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+
+import pytest
+
+from tools.admission import AdmissionController, AdmissionRejected, RequestWork, TrackingExecutor
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_queue_full_rejects_with_429():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        await controller.acquire("a")
+        waiting = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire("c")
+        assert exc.value.status_code == 429
+        assert exc.value.retry_after >= 1
+
+        controller.release("a")
+        await waiting
+        assert controller.stats()["rejected_queue_full"] == 1
+
+    run(scenario())
+
+
+def test_queue_timeout_rejects_with_503():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=0.05)
+        await controller.acquire("a")
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire("b")
+        assert exc.value.status_code == 503
+
+        stats = controller.stats()
+        assert stats["rejected_timeout"] == 1
+        assert stats["queued"] == 0
+        assert stats["in_flight"] == 1
+
+    run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=5)
+        await controller.acquire("a")
+        waiting = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        stats = controller.stats()
+        assert stats["cancelled"] == 1
+        assert stats["queued"] == 0
+
+        # 취소된 요청에 슬롯이 넘어가지 않고 다음 요청이 바로 실행된다
+        controller.release("a")
+        assert await controller.acquire("c") == 0.0
+        assert controller.stats()["in_flight"] == 1
+
+    run(scenario())
+
+
+def test_sessions_are_served_round_robin():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10, queue_timeout=5)
+        await controller.acquire("holder")
+
+        order = []
+
+        async def request(session: str):
+            async with controller.slot(session):
+                order.append(session)
+
+        # 세션 a가 먼저 세 개를 보내도 b, c와 번갈아 실행된다
+        tasks = []
+        for session in ["a", "a", "a", "b", "c"]:
+            tasks.append(asyncio.create_task(request(session)))
+            await asyncio.sleep(0)
+
+        controller.release("holder")
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c", "a", "a"]
+
+    run(scenario())
+
+
+def test_slot_releases_on_error():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=5)
+        with pytest.raises(RuntimeError):
+            async with controller.slot("a"):
+                raise RuntimeError("boom")
+
+        stats = controller.stats()
+        assert stats["in_flight"] == 0
+        assert stats["completed"] == 1
+
+    run(scenario())
+
+
+def test_release_after_waits_for_executor_work_past_timeout():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(TrackingExecutor(max_workers=2))
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=5)
+        finished = threading.Event()
+        gate = threading.Event()
+
+        def sync_node():
+            gate.wait(5)
+            finished.set()
+
+        await controller.acquire("a")
+        work = RequestWork()
+        with pytest.raises(asyncio.TimeoutError):
+            with work.track():
+                await asyncio.wait_for(loop.run_in_executor(None, sync_node), timeout=0.05)
+
+        # 응답은 시간 초과로 끝났지만 스레드의 노드가 돌고 있으므로 슬롯을 잡아 둔다
+        controller.release_after(work, "a")
+        assert controller.stats()["in_flight"] == 1
+        assert controller.stats()["draining"] == 1
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("b")
+
+        gate.set()
+        for _ in range(100):
+            if controller.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert finished.is_set()
+        assert controller.stats()["in_flight"] == 0
+        assert controller.stats()["draining"] == 0
+
+    run(scenario())
+
+
+def test_release_after_without_pending_work_releases_now():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=5)
+        await controller.acquire("a")
+        controller.release_after(RequestWork(), "a")
+        assert controller.stats()["in_flight"] == 0
+
+    run(scenario())
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from tools.cache import SqliteStore, TTLCache, normalize_cache_text
+
+
+def _rows(path, table):
+    with sqlite3.connect(str(path)) as conn:
+        return [row[0] for row in conn.execute(f"SELECT key FROM {table} ORDER BY created_at")]
+
+
+def test_memory_lru_and_ttl():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # b가 가장 오래 사용하지 않은 항목
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_disk_store_survives_restart(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    TTLCache(sqlite_path=path, table="t").set("k", "v")
+    cache = TTLCache(sqlite_path=path, table="t")
+    assert cache.get("k") == "v"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_rows_capped_oldest_first(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    store = SqliteStore(path, "t", max_rows=100)
+    for i in range(250):
+        store.set(f"k{i}", b"x", created_at=float(i))
+    store.close()
+
+    keys = _rows(path, "t")
+    assert len(keys) <= 100 + 1
+    assert keys[-1] == "k249"
+    assert "k0" not in keys
+
+    # 다시 열면 정확히 max_rows로 맞춘다
+    SqliteStore(path, "t", max_rows=50).close()
+    assert _rows(path, "t") == [f"k{i}" for i in range(200, 250)]
+
+
+def test_expired_rows_swept_on_open(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    store = SqliteStore(path, "t")
+    now = time.time()
+    store.set("old", b"x", created_at=now - 1000)
+    store.set("new", b"x", created_at=now)
+    store.close()
+
+    cache = TTLCache(ttl=100, sqlite_path=path, table="t")
+    cache.get("missing")  # 처음 조회할 때 저장소를 연다
+    assert _rows(path, "t") == ["new"]
+
+
+def test_normalize_cache_text():
+    assert normalize_cache_text("  홍대   Udon ") == "홍대 udon"
+    assert normalize_cache_text("Udon", lower=False) == "Udon"
@@ -0,0 +1,55 @@
+from typing import TypedDict
+
+from langgraph.graph import StateGraph, START, END
+
+from graph.checkpoint import MeteredMemorySaver
+
+
+class State(TypedDict):
+    text: str
+
+
+def _build(checkpointer: MeteredMemorySaver):
+    # 노드 안에서 하위 그래프를 invoke하면 부모 checkpointer를 이어받아 "agent:<task-id>" namespace에 저장한다
+    sub = StateGraph(State)
+    sub.add_node("work", lambda state: {"text": state["text"] + "!"})
+    sub.add_edge(START, "work")
+    sub.add_edge("work", END)
+    sub_agent = sub.compile()
+
+    def agent(state: State) -> State:
+        return {"text": sub_agent.invoke({"text": state["text"] * 50})["text"][:10]}
+
+    graph = StateGraph(State)
+    graph.add_node("agent", agent)
+    graph.add_edge(START, "agent")
+    graph.add_edge("agent", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def test_storage_stays_bounded_over_turns():
+    saver = MeteredMemorySaver(keep_last=3)
+    app = _build(saver)
+    config = {"configurable": {"thread_id": "s1"}}
+
+    sizes = []
+    for turn in range(20):
+        app.invoke({"text": f"turn-{turn}"}, config)
+        sizes.append((saver.stats()["checkpoints_stored"], len(saver.blobs), len(saver.writes)))
+
+    assert sizes[-1] == sizes[4]
+    # 남은 checkpoint는 루트 namespace의 최근 keep_last개뿐
+    assert list(saver.storage["s1"]) == [""]
+    assert len(saver.storage["s1"][""]) == 3
+
+
+def test_stats_follow_root_namespace():
+    saver = MeteredMemorySaver(keep_last=3)
+    app = _build(saver)
+    config = {"configurable": {"thread_id": "s1"}}
+    app.invoke({"text": "hello"}, config)
+
+    stats = saver.stats("s1")
+    assert set(stats["channels"]) <= {"text", "__start__", "agent", "branch:to:agent"}
+    assert stats["state_bytes"] == sum(stats["channels"].values())
+    assert stats["checkpoints_stored"] == 3
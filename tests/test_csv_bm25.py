@@ -0,0 +1,73 @@
+import math
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from tools.es_search import CsvBm25Index, _tokenize, get_csv_bm25_index, search_es_csv_bm25
+
+MOCK_CSV = Path(__file__).resolve().parent.parent / "data" / "restaurants_mock.csv"
+
+ROWS = [
+    {"name": "텐동야", "keywords": "덮밥 튀김 덮밥"},
+    {"name": "파스타노바", "keywords": "파스타 크림"},
+    {"name": "돈카츠모노", "keywords": "돈카츠 튀김"},
+    {"name": "김치찌개연구소", "keywords": "찌개"},
+]
+FIELDS = ["name", "keywords"]
+
+
+def _brute_force_bm25(rows, fields, query, k1=1.5, b=0.75):
+    docs = [_tokenize(" ".join(row[f] for f in fields if row.get(f))) for row in rows]
+    avgdl = sum(len(d) for d in docs) / len(docs)
+    scores = {}
+    for term in set(_tokenize(query)):
+        df = sum(1 for d in docs if term in d)
+        if not df:
+            continue
+        idf = math.log((len(docs) - df + 0.5) / (df + 0.5) + 1)
+        for i, d in enumerate(docs):
+            tf = d.count(term)
+            if tf:
+                norm = k1 * (1 - b + b * len(d) / avgdl)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+@pytest.mark.parametrize("query", ["튀김", "덮밥 튀김", "파스타 크림 튀김", "없는단어"])
+def test_scores_match_brute_force(query):
+    index = CsvBm25Index(ROWS, FIELDS)
+    expected = _brute_force_bm25(ROWS, FIELDS, query)
+    assert index.score(_tokenize(query)) == pytest.approx(expected)
+
+
+def test_search_ranks_then_fills_with_zero_score_rows():
+    index = CsvBm25Index(ROWS, FIELDS)
+    ranked = index.search("튀김", size=3)
+    # 텐동야는 문서가 길어서 돈카츠모노보다 낮다
+    assert [doc_id for doc_id, _ in ranked] == [2, 0, 1]
+    assert ranked[2][1] == 0.0
+
+
+def test_index_is_reused_until_csv_changes(tmp_path):
+    csv_path = tmp_path / "restaurants.csv"
+    shutil.copy(MOCK_CSV, csv_path)
+    fields = ["name", "keywords"]
+
+    first = get_csv_bm25_index(csv_path, fields)
+    assert get_csv_bm25_index(csv_path, fields) is first
+
+    with csv_path.open("a", encoding="utf-8") as f:
+        f.write('R999,새 식당,마포구,한식,"국밥",37.5,126.9,"주소","4.0","1","국밥집"\n')
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    rebuilt = get_csv_bm25_index(csv_path, fields)
+    assert rebuilt is not first
+    assert len(rebuilt) == len(first) + 1
+
+
+def test_search_es_csv_bm25_returns_es_like_hits():
+    hits = search_es_csv_bm25("텐동 덮밥", csv_path=MOCK_CSV, size=3)
+    assert hits[0]["source"]["name"] == "홍대 텐동야"
+    assert set(hits[0]) >= {"id", "score", "source"}
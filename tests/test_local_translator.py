@@ -0,0 +1,46 @@
+import pytest
+
+from tools.local_translator import romanize, translate_locally
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("홍대 우동 맛집", "Hongdae udon restaurant"),
+    ("홍대우동맛집", "Hongdae udon restaurant"),
+    ("인도 음식 추천해줘", "Indian food"),
+    ("합정역 근처 라멘", "Hapjeong Station near ramen"),
+    ("국밥집 추천", "gukbap restaurant"),
+    ("와인바 추천", "wine bar"),
+    ("탄두리 난 맛집", "tandoori naan restaurant"),
+])
+def test_covered_queries_skip_llm(query, expected):
+    result = translate_locally(query)
+    assert result.covered
+    assert result.text == expected
+
+
+@pytest.mark.parametrize("query, residual", [
+    # "난" = 나는, "바차"는 음식 문맥이 없으므로 한 글자 음식 단어로 번역하지 않는다
+    ("이태원에서 난 먹고 싶어", ["난"]),
+    ("바차", ["바차"]),
+    ("차 마시기 좋은 카페", ["차", "마시기"]),
+])
+def test_single_syllable_food_words_need_food_context(query, residual):
+    result = translate_locally(query)
+    assert result.residual == residual
+    assert not result.covered
+
+
+def test_unknown_place_stem_stays_residual():
+    # "친구"를 "Chin-gu"로 추측하지 않는다
+    assert translate_locally("친구 맛집").residual == ["친구"]
+
+
+def test_merge_inserts_residual_translation():
+    result = translate_locally("이태원에서 난 먹고 싶어")
+    assert result.merge("I") == "Itaewon I"
+
+
+def test_romanize():
+    assert romanize("망원") == "mangwon"
+    # 받침 뒤 모음은 연음
+    assert romanize("한국어") == "hangugeo"
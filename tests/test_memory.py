@@ -0,0 +1,66 @@
+import graph.memory as memory
+import graph.nodes as nodes
+from graph.memory import compact_session_memory, memory_bytes, render_digest
+
+
+def _turn(i: int, answer_chars: int = 100):
+    return {
+        "user_query": f"질문 {i}",
+        "final_answer": "답" * answer_chars,
+        "last_reco": [{"name": f"식당{i}"}],
+        "tool_trace_summary": "trace " * 50,
+    }
+
+
+def test_append_history_keeps_last_entries(monkeypatch):
+    monkeypatch.setattr(nodes, "HISTORY_MAX_ENTRIES", 3)
+    history = None
+    for i in range(5):
+        history = nodes.append_history(history, [{"role": "agent", "content": str(i)}])
+    assert [entry["content"] for entry in history] == ["2", "3", "4"]
+    # None이 와도 초기화하지 않는다
+    assert nodes.append_history(history, None) == history
+
+
+def test_ring_buffer_folds_old_turns_into_digest(monkeypatch):
+    monkeypatch.setattr(memory, "SESSION_MAX_TURNS", 2)
+    session = {"recent_turns": [_turn(i) for i in range(4)]}
+    compact_session_memory(session)
+
+    assert [turn["user_query"] for turn in session["recent_turns"]] == ["질문 2", "질문 3"]
+    assert session["digest"] == ["- 질문 0 → 추천: 식당0", "- 질문 1 → 추천: 식당1"]
+    assert render_digest(session).startswith("더 이전 대화 요약:")
+
+
+def test_byte_budget_folds_turns_until_within_budget(monkeypatch):
+    monkeypatch.setattr(memory, "SESSION_MAX_TURNS", 10)
+    monkeypatch.setattr(memory, "SESSION_MEMORY_MAX_BYTES", 4000)
+    session = {"recent_turns": [_turn(i, answer_chars=400) for i in range(8)], "last_final_answer": ""}
+    compact_session_memory(session)
+
+    assert memory_bytes(session) <= 4000
+    assert 1 <= len(session["recent_turns"]) < 8
+    # 접힌 턴은 순서대로 digest에 남는다
+    folded = 8 - len(session["recent_turns"])
+    assert session["digest"] == [f"- 질문 {i} → 추천: 식당{i}" for i in range(folded)]
+    assert session["recent_turns"][-1]["user_query"] == "질문 7"
+
+
+def test_byte_budget_trims_last_turn_and_digest(monkeypatch):
+    monkeypatch.setattr(memory, "SESSION_MAX_TURNS", 10)
+    monkeypatch.setattr(memory, "SESSION_MEMORY_MAX_BYTES", 1500)
+    monkeypatch.setattr(memory, "TURN_ANSWER_CHARS", 100)
+    session = {
+        "recent_turns": [_turn(0, answer_chars=100)],
+        "last_final_answer": "답" * 2000,
+        "digest": [f"- 오래된 질문 {i} → 추천: 식당" for i in range(40)],
+    }
+    compact_session_memory(session)
+
+    assert memory_bytes(session) <= 1500
+    # 직전 턴은 남기고 큰 필드만 줄인다
+    assert len(session["recent_turns"]) == 1
+    assert "tool_trace_summary" not in session["recent_turns"][0]
+    assert len(session["last_final_answer"]) <= 103
+    assert session["digest_dropped"] > 0
+    assert session["digest"][-1] == "- 오래된 질문 39 → 추천: 식당"
@@ -0,0 +1,83 @@
+import csv
+import os
+import random
+from pathlib import Path
+
+from tools.menu_columnar import MenuColumns, csv_to_menu_columns, write_menu_columns
+
+MOCK_CSV = Path(__file__).resolve().parent.parent / "data" / "restaurants_menus_mock.csv"
+
+
+def _csv_rows():
+    with MOCK_CSV.open(encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_round_trip(tmp_path):
+    out = csv_to_menu_columns(MOCK_CSV, tmp_path / "menus.columns")
+    columns = MenuColumns(out)
+    rows = _csv_rows()
+    assert len(columns) == len(rows)
+
+    for rid in {row["restaurant_id"] for row in rows}:
+        expected = [row for row in rows if row["restaurant_id"] == rid]
+        got = columns.rows_for_restaurant(rid)
+        assert [r["menu_name"] for r in got] == [r["menu_name"] for r in expected]
+        assert [r["price"] for r in got] == [int(r["price"]) for r in expected]
+        assert [r["is_recommended"] for r in got] == [int(r["is_recommended"] == "Y") for r in expected]
+
+    assert columns.rows_for_restaurant("없는 식당") == []
+
+
+def test_price_stats(tmp_path):
+    columns = MenuColumns(csv_to_menu_columns(MOCK_CSV, tmp_path / "menus.columns"))
+    rows = _csv_rows()
+    rid = rows[0]["restaurant_id"]
+    prices = [int(r["price"]) for r in rows if r["restaurant_id"] == rid]
+
+    stats = columns.price_stats(rid)
+    assert stats["count"] == len(prices)
+    assert (stats["min"], stats["max"]) == (min(prices), max(prices))
+    assert stats["mean"] == sum(prices) / len(prices)
+    assert columns.price_stats()["count"] == len(rows)
+    assert columns.price_stats("없는 식당") is None
+
+
+def test_spilled_chunks_match_stable_sort(tmp_path):
+    # chunk_rows를 작게 잡아 임시 파일 spill + counting sort 경로를 여러 번 거치게 한다
+    rng = random.Random(0)
+    rows = [
+        {
+            "restaurant_id": f"R{rng.randrange(30):03d}",
+            "restaurant_name": "식당",
+            "menu_name": f"메뉴{i}",
+            "price": rng.randrange(1000, 50000),
+            "is_recommended": rng.choice("YN"),
+        }
+        for i in range(1000)
+    ]
+    meta = write_menu_columns(iter(rows), tmp_path / "c", chunk_rows=37)
+    assert meta["rows"] == len(rows)
+    columns = MenuColumns(tmp_path / "c")
+
+    assert len(columns) == len(rows)
+    for rid in {row["restaurant_id"] for row in rows}:
+        expected = [row["menu_name"] for row in rows if row["restaurant_id"] == rid]
+        assert [r["menu_name"] for r in columns.rows_for_restaurant(rid)] == expected
+    assert not list((tmp_path / "c").glob("*.spill.tmp"))
+
+
+def test_is_fresh_for_tracks_source_csv(tmp_path):
+    csv_path = tmp_path / "menus.csv"
+    csv_path.write_bytes(MOCK_CSV.read_bytes())
+    out = csv_to_menu_columns(csv_path)
+    assert out == tmp_path / "menus.columns"
+    assert MenuColumns.is_fresh_for(out, csv_path)
+
+    with csv_path.open("a", encoding="utf-8") as f:
+        f.write("R999,새 식당,새 메뉴,main,1000,N\n")
+    assert not MenuColumns.is_fresh_for(out, csv_path)
+
+    # CSV 없이 컬럼형 데이터만 배포한 경우
+    os.remove(csv_path)
+    assert MenuColumns.is_fresh_for(out, csv_path)
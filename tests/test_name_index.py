@@ -0,0 +1,48 @@
+from tools.name_index import NameIndex, best_name_match
+
+RESTAURANTS = [
+    ("R001", "홍대 텐동야"),
+    ("R002", "홍대 파스타노바"),
+    ("R003", "강남 김치찌개연구소"),
+    ("R004", "연남동 비스트로온"),
+    ("R005", "성수 돈카츠모노"),
+    ("R006", "Le Petit Souffle"),
+]
+
+
+def _index():
+    index = NameIndex()
+    index.add_many(RESTAURANTS)
+    return index
+
+
+def test_exact_name_ignoring_spaces_and_case_scores_one():
+    match = _index().resolve("홍대텐동야")
+    assert (match.id, match.score) == ("R001", 1.0)
+    assert _index().resolve("le petit-souffle").id == "R006"
+
+
+def test_partial_and_variant_spellings_resolve():
+    index = _index()
+    assert index.resolve("텐동야").id == "R001"
+    assert index.resolve("파스타 노바").id == "R002"
+    # 자모 분해형으로 한두 글자 다른 표기도 찾는다
+    assert index.lookup("돈까스모노")[0].id == "R005"
+    # 로마자 표기
+    assert index.lookup("tendongya")[0].id == "R001"
+
+
+def test_lookup_is_ranked_and_limited():
+    matches = _index().lookup("홍대", limit=2, min_score=0.1)
+    assert len(matches) <= 2
+    assert {m.id for m in matches} <= {"R001", "R002"}
+    assert [m.score for m in matches] == sorted((m.score for m in matches), reverse=True)
+
+
+def test_unrelated_query_does_not_resolve():
+    assert _index().resolve("스타벅스") is None
+
+
+def test_best_name_match_returns_position():
+    assert best_name_match("Petit Souffle", ["Cafe Nero", "Le Petit Souffle", "Souffle House"]) == 1
+    assert best_name_match("완전히 다른 이름", ["Cafe Nero"]) is None
@@ -0,0 +1,50 @@
+from graph.nodes import _unique_by_name, append_records, merge_tool_sections, plan_sub_agents
+from tools.records import SearchHit
+
+
+def test_merge_tool_sections_merges_by_agent_and_resets_on_none():
+    sections = merge_tool_sections(None, {"search_agent": "검색"})
+    sections = merge_tool_sections(sections, {"budget_agent": "예산"})
+    assert sections == {"search_agent": "검색", "budget_agent": "예산"}
+
+    # 같은 agent가 다시 실행되면 덮어쓴다
+    assert merge_tool_sections(sections, {"search_agent": "재검색"})["search_agent"] == "재검색"
+    assert merge_tool_sections(sections, None) == {}
+
+
+def test_plan_search_then_places_by_default():
+    assert plan_sub_agents("안녕", "", "mixed") == {"search_agent": [], "places_agent": ["search_agent"]}
+
+
+def test_plan_budget_runs_alongside_search():
+    plan = plan_sub_agents("홍대 맛집 추천하고 2인 예산 계산해줘", "", "mixed")
+    assert plan == {
+        "budget_agent": [],
+        "search_agent": [],
+        "places_agent": ["search_agent"],
+    }
+
+
+def test_plan_budget_only():
+    assert plan_sub_agents("3만원으로 얼마나 먹을 수 있어?", "", "budget") == {"budget_agent": []}
+
+
+def test_plan_review_only_uses_places():
+    assert plan_sub_agents("거기 리뷰 어때?", "", "mixed") == {"places_agent": []}
+
+
+def test_plan_specific_restaurant_waits_for_places():
+    plan = plan_sub_agents("텐동야 가격 알려줘", "", "mixed")
+    assert plan == {"places_agent": [], "budget_agent": ["places_agent"]}
+
+
+def test_append_records_appends_and_resets_on_none():
+    hits = append_records(None, [SearchHit(rank=1, name="a")])
+    hits = append_records(hits, [SearchHit(rank=2, name="b")])
+    assert [hit.name for hit in hits] == ["a", "b"]
+    assert append_records(hits, None) == []
+
+
+def test_unique_by_name_keeps_first_seen_order_with_latest_value():
+    hits = [SearchHit(rank=1, name="a"), SearchHit(rank=2, name="b"), SearchHit(rank=3, name="a")]
+    assert [(hit.name, hit.rank) for hit in _unique_by_name(hits)] == [("a", 3), ("b", 2)]
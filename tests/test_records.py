@@ -0,0 +1,28 @@
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from tools.records import CHECKPOINT_RECORD_TYPES, MenuItem, MenuQuote, PlaceDetail
+
+
+def _round_trip(record):
+    serde = JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_RECORD_TYPES)
+    return serde.loads_typed(serde.dumps_typed(record))
+
+
+def test_place_detail_keeps_tuples_after_checkpoint_round_trip():
+    detail = PlaceDetail.from_place_info("텐동야", {
+        "name": "텐동야",
+        "opening_hours": ["월요일: 11:00~21:00"],
+        "reviews": [{"author_name": "kim", "rating": 5, "text": "맛있어요"}],
+    })
+    restored = _round_trip(detail)
+    assert isinstance(restored.opening_hours, tuple)
+    assert isinstance(restored.reviews, tuple)
+    assert restored == detail
+    assert hash(restored) == hash(detail)
+
+
+def test_menu_quote_keeps_tuples_after_checkpoint_round_trip():
+    quote = MenuQuote(restaurant="텐동야", items=(MenuItem(name="텐동", price=12000, recommended=True),))
+    restored = _round_trip(quote)
+    assert isinstance(restored.items, tuple)
+    assert restored == quote
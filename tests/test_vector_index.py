@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from tools.vector_index import LocalVectorIndex
+
+
+def _clustered(n_clusters=8, per_cluster=50, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    vectors = np.concatenate([c + 0.1 * rng.normal(size=(per_cluster, dim)) for c in centers])
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    return vectors.astype(np.float32), ids
+
+
+def test_exact_search_returns_cosine_top_k():
+    vectors, ids = _clustered()
+    index = LocalVectorIndex(vectors, ids)
+    query = vectors[123]
+
+    results = index.search(query, k=5)
+    assert results[0]["id"] == "doc123"
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_ivf_top1_agrees_with_exact_search():
+    vectors, ids = _clustered()
+    exact = LocalVectorIndex(vectors, ids)
+    ivf = LocalVectorIndex(vectors, ids, nlist=8, nprobe=2)
+    assert ivf.centroids is not None
+
+    rng = np.random.default_rng(1)
+    for position in rng.choice(len(vectors), size=20, replace=False):
+        query = vectors[position] + 0.05 * rng.normal(size=vectors.shape[1])
+        assert ivf.search(query, k=1)[0]["id"] == exact.search(query, k=1)[0]["id"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors, ids = _clustered(n_clusters=4, per_cluster=10, dim=8)
+    sources = [{"restaurant_name": f"식당{i}"} for i in range(len(ids))]
+    index = LocalVectorIndex(vectors, ids, sources=sources, nlist=4)
+    path = tmp_path / "vectors.npz"
+    index.save(path)
+
+    loaded = LocalVectorIndex.load(path)
+    assert loaded.ids == index.ids
+    assert loaded.sources == sources
+    np.testing.assert_array_equal(loaded.centroids, index.centroids)
+    query = vectors[3]
+    before, after = index.search(query, k=3), loaded.search(query, k=3)
+    assert [r["id"] for r in after] == [r["id"] for r in before]
+    assert [r["score"] for r in after] == pytest.approx([r["score"] for r in before], abs=1e-6)
+
+
+def test_dimension_mismatch_raises():
+    index = LocalVectorIndex(np.eye(4, dtype=np.float32), ["a", "b", "c", "d"])
+    with pytest.raises(ValueError):
+        index.search([1.0, 0.0], k=1)
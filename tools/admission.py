@@ -0,0 +1,353 @@
+# tools/admission.py
+
+from __future__ import annotations
+import asyncio
+import logging
+import math
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """
+    요청을 받지 않을 때 발생 (status_code: 429 대기열 가득 참 / 503 대기 시간 초과)
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# 현재 요청의 RequestWork (TrackingExecutor.submit이 읽는다)
+_REQUEST_WORK: ContextVar[Optional["RequestWork"]] = ContextVar("request_work", default=None)
+
+
+class RequestWork:
+    """
+    요청 하나가 TrackingExecutor(이벤트 루프 기본 executor)에 넘긴 작업 중 아직 끝나지 않은 것들.
+
+    그래프를 시간 초과로 취소해도 스레드에서 이미 돌고 있는 동기 노드는 멈추지 않으므로,
+    슬롯을 그 작업이 끝날 때까지 잡아 두는 데 쓴다. (with work.track(): 안에서 만든 task의 작업이 모인다)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+
+    def _add(self, future: Future) -> None:
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    @contextmanager
+    def track(self):
+        token = _REQUEST_WORK.set(self)
+        try:
+            yield self
+        finally:
+            _REQUEST_WORK.reset(token)
+
+    async def wait(self) -> None:
+        """
+        남은 작업이 모두 끝날 때까지 기다린다.
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            await asyncio.wait([asyncio.wrap_future(future) for future in pending])
+
+
+class TrackingExecutor(ThreadPoolExecutor):
+    """
+    제출한 작업을 현재 요청의 RequestWork에 기록하는 ThreadPoolExecutor
+    (loop.run_in_executor는 호출한 task의 context에서 submit하므로 요청별로 구분된다)
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        work = _REQUEST_WORK.get()
+        if work is not None:
+            work._add(future)
+        return future
+
+
+class _Waiter:
+    __slots__ = ("session", "future", "enqueued_at")
+
+    def __init__(self, session: str, future: asyncio.Future, enqueued_at: float):
+        self.session = session
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class AdmissionController:
+    """
+    그래프 실행 수를 제한하는 admission controller (이벤트 루프 하나에서 사용)
+
+    - max_in_flight: 동시에 실행할 그래프 수
+    - max_queue: 기다릴 수 있는 요청 수, 넘으면 바로 429
+    - queue_timeout: 대기 제한 시간(초), 넘으면 503
+    - per_session_limit: 세션 하나가 동시에 실행할 수 있는 그래프 수 (0이면 제한 없음)
+    - fair: True면 세션별 대기열을 번갈아 꺼낸다 (한 세션이 연달아 보낸 요청이 다른 세션을 밀어내지 않도록)
+
+    429/503에는 최근 실행 시간으로 추정한 Retry-After(초)를 함께 준다.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int = 2,
+        per_session_limit: int = 0,
+        fair: bool = True,
+        window: int = 1000,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.per_session_limit = per_session_limit
+        self.fair = fair
+
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._queued = 0
+        self._in_flight = 0
+        self._in_flight_by_session: Dict[str, int] = {}
+        # 응답은 끝났지만 남은 작업을 기다리며 슬롯을 잡고 있는 요청 수
+        self._draining = 0
+        self._drain_tasks: Set[asyncio.Task] = set()
+
+        # 최근 window개 요청의 대기 시간 / 실행 시간 (초)
+        self._queue_times: Deque[float] = deque(maxlen=window)
+        self._service_times: Deque[float] = deque(maxlen=window)
+        self._counters = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "cancelled": 0,
+            "completed": 0,
+        }
+
+    # -------------------------
+    # 슬롯 획득 / 반납
+    # -------------------------
+
+    async def acquire(self, session_id: Optional[str] = None) -> float:
+        """
+        실행 슬롯을 하나 얻는다. (얻을 때까지 기다린 시간(초)을 반환)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나 queue_timeout 안에 슬롯이 나지 않은 경우
+        """
+        session = self._session_key(session_id)
+
+        # 앞에서 기다리는 요청이 없고 빈 슬롯이 있으면 바로 실행
+        if self._can_run(session) and not self._has_runnable_waiter():
+            self._start(session, queue_time=0.0)
+            return 0.0
+
+        if self._queued >= self.max_queue:
+            self._counters["rejected_queue_full"] += 1
+            raise AdmissionRejected(429, "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.", self._retry_after())
+
+        waiter = _Waiter(session, asyncio.get_running_loop().create_future(), time.monotonic())
+        self._queues.setdefault(session, deque()).append(waiter)
+        self._queued += 1
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # 클라이언트가 기다리다 끊은 경우: 이미 슬롯을 받았으면 돌려준다
+            self._counters["cancelled"] += 1
+            if waiter.future.done():
+                self.release(session_id)
+            else:
+                self._remove(waiter)
+            raise
+
+        if not waiter.future.done():
+            self._remove(waiter)
+            self._counters["rejected_timeout"] += 1
+            raise AdmissionRejected(503, "서버가 혼잡합니다. 잠시 후 다시 시도해주세요.", self._retry_after())
+
+        return time.monotonic() - waiter.enqueued_at
+
+    def release(self, session_id: Optional[str] = None, service_time: Optional[float] = None) -> None:
+        """
+        슬롯을 반납하고, 기다리는 요청이 있으면 다음 요청에 넘긴다.
+        """
+        session = self._session_key(session_id)
+        self._in_flight = max(0, self._in_flight - 1)
+        remaining = self._in_flight_by_session.get(session, 0) - 1
+        if remaining > 0:
+            self._in_flight_by_session[session] = remaining
+        else:
+            self._in_flight_by_session.pop(session, None)
+        if service_time is not None:
+            self._service_times.append(service_time)
+            self._counters["completed"] += 1
+        self._dispatch()
+
+    def release_after(self, work: RequestWork, session_id: Optional[str] = None, started: Optional[float] = None) -> None:
+        """
+        work에 남은 작업이 없으면 바로 반납하고, 있으면 모두 끝난 뒤에 반납한다.
+        (시간 초과 응답 후에도 스레드에서 돌던 노드까지 max_in_flight에 포함되도록)
+        """
+        def release() -> None:
+            self.release(session_id, service_time=time.monotonic() - started if started is not None else None)
+
+        if not work.pending:
+            release()
+            return
+
+        async def drain() -> None:
+            try:
+                await work.wait()
+            finally:
+                self._draining -= 1
+                release()
+
+        self._draining += 1
+        task = asyncio.get_running_loop().create_task(drain())
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str] = None):
+        """
+        async with controller.slot(session_id) as queue_time: ...
+        """
+        queue_time = await self.acquire(session_id)
+        started = time.monotonic()
+        try:
+            yield queue_time
+        finally:
+            self.release(session_id, service_time=time.monotonic() - started)
+
+    # -------------------------
+    # 내부 처리
+    # -------------------------
+
+    def _session_key(self, session_id: Optional[str]) -> str:
+        # fair=False면 모든 요청이 하나의 FIFO 대기열을 공유
+        return (session_id or "") if self.fair or self.per_session_limit > 0 else ""
+
+    def _can_run(self, session: str) -> bool:
+        if self._in_flight >= self.max_in_flight:
+            return False
+        if self.per_session_limit > 0 and session:
+            return self._in_flight_by_session.get(session, 0) < self.per_session_limit
+        return True
+
+    def _has_runnable_waiter(self) -> bool:
+        return any(queue and self._can_run(session) for session, queue in self._queues.items())
+
+    def _start(self, session: str, queue_time: float) -> None:
+        self._in_flight += 1
+        self._in_flight_by_session[session] = self._in_flight_by_session.get(session, 0) + 1
+        self._queue_times.append(queue_time)
+        self._counters["admitted"] += 1
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.session)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+            self._queued -= 1
+        except ValueError:
+            pass
+        if not queue:
+            self._queues.pop(waiter.session, None)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """
+        실행 가능한 세션 중 가장 오래 차례를 기다린 세션의 첫 요청
+        (fair=True면 꺼낸 세션을 맨 뒤로 보내서 세션끼리 번갈아 실행)
+        """
+        for session, queue in self._queues.items():
+            if not self._can_run(session):
+                continue
+            waiter = queue.popleft()
+            self._queued -= 1
+            if queue:
+                if self.fair:
+                    self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_in_flight:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            self._start(waiter.session, queue_time=time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _retry_after(self) -> int:
+        """
+        최근 실행 시간(중앙값) x 앞에 있는 요청 수 / 동시 실행 수로 대기 시간을 추정 (최소 retry_after, 최대 60초)
+        """
+        if not self._service_times:
+            return self.retry_after
+        median = statistics.median(self._service_times)
+        estimate = math.ceil(median * (self._queued + 1) / self.max_in_flight)
+        return int(min(max(estimate, self.retry_after), 60))
+
+    # -------------------------
+    # 통계
+    # -------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        현재 실행/대기 수, 누적 카운터, 최근 대기 시간 분포(ms)
+        """
+        queue_times = sorted(self._queue_times)
+
+        def percentile(p: float) -> float:
+            if not queue_times:
+                return 0.0
+            return queue_times[min(len(queue_times) - 1, int(p * len(queue_times)))] * 1000
+
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self._queued,
+            "max_queue": self.max_queue,
+            "queued_sessions": len(self._queues),
+            "draining": self._draining,
+            **self._counters,
+            "queue_time_ms": {
+                "p50": round(percentile(0.5), 1),
+                "p95": round(percentile(0.95), 1),
+                "max": round(queue_times[-1] * 1000, 1) if queue_times else 0.0,
+            },
+            "service_time_s_median": round(statistics.median(self._service_times), 2) if self._service_times else None,
+            "retry_after": self._retry_after(),
+        }
@@ -0,0 +1,64 @@
+# tools/async_http.py
+
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import weakref
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 이벤트 루프 → httpx.AsyncClient
+# 비동기 커넥션은 만든 이벤트 루프에서만 쓸 수 있으므로 루프마다 하나의 클라이언트(=하나의 커넥션 풀)를 공유한다.
+# (FastAPI/uvicorn은 루프가 하나라서 사실상 프로세스 전역 풀)
+_ASYNC_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _env_number(name: str, default: float, cast=float) -> Any:
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _create_async_http_client() -> httpx.AsyncClient:
+    """
+    커넥션 풀 설정을 적용해서 httpx.AsyncClient를 생성한다.
+
+    환경변수:
+    - HTTP_MAX_CONNECTIONS: 전체 동시 커넥션 수 (기본값 100)
+    - HTTP_MAX_KEEPALIVE: keep-alive로 유지할 커넥션 수 (기본값 20)
+    - HTTP_TIMEOUT: 요청 타임아웃(초) (기본값 30)
+    """
+    limits = httpx.Limits(
+        max_connections=_env_number("HTTP_MAX_CONNECTIONS", 100, int),
+        max_keepalive_connections=_env_number("HTTP_MAX_KEEPALIVE", 20, int),
+    )
+    return httpx.AsyncClient(limits=limits, timeout=_env_number("HTTP_TIMEOUT", 30.0))
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    현재 이벤트 루프에서 공유되는 httpx.AsyncClient를 반환한다.
+    (OpenRouter 번역/임베딩, Google Places 비동기 호출이 같은 풀을 사용)
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        logger.info("[async_http] httpx.AsyncClient 생성")
+        client = _create_async_http_client()
+        _ASYNC_HTTP_CLIENTS[loop] = client
+    return client
+
+
+async def aclose_async_http_clients() -> None:
+    """
+    현재 이벤트 루프의 공유 클라이언트를 닫는다.
+    FastAPI 앱 종료(shutdown) 시 호출한다.
+    """
+    client = _ASYNC_HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
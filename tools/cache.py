@@ -0,0 +1,271 @@
+# tools/cache.py
+
+from __future__ import annotations
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_cache_text(text: str, lower: bool = True) -> str:
+    """
+    캐시 키용 텍스트 정규화.
+    - 유니코드 NFC 정규화 (조합형/완성형 한글 차이 제거)
+    - 소문자 변환 (lower=False면 대소문자 유지, 임베딩처럼 결과가 대소문자에 따라 달라지는 경우)
+    - 연속 공백을 하나로
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    if lower:
+        text = text.lower()
+    return " ".join(text.split())
+
+
+class SqliteStore:
+    """
+    TTLCache 뒤에 붙는 로컬 SQLite key-value 저장소.
+    프로세스를 재시작해도 캐시가 유지되도록 한다.
+
+    - max_rows: 최대 행 수 (0이면 제한 없음). 넘으면 created_at이 오래된 행부터 지운다.
+      매 저장마다 세지 않고 max_rows의 1%만큼 쓸 때마다 정리하므로 잠시 그만큼 넘을 수 있다.
+    - ttl: 지정하면 열 때 만료된 행을 한 번에 지운다 (이후에는 조회할 때 지움)
+    """
+
+    def __init__(self, path: str | Path, table: str, max_rows: int = 0, ttl: Optional[float] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.max_rows = max(0, max_rows)
+        self._trim_every = max(1, self.max_rows // 100)
+        self._writes_since_trim = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_created_at ON {self.table} (created_at)"
+            )
+            if ttl is not None:
+                expired = self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at <= ?", (time.time() - ttl,)
+                ).rowcount
+                if expired:
+                    logger.info(f"[SqliteStore] {self.table}: 만료된 {expired}개 행 삭제")
+            self._trim()
+            self._conn.commit()
+
+    def _trim(self) -> int:
+        """
+        max_rows를 넘는 행을 created_at이 오래된 것부터 지운다. (self._lock 안에서 호출, commit은 호출 측)
+        """
+        self._writes_since_trim = 0
+        if not self.max_rows:
+            return 0
+        return self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN "
+            f"(SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        ).rowcount
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: Any, created_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self._writes_since_trim += 1
+            if self.max_rows and self._writes_since_trim >= self._trim_every:
+                self._trim()
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TTLCache:
+    """
+    LRU + TTL 캐시 (thread-safe).
+
+    - maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+    - ttl(초)이 지난 항목은 만료 처리 (None이면 만료 없음)
+    - sqlite_path를 주면 SQLite에 함께 저장해서 재시작 후에도 재사용
+      (encode/decode로 디스크 저장 형식을 지정할 수 있다, 파일은 처음 조회/저장할 때 연다)
+    - max_disk_rows: SQLite에 남길 최대 행 수 (0이면 제한 없음, 오래 저장된 것부터 삭제)
+    - hits / misses 카운터 제공
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        sqlite_path: str | Path | None = None,
+        table: str = "cache",
+        encode: Callable[[Any], Any] = lambda v: v,
+        decode: Callable[[Any], Any] = lambda v: v,
+        max_disk_rows: int = 0,
+    ):
+        self.maxsize = maxsize
+        self.max_disk_rows = max_disk_rows
+        self.ttl = ttl
+        self._encode = encode
+        self._decode = decode
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sqlite_path = sqlite_path
+        self._table = table
+        self._store: Optional[SqliteStore] = None
+        self._store_lock = threading.Lock()
+        self._store_opened = not sqlite_path
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def _get_store(self) -> Optional[SqliteStore]:
+        """
+        SQLite 저장소를 처음 사용할 때 연다 (import만으로 파일/디렉터리를 만들지 않도록)
+        """
+        if self._store_opened:
+            return self._store
+        with self._store_lock:
+            if not self._store_opened:
+                try:
+                    self._store = SqliteStore(
+                        self._sqlite_path, self._table, max_rows=self.max_disk_rows, ttl=self.ttl
+                    )
+                except Exception as e:
+                    # 디스크 저장소를 열 수 없으면 메모리 캐시로만 동작
+                    logger.warning(
+                        f"[TTLCache] SQLite 저장소를 열 수 없어 메모리 캐시만 사용합니다 ({self._sqlite_path}): {e}"
+                    )
+                self._store_opened = True
+        return self._store
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at >= self.ttl
+
+    def _put_memory(self, key: str, value: Any, created_at: float) -> None:
+        # self._lock 안에서 호출
+        self._data[key] = (value, created_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _get_memory(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+        return False, None
+
+    def _get_disk(self, key: str) -> Any:
+        store = self._get_store()
+        if store is not None:
+            row = store.get(key)
+            if row is not None:
+                raw, created_at = row
+                if not self._is_expired(created_at):
+                    value = self._decode(raw)
+                    with self._lock:
+                        self._put_memory(key, value, created_at)
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return value
+                store.delete(key)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get(self, key: str) -> Any:
+        """
+        캐시된 값을 반환한다. 없거나 만료되었으면 None.
+        """
+        found, value = self._get_memory(key)
+        if found:
+            return value
+        return self._get_disk(key)
+
+    def set(self, key: str, value: Any) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._put_memory(key, value, created_at)
+        store = self._get_store()
+        if store is not None:
+            store.set(key, self._encode(value), created_at)
+
+    async def aget(self, key: str) -> Any:
+        """
+        get의 비동기 버전. 메모리에 없을 때의 SQLite 조회(와 첫 연결)는 스레드에서 실행해 이벤트 루프를 막지 않는다.
+        """
+        found, value = self._get_memory(key)
+        if found:
+            return value
+        if not self._sqlite_path:
+            return self._get_disk(key)
+        return await asyncio.to_thread(self._get_disk, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """
+        set의 비동기 버전 (SQLite 저장/commit은 스레드에서 실행)
+        """
+        if not self._sqlite_path:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.disk_hits = 0
+        store = self._get_store()
+        if store is not None:
+            store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "persistent": bool(self._sqlite_path),
+                "max_disk_rows": self.max_disk_rows,
+            }
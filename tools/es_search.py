@@ -1,15 +1,37 @@
 import os
+import re
+import asyncio
 import math
 import csv
+import threading
+import weakref
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+import hashlib
+import heapq
+import httpx
+import numpy as np
 import requests
 
+from .async_http import get_async_http_client
+from .cache import TTLCache, normalize_cache_text
+from .local_translator import CUISINE_MAPPING, translate_locally
+from .vector_index import dense_backend, get_local_vector_index, local_vector_index_loaded
+
 # 기존 ElasticSearch import
 try:
-    from elasticsearch import Elasticsearch
+    from elasticsearch import Elasticsearch, BadRequestError, AuthorizationException
 except ImportError:
     Elasticsearch = None
+    BadRequestError = AuthorizationException = None
+
+# 비동기 ElasticSearch 클라이언트 (elasticsearch[async])
+try:
+    from elasticsearch import AsyncElasticsearch
+except ImportError:
+    AsyncElasticsearch = None
 
 ###########################################
 # 1) 음식 종류 추출 및 매핑 (한식, 일식, 중식 등)
@@ -32,65 +54,9 @@ def extract_cuisine_type(query: str) -> tuple[str | None, str]:
     
     query_lower = query.lower()
     
-    # 국가별 음식 매핑 (한글 → 영어 키워드)
-    cuisine_mapping = {
-        # 한식
-        "한식": "Korean",
-        "한국": "Korean",
-        "한국음식": "Korean",
-        "korean": "Korean",
-        
-        # 일식
-        "일식": "Japanese",
-        "일본": "Japanese",
-        "일본음식": "Japanese",
-        "japanese": "Japanese",
-        
-        # 중식
-        "중식": "Chinese",
-        "중국": "Chinese",
-        "중국음식": "Chinese",
-        "chinese": "Chinese",
-        
-        # 양식 (Western)
-        "양식": "Western",
-        "서양": "Western",
-        "western": "Western",
-        
-        # 유럽음식
-        "유럽": "European",
-        "유럽음식": "European",
-        "european": "European",
-        
-        # 이탈리안
-        "이탈리안": "Italian",
-        "이탈리아": "Italian",
-        "italian": "Italian",
-        
-        # 멕시칸
-        "멕시칸": "Mexican",
-        "멕시코": "Mexican",
-        "mexican": "Mexican",
-        
-        # 태국음식
-        "태국": "Thai",
-        "태국음식": "Thai",
-        "thai": "Thai",
-        
-        # 인도음식
-        "인도": "Indian",
-        "인도음식": "Indian",
-        "indian": "Indian",
-        
-        # 프랑스음식
-        "프랑스": "French",
-        "프랑스음식": "French",
-        "french": "French",
-    }
-    
-    # 쿼리에서 음식 종류 키워드 찾기
+    # 쿼리에서 음식 종류 키워드 찾기 (매핑은 local_translator.CUISINE_MAPPING과 공유)
     detected_cuisine = None
-    for keyword, cuisine_keyword in cuisine_mapping.items():
+    for keyword, cuisine_keyword in CUISINE_MAPPING.items():
         if keyword.lower() in query_lower:
             detected_cuisine = cuisine_keyword
             logger.info(f"[extract_cuisine_type] 음식 종류 감지: '{keyword}' → '{cuisine_keyword}'")
@@ -103,6 +69,133 @@ def extract_cuisine_type(query: str) -> tuple[str | None, str]:
 # 2) 쿼리 번역 (한글 → 영어)
 ###########################################
 
+# 번역 결과 캐시 (LRU + TTL, TRANSLATION_CACHE_DB를 지정하면 SQLite에도 저장)
+# 실패한 번역(원본 반환)은 캐시하지 않는다.
+_TRANSLATION_CACHE = TTLCache(
+    maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("TRANSLATION_CACHE_TTL", "86400")),
+    sqlite_path=os.getenv("TRANSLATION_CACHE_DB") or None,
+    table="translations",
+    max_disk_rows=int(os.getenv("TRANSLATION_CACHE_DB_MAX_ROWS", "100000")),
+)
+
+
+def _translation_cache_key(query: str) -> str:
+    model = os.getenv("BASE_LLM_MODEL", "qwen/qwen3-30b-a3b:free")
+    return f"{model}\x1f{normalize_cache_text(query)}"
+
+
+def get_translation_cache_stats() -> Dict[str, Any]:
+    """번역 캐시 hit/miss 통계"""
+    return _TRANSLATION_CACHE.stats()
+
+
+_OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def _translation_fast_path(query: str, check_cache: bool = True) -> Tuple[str | None, Any]:
+    """
+    LLM 호출 없이 끝낼 수 있는 번역 단계 (동기/비동기 번역에서 공통 사용)
+    check_cache=False면 번역 캐시는 보지 않는다 (비동기 번역은 캐시를 aget으로 따로 조회)
+
+    Returns:
+        (translated, local) 튜플
+        - translated: 바로 반환할 결과 (영어 쿼리 / 로컬 번역 / 캐시), LLM 번역이 필요하면 None
+        - local: 사전/규칙 기반 로컬 번역 결과 (없으면 None)
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    # 이미 영어로 보이면 그대로 반환
+    if all(ord(c) < 128 for c in query):
+        logger.info(f"[translate_query] 이미 영어로 보입니다: '{query}'")
+        return query, None
+
+    # 사전/규칙 기반 로컬 번역 (지명 + 음식 단어로만 된 쿼리는 LLM 호출 없이 처리)
+    local = translate_locally(query) if _env_bool("TRANSLATE_FAST_PATH", True) else None
+    if local is not None and local.covered:
+        logger.info(f"[translate_query] 로컬 번역 완료: '{query}' → '{local.text}'")
+        return local.text, local
+
+    if not check_cache:
+        return None, local
+
+    # 같은 쿼리는 캐시된 번역 결과 사용 (es_search_tool과 search_es에서 중복 호출됨)
+    cached = _TRANSLATION_CACHE.get(_translation_cache_key(query))
+    if cached is not None:
+        logger.info(f"[translate_query] 캐시 사용: '{query}' → '{cached}'")
+        return cached, local
+
+    return None, local
+
+
+def _translation_request(llm_input: str) -> Tuple[Dict[str, str], Dict[str, Any]] | None:
+    """
+    OpenRouter 번역 요청의 (headers, data). OPENROUTER_API_KEY가 없으면 None
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        logger.warning("[translate_query] OPENROUTER_API_KEY가 없어 번역을 건너뜁니다.")
+        return None
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": os.getenv("OPENROUTER_HTTP_REFERER", "https://github.com/langchain-ai/langgraph"),
+        "X-Title": os.getenv("OPENROUTER_APP_NAME", "LangGraph Agent"),
+    }
+
+    # 간단하고 빠른 번역 프롬프트
+    prompt = f"""Translate the following Korean restaurant search query to English. 
+Only return the translated query without any explanation or additional text.
+
+Query: {llm_input}
+
+Translated query:"""
+
+    # BASE_LLM_MODEL 사용 (다른 부분과 동일한 모델로 통일)
+    model = os.getenv("BASE_LLM_MODEL", "qwen/qwen3-30b-a3b:free")
+    logger.info(f"[translate_query] 번역 시작: '{llm_input}' (모델: {model})")
+
+    data = {
+        "model": model,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.1,
+        "max_tokens": 50
+    }
+    return headers, data
+
+
+def _finish_translation(query: str, local: Any, result: Dict[str, Any], store: bool = True) -> str | None:
+    """
+    OpenRouter 응답에서 번역 결과를 꺼내 로컬 번역과 합치고 캐시에 저장한다. (store=False면 저장은 호출 측에서)
+    번역 결과가 비어 있으면 None (실패한 번역은 캐시하지 않음)
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    translated = result.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+
+    # 따옴표 제거
+    translated = translated.strip('"\'')
+
+    if not translated:
+        logger.warning("[translate_query] 번역 결과가 비어있음")
+        return None
+
+    if local is not None:
+        translated = local.merge(translated)
+    logger.info(f"[translate_query] 번역 완료: '{query}' → '{translated}'")
+    if store:
+        _TRANSLATION_CACHE.set(_translation_cache_key(query), translated)
+    return translated
+
+
 def translate_query_to_english(query: str) -> str:
     """
     한글 쿼리를 영어로 번역 (BM25 검색을 위해)
@@ -116,97 +209,418 @@ def translate_query_to_english(query: str) -> str:
     import logging
     logger = logging.getLogger(__name__)
     
-    # 이미 영어로 보이면 그대로 반환
-    if all(ord(c) < 128 for c in query):
-        logger.info(f"[translate_query] 이미 영어로 보입니다: '{query}'")
-        return query
+    translated, local = _translation_fast_path(query)
+    if translated is not None:
+        return translated
+    
+    # LLM에는 사전에 없는 토큰만 보낸다
+    llm_input = " ".join(local.residual) if local is not None else query
+    # LLM 번역 실패 시 사용할 값 (로컬 번역 결과가 있으면 그것을 사용)
+    fallback = local.text if local is not None else query
+    
+    request = _translation_request(llm_input)
+    if request is None:
+        return fallback
+    headers, data = request
     
     try:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if not api_key:
-            logger.warning("[translate_query] OPENROUTER_API_KEY가 없어 번역을 건너뜁니다.")
-            return query
-        
-        # OpenRouter API 엔드포인트 (올바른 URL 사용)
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": os.getenv("OPENROUTER_HTTP_REFERER", "https://github.com/langchain-ai/langgraph"),
-            "X-Title": os.getenv("OPENROUTER_APP_NAME", "LangGraph Agent"),
-        }
-        
-        # 간단하고 빠른 번역 프롬프트
-        prompt = f"""Translate the following Korean restaurant search query to English. 
-Only return the translated query without any explanation or additional text.
+        response = requests.post(_OPENROUTER_CHAT_URL, headers=headers, json=data, timeout=30)
+        response.raise_for_status()
+        return _finish_translation(query, local, response.json()) or fallback
+    except Exception as e:
+        logger.warning(f"[translate_query] 번역 실패 (원본 사용): {str(e)}")
+        return fallback
 
-Query: {query}
 
-Translated query:"""
-        
-        # BASE_LLM_MODEL 사용 (다른 부분과 동일한 모델로 통일)
-        base_model = os.getenv("BASE_LLM_MODEL", "qwen/qwen3-30b-a3b:free")
-        
-        logger.info(f"[translate_query] 번역 시작: '{query}' (모델: {base_model})")
-        
-        # BASE_LLM_MODEL 사용
-        model = base_model
-        last_error = None
-        
-        try:
-            # 한 번만 시도 (BASE_LLM_MODEL 사용)
-            data = {
-                "model": model,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.1,
-                "max_tokens": 50
-            }
-            
-            logger.info(f"[translate_query] 모델 사용: {model}")
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            translated = result.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-            
-            # 따옴표 제거
-            translated = translated.strip('"\'')
-            
-            if translated:
-                logger.info(f"[translate_query] 번역 완료 ({model}): '{query}' → '{translated}'")
-                return translated
-            else:
-                logger.warning(f"[translate_query] 번역 결과가 비어있음 (모델: {model})")
-                return query
-                
-        except requests.exceptions.HTTPError as e:
-            logger.warning(f"[translate_query] HTTP 에러 ({model}): {str(e)}")
-            last_error = str(e)
-        except Exception as e:
-            logger.warning(f"[translate_query] 에러 ({model}): {str(e)}")
-            last_error = str(e)
-        
-        # 실패 시 원본 반환
-        if last_error:
-            logger.warning(f"[translate_query] 번역 실패, 원본 사용. 에러: {last_error}")
-        
-        return query
-            
+###########################################
+# 3) ES 클라이언트 레지스트리 (프로세스 전역 커넥션 풀 공유)
+###########################################
+
+# (host, api_key) → Elasticsearch 클라이언트
+# 검색마다 클라이언트를 새로 만들면 커넥션 풀/TCP·TLS 핸드셰이크가 매번 반복되므로
+# 프로세스 전체에서 하나의 클라이언트(=하나의 커넥션 풀)를 공유한다.
+_ES_CLIENTS: Dict[tuple, Any] = {}
+_ES_LAST_HEALTHCHECK: Dict[tuple, float] = {}
+_ES_CLIENTS_LOCK = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def _create_es_client(host: str, api_key: str | None) -> Elasticsearch:
+    """
+    커넥션 풀 설정을 적용해서 Elasticsearch 클라이언트를 생성한다.
+
+    환경변수:
+    - ES_POOL_SIZE: 노드당 커넥션 수 (기본값 10)
+    - ES_REQUEST_TIMEOUT: 요청 타임아웃(초) (기본값 10)
+    - ES_MAX_RETRIES: 재시도 횟수 (기본값 2)
+    - ES_RETRY_ON_TIMEOUT: 타임아웃 시 재시도 여부 (기본값 true)
+    - ES_HTTP_COMPRESS: 요청/응답 gzip 압축 여부 (기본값 false)
+    """
+    if Elasticsearch is None:
+        raise RuntimeError("Elasticsearch 클라이언트를 생성할 수 없습니다. elasticsearch 패키지가 설치되어 있는지 확인하세요.")
+
+    return Elasticsearch(hosts=[host], api_key=api_key, **_es_client_options())
+
+
+def _es_client_options() -> Dict[str, Any]:
+    """
+    동기/비동기 ES 클라이언트에 공통으로 적용하는 커넥션 풀 설정
+    """
+    return {
+        "connections_per_node": _env_int("ES_POOL_SIZE", 10),
+        "request_timeout": _env_float("ES_REQUEST_TIMEOUT", 10.0),
+        "max_retries": _env_int("ES_MAX_RETRIES", 2),
+        "retry_on_timeout": _env_bool("ES_RETRY_ON_TIMEOUT", True),
+        "http_compress": _env_bool("ES_HTTP_COMPRESS", False),
+        # 풀에 남아있는 커넥션을 재사용하도록 keep-alive 명시
+        "headers": {"Connection": "keep-alive"},
+    }
+
+
+def get_es_client(host: str | None = None, api_key: str | None = None) -> Elasticsearch:
+    """
+    (host, api_key) 단위로 공유되는 Elasticsearch 클라이언트를 반환한다. (thread-safe)
+
+    - 처음 호출될 때만 클라이언트를 생성하고, 이후에는 같은 커넥션 풀을 재사용한다.
+    - ES_HEALTHCHECK_INTERVAL(초, 기본값 60, 0이면 비활성화)마다 ping으로 상태를 확인하고,
+      응답이 없으면 클라이언트를 닫고 새로 만든다.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    host = host or os.getenv("ES_HOST", "http://localhost:9200")
+    api_key = api_key if api_key is not None else os.getenv("ES_API_KEY")
+    key = (host, api_key)
+    healthcheck_interval = _env_float("ES_HEALTHCHECK_INTERVAL", 60.0)
+
+    with _ES_CLIENTS_LOCK:
+        client = _ES_CLIENTS.get(key)
+        now = time.monotonic()
+
+        if client is None:
+            logger.info(f"[get_es_client] ES 클라이언트 생성: {host}")
+            client = _create_es_client(host, api_key)
+            _ES_CLIENTS[key] = client
+            _ES_LAST_HEALTHCHECK[key] = now
+            return client
+
+        # 헬스체크는 한 스레드만 맡는다 (시각을 먼저 기록해서 다른 스레드는 기존 클라이언트를 그대로 사용)
+        needs_check = healthcheck_interval > 0 and now - _ES_LAST_HEALTHCHECK.get(key, 0.0) >= healthcheck_interval
+        if needs_check:
+            _ES_LAST_HEALTHCHECK[key] = now
+
+    if not needs_check:
+        return client
+
+    # ping은 락 밖에서 실행 (응답 없는 ES 때문에 다른 검색 스레드가 락에서 기다리지 않도록)
+    if _ping(client):
+        return client
+
+    logger.warning(f"[get_es_client] ES 헬스체크 실패, 클라이언트 재생성: {host}")
+    new_client = _create_es_client(host, api_key)
+    with _ES_CLIENTS_LOCK:
+        current = _ES_CLIENTS.get(key)
+        if current is client:
+            _ES_CLIENTS[key] = new_client
+        else:
+            # 다른 스레드가 먼저 교체함
+            _close_quietly(new_client)
+            new_client = current
+    if current is client:
+        _close_quietly(client)
+    return new_client
+
+
+def _ping(client: Elasticsearch) -> bool:
+    try:
+        return bool(client.ping())
+    except Exception:
+        return False
+
+
+def _close_quietly(client: Elasticsearch) -> None:
+    try:
+        client.close()
+    except Exception:
+        pass
+
+
+def check_es_health() -> Dict[str, bool]:
+    """
+    등록된 모든 ES 클라이언트에 ping을 보내 상태를 반환한다. {host: 정상 여부}
+    """
+    with _ES_CLIENTS_LOCK:
+        clients = list(_ES_CLIENTS.items())
+    return {host: _ping(client) for (host, _), client in clients}
+
+
+def close_es_clients() -> None:
+    """
+    등록된 모든 ES 클라이언트의 커넥션 풀을 닫는다.
+    FastAPI 앱 종료(shutdown) 시 호출한다.
+    """
+    with _ES_CLIENTS_LOCK:
+        clients = list(_ES_CLIENTS.values())
+        _ES_CLIENTS.clear()
+        _ES_LAST_HEALTHCHECK.clear()
+    for client in clients:
+        _close_quietly(client)
+
+
+###########################################
+# 4) 인덱스 통계 캐시 & 디버깅 모드
+###########################################
+
+# index → {"count": int, "fields": List[str], "updated_at": float}
+# 검색할 때마다 es.count()를 부르지 않도록 TTL 기반으로 캐시하고,
+# 만료되면 백그라운드 스레드에서 갱신한다 (그동안은 이전 값을 사용).
+_INDEX_STATS: Dict[str, Dict[str, Any]] = {}
+_INDEX_STATS_REFRESHING: set = set()
+_INDEX_STATS_LOCK = threading.Lock()
+
+
+def es_debug_enabled() -> bool:
+    """
+    ES_DEBUG=1 일 때만 검색 경로에서 인덱스 진단(문서 개수, 샘플 필드명)을 수행한다.
+    """
+    return _env_bool("ES_DEBUG", False)
+
+
+def _fetch_index_stats(es: Elasticsearch, index: str) -> Dict[str, Any]:
+    count_result = es.count(index=index)
+    sample_res = es.search(index=index, body={"size": 1, "query": {"match_all": {}}})
+    sample_hits = sample_res.get("hits", {}).get("hits", [])
+    fields = list(sample_hits[0]["_source"].keys()) if sample_hits else []
+    return {
+        "count": count_result.get("count", 0),
+        "fields": fields,
+        "updated_at": time.time(),
+    }
+
+
+def _refresh_index_stats(es: Elasticsearch, index: str) -> Dict[str, Any] | None:
+    import logging
+    logger = logging.getLogger(__name__)
+
+    try:
+        stats = _fetch_index_stats(es, index)
+        with _INDEX_STATS_LOCK:
+            _INDEX_STATS[index] = stats
+        return stats
     except Exception as e:
-        logger.warning(f"[translate_query] 번역 실패 (원본 사용): {str(e)}")
-        return query
+        logger.warning(f"[index_stats] 인덱스 통계 갱신 실패 ({index}): {e}")
+        return None
+    finally:
+        with _INDEX_STATS_LOCK:
+            _INDEX_STATS_REFRESHING.discard(index)
+
+
+def get_index_stats(index: str | None = None, es: Elasticsearch | None = None, refresh: bool = False) -> Dict[str, Any] | None:
+    """
+    인덱스 통계(문서 개수, 샘플 필드명)를 캐시에서 반환한다.
+
+    - 캐시가 비어있거나 refresh=True 이면 동기로 조회한다.
+    - ES_INDEX_STATS_TTL(초, 기본값 300)이 지나면 백그라운드에서 갱신하고 이전 값을 반환한다.
+    """
+    index = index or os.getenv("ES_INDEX", "restaurant_docs")
+    es = es or get_es_client()
+    ttl = _env_float("ES_INDEX_STATS_TTL", 300.0)
+
+    with _INDEX_STATS_LOCK:
+        cached = _INDEX_STATS.get(index)
+        is_stale = cached is None or refresh or time.time() - cached["updated_at"] >= ttl
+        start_refresh = is_stale and index not in _INDEX_STATS_REFRESHING
+        if start_refresh:
+            _INDEX_STATS_REFRESHING.add(index)
+
+    if cached is None or refresh:
+        if start_refresh:
+            return _refresh_index_stats(es, index)
+        return cached
+
+    if start_refresh:
+        threading.Thread(target=_refresh_index_stats, args=(es, index), daemon=True).start()
+    return cached
+
+
+def _log_index_stats(es: Elasticsearch, index: str) -> None:
+    import logging
+    logger = logging.getLogger(__name__)
+
+    stats = get_index_stats(index, es=es)
+    if stats is None:
+        return
+    logger.info(f"[search_es] 인덱스 '{index}' 총 문서 개수: {stats['count']:,}개 (캐시)")
+    if stats["count"] == 0:
+        logger.warning(f"[search_es] ⚠️  인덱스에 데이터가 없습니다!")
+
+
+def _log_sample_fields(es: Elasticsearch, index: str) -> None:
+    import logging
+    logger = logging.getLogger(__name__)
+
+    stats = get_index_stats(index, es=es)
+    if stats is None:
+        return
+    if stats["fields"]:
+        logger.info(f"[search_es] 샘플 문서 필드명: {stats['fields'][:10]}")
+    else:
+        logger.warning(f"[search_es] 샘플 문서도 없습니다. 인덱스가 비어있을 수 있습니다.")
 
 
 ###########################################
-# 2) 기존 ES Sparse Search (BM25)
+# 5) 기존 ES Sparse Search (BM25)
 ###########################################
-def get_es_client() -> Elasticsearch:
-    host = os.getenv("ES_HOST", "http://localhost:9200")
-    api_key = os.getenv("ES_API_KEY")
-    return Elasticsearch(hosts=[host], api_key=api_key)
+
+def _build_bm25_body(query: str, size: int, translated_query: str | None = None) -> Tuple[Dict[str, Any], str]:
+    """
+    BM25 검색용 ES 쿼리 body를 만든다.
+    (search_es와 단일 요청 하이브리드 검색에서 같이 사용)
+    translated_query를 주면 번역을 건너뛴다. (비동기 검색에서 미리 번역한 경우)
+
+    Returns:
+        (body, translated_query) 튜플
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    # 음식 종류 추출 (한식, 일식, 중식 등)
+    cuisine_type, _ = extract_cuisine_type(query)
+
+    # 쿼리를 영어로 번역 (데이터가 영어로 되어있을 수 있음)
+    if translated_query is None:
+        translated_query = translate_query_to_english(query)
+
+    if translated_query != query:
+        logger.info(f"[search_es] 번역된 쿼리로 검색: '{query}' → '{translated_query}'")
+
+    # 번역된 쿼리에서도 음식 종류 확인 (번역 후 영어 키워드가 나올 수 있음)
+    if not cuisine_type:
+        cuisine_type, _ = extract_cuisine_type(translated_query)
+
+    # 음식 종류에 맞는 키워드 추가
+    if cuisine_type:
+        logger.info(f"[search_es] {cuisine_type} 음식 검색 감지: cuisines 필드 필터링 적용")
+        # 쿼리에 해당 음식 키워드 추가 (없는 경우)
+        if cuisine_type.lower() not in translated_query.lower():
+            translated_query = f"{cuisine_type} {translated_query}"
+            logger.info(f"[search_es] 쿼리 보강: '{translated_query}'")
+
+    # 실제 필드명에 맞춰 검색 (소문자+언더스코어)
+    # 특정 음식 종류 검색인 경우 cuisines 필드에 해당 키워드가 반드시 포함되어야 함 (must 필터)
+    if cuisine_type:
+        body = {
+            "query": {
+                "bool": {
+                    "must": [
+                        {
+                            "match": {
+                                "cuisines": {
+                                    "query": cuisine_type,  # 감지된 음식 종류 (Korean, Japanese, Chinese 등)
+                                    "operator": "or"  # cuisines에 해당 키워드가 포함되어야 함
+                                }
+                            }
+                        }
+                    ],
+                    "should": [
+                        {
+                            "match": {
+                                "cuisines": {
+                                    "query": translated_query,
+                                    "boost": 3.0
+                                }
+                            }
+                        },
+                        {
+                            "multi_match": {
+                                "query": translated_query,
+                                "fields": [
+                                    "restaurant_name^2",
+                                    "text_content^2",
+                                    "city^2",
+                                    "address",
+                                    "locality",
+                                    "locality_verbose"
+                                ],
+                                "type": "best_fields",
+                                "operator": "or"
+                            }
+                        }
+                    ],
+                    "minimum_should_match": 1
+                }
+            },
+            "size": size
+        }
+    else:
+        # 일반 검색 (한국음식 검색이 아닌 경우)
+        body = {
+            "query": {
+                "bool": {
+                    "should": [
+                        {
+                            "match": {
+                                "cuisines": {
+                                    "query": translated_query,
+                                    "boost": 3.0
+                                }
+                            }
+                        },
+                        {
+                            "multi_match": {
+                                "query": translated_query,
+                                "fields": [
+                                    "restaurant_name^2",
+                                    "text_content^2",
+                                    "city^2",
+                                    "address",
+                                    "locality",
+                                    "locality_verbose"
+                                ],
+                                "type": "best_fields",
+                                "operator": "or"
+                            }
+                        }
+                    ],
+                    "minimum_should_match": 1
+                }
+            },
+            "size": size
+        }
+
+    return body, translated_query
+
+
+
+def build_bm25_body(query: str, size: int, translated_query: str | None = None) -> Tuple[Dict[str, Any], str]:
+    """
+    search_es가 보내는 것과 같은 BM25 쿼리 body (인덱스 검증/워밍업 스크립트용 공개 함수)
+
+    Returns:
+        (body, translated_query) 튜플
+    """
+    return _build_bm25_body(query, size, translated_query=translated_query)
+
 
 def search_es(query: str, index: str | None = None, size: int = 5):
     """
@@ -220,127 +634,17 @@ def search_es(query: str, index: str | None = None, size: int = 5):
         logger.info(f"[search_es] 검색 시작: query='{query}', size={size}")
         
         es = get_es_client()
-        if es is None:
-            raise RuntimeError("Elasticsearch 클라이언트를 생성할 수 없습니다. elasticsearch 패키지가 설치되어 있는지 확인하세요.")
         
         index = index or os.getenv("ES_INDEX", "restaurant_docs")
         logger.info(f"[search_es] ES Host: {os.getenv('ES_HOST')}, Index: {index}")
         
-        # 음식 종류 추출 (한식, 일식, 중식 등)
-        cuisine_type, _ = extract_cuisine_type(query)
-        
-        # 쿼리를 영어로 번역 (데이터가 영어로 되어있을 수 있음)
-        translated_query = translate_query_to_english(query)
-        
-        if translated_query != query:
-            logger.info(f"[search_es] 번역된 쿼리로 검색: '{query}' → '{translated_query}'")
-        
-        # 번역된 쿼리에서도 음식 종류 확인 (번역 후 영어 키워드가 나올 수 있음)
-        if not cuisine_type:
-            cuisine_type, _ = extract_cuisine_type(translated_query)
-        
-        # 음식 종류에 맞는 키워드 추가
-        if cuisine_type:
-            logger.info(f"[search_es] {cuisine_type} 음식 검색 감지: cuisines 필드 필터링 적용")
-            # 쿼리에 해당 음식 키워드 추가 (없는 경우)
-            if cuisine_type.lower() not in translated_query.lower():
-                translated_query = f"{cuisine_type} {translated_query}"
-                logger.info(f"[search_es] 쿼리 보강: '{translated_query}'")
-        
-        # 실제 필드명에 맞춰 검색 (소문자+언더스코어)
-        # 특정 음식 종류 검색인 경우 cuisines 필드에 해당 키워드가 반드시 포함되어야 함 (must 필터)
-        if cuisine_type:
-            body = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {
-                                "match": {
-                                    "cuisines": {
-                                        "query": cuisine_type,  # 감지된 음식 종류 (Korean, Japanese, Chinese 등)
-                                        "operator": "or"  # cuisines에 해당 키워드가 포함되어야 함
-                                    }
-                                }
-                            }
-                        ],
-                        "should": [
-                            {
-                                "match": {
-                                    "cuisines": {
-                                        "query": translated_query,
-                                        "boost": 3.0
-                                    }
-                                }
-                            },
-                            {
-                                "multi_match": {
-                                    "query": translated_query,
-                                    "fields": [
-                                        "restaurant_name^2",
-                                        "text_content^2",
-                                        "city^2",
-                                        "address",
-                                        "locality",
-                                        "locality_verbose"
-                                    ],
-                                    "type": "best_fields",
-                                    "operator": "or"
-                                }
-                            }
-                        ],
-                        "minimum_should_match": 1
-                    }
-                },
-                "size": size
-            }
-        else:
-            # 일반 검색 (한국음식 검색이 아닌 경우)
-            body = {
-                "query": {
-                    "bool": {
-                        "should": [
-                            {
-                                "match": {
-                                    "cuisines": {
-                                        "query": translated_query,
-                                        "boost": 3.0
-                                    }
-                                }
-                            },
-                            {
-                                "multi_match": {
-                                    "query": translated_query,
-                                    "fields": [
-                                        "restaurant_name^2",
-                                        "text_content^2",
-                                        "city^2",
-                                        "address",
-                                        "locality",
-                                        "locality_verbose"
-                                    ],
-                                    "type": "best_fields",
-                                    "operator": "or"
-                                }
-                            }
-                        ],
-                        "minimum_should_match": 1
-                    }
-                },
-                "size": size
-            }
+        body, translated_query = _build_bm25_body(query, size)
         
         logger.info(f"[search_es] ES 쿼리 실행 중... (쿼리: {translated_query})")
         
-        # 디버깅: 인덱스 문서 개수 확인
-        try:
-            count_result = es.count(index=index)
-            total_docs = count_result.get("count", 0)
-            logger.info(f"[search_es] 인덱스 '{index}' 총 문서 개수: {total_docs:,}개")
-            
-            if total_docs == 0:
-                logger.warning(f"[search_es] ⚠️  인덱스에 데이터가 없습니다!")
-        except Exception as e:
-            logger.warning(f"[search_es] 문서 개수 확인 실패: {e}")
+        # 디버깅 모드(ES_DEBUG=1)에서만 인덱스 통계를 로그로 남긴다 (TTL 캐시 사용)
+        if es_debug_enabled():
+            _log_index_stats(es, index)
         
         res = es.search(index=index, body=body)
         hits = res.get("hits", {}).get("hits", [])
@@ -353,19 +657,11 @@ def search_es(query: str, index: str | None = None, size: int = 5):
         
         logger.info(f"[search_es] ES 검색 완료: {len(hits)}개 결과 (전체 매칭: {total_hits_value}개)")
         
-        # 결과가 없으면 샘플 문서 확인
+        # 결과가 없을 때 샘플 문서 확인은 디버깅 모드에서만 수행
         if len(hits) == 0:
-            logger.warning(f"[search_es] 검색 결과가 없습니다. 샘플 문서 확인 중...")
-            try:
-                sample_res = es.search(index=index, body={"size": 1, "query": {"match_all": {}}})
-                sample_hits = sample_res.get("hits", {}).get("hits", [])
-                if sample_hits:
-                    sample_source = sample_hits[0]["_source"]
-                    logger.info(f"[search_es] 샘플 문서 필드명: {list(sample_source.keys())[:10]}")
-                else:
-                    logger.warning(f"[search_es] 샘플 문서도 없습니다. 인덱스가 비어있을 수 있습니다.")
-            except Exception as e:
-                logger.warning(f"[search_es] 샘플 문서 확인 실패: {e}")
+            logger.warning(f"[search_es] 검색 결과가 없습니다.")
+            if es_debug_enabled():
+                _log_sample_fields(es, index)
         
         results = [
             {"id": h["_id"], "score": h["_score"], "source": h["_source"]}
@@ -381,56 +677,236 @@ def search_es(query: str, index: str | None = None, size: int = 5):
         raise RuntimeError(error_msg) from e
 
 ###########################################
-# 3) OpenRouter bge-m3 임베딩 생성 및 ES KNN Dense Search
+# 6) OpenRouter bge-m3 임베딩 생성 및 ES KNN Dense Search
 ###########################################
 
-def get_embedding_from_openrouter(query: str) -> List[float]:
+# 임베딩 캐시 (모델명 + 정규화된 텍스트 기준)
+# - 메모리: LRU, np.float32 배열로 보관
+# - 디스크: SQLite에 float32 바이트(BLOB)로 저장 (EMBEDDING_CACHE_DB="" 이면 메모리만 사용)
+#   상대 경로는 실행 위치(CWD)가 아니라 저장소 루트 기준, 파일은 처음 사용할 때 연다
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _repo_path(path: str) -> str | None:
+    if not path:
+        return None
+    return str(path if Path(path).is_absolute() else _REPO_ROOT / path)
+
+
+_EMBEDDING_CACHE = TTLCache(
+    maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+    ttl=None,
+    sqlite_path=_repo_path(os.getenv("EMBEDDING_CACHE_DB", "data/cache/embeddings.sqlite")),
+    table="embeddings",
+    encode=lambda vec: np.asarray(vec, dtype=np.float32).tobytes(),
+    decode=lambda blob: np.frombuffer(blob, dtype=np.float32),
+    max_disk_rows=int(os.getenv("EMBEDDING_CACHE_DB_MAX_ROWS", "50000")),
+)
+
+
+def _embedding_cache_key(model_name: str, text: str) -> str:
+    # 임베딩은 대소문자에 따라 달라지므로 소문자로 바꾸지 않는다
+    normalized = normalize_cache_text(text, lower=False)
+    return hashlib.sha256(f"{model_name}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """임베딩 캐시 hit/miss 통계"""
+    return _EMBEDDING_CACHE.stats()
+
+
+_OPENROUTER_EMBEDDINGS_URL = "https://openrouter.ai/api/v1/embeddings"
+
+
+def _embedding_request(inputs: str | List[str], model_name: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    OpenRouter embeddings 요청의 (headers, data) (동기/비동기 호출에서 공통 사용)
+    """
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENROUTER_API_KEY 환경변수가 설정되지 않았습니다.")
+    
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": os.getenv("OPENROUTER_HTTP_REFERER", ""),
+        "X-Title": os.getenv("OPENROUTER_APP_NAME", "LangGraph Agent"),
+    }
+    
+    data = {
+        "model": model_name,
+        "input": inputs
+    }
+    return headers, data
+
+
+def _parse_embeddings(result: Dict[str, Any]) -> List[List[float]]:
+    # OpenRouter 응답 형식: {"data": [{"index": 0, "embedding": [...]}, ...]}
+    if "data" in result and len(result["data"]) > 0:
+        items = sorted(result["data"], key=lambda item: item.get("index", 0))
+        return [item["embedding"] for item in items]
+    raise ValueError(f"Unexpected response format: {result}")
+
+
+def _post_embeddings(inputs: str | List[str], model_name: str) -> List[List[float]]:
+    """
+    OpenRouter embeddings API 호출 (input은 문자열 하나 또는 문자열 리스트)
+
+    Returns:
+        입력 순서대로 정렬된 임베딩 벡터 리스트
+    """
+    headers, data = _embedding_request(inputs, model_name)
+    
+    try:
+        response = requests.post(_OPENROUTER_EMBEDDINGS_URL, headers=headers, json=data, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"OpenRouter API 호출 실패: {str(e)}")
+    
+    return _parse_embeddings(result)
+
+
+def get_embedding_from_openrouter(query: str) -> List[float]:
+    """
+    OpenRouter API를 사용하여 bge-m3 임베딩 생성
+    (같은 모델 + 같은 텍스트는 캐시된 벡터를 사용)
+    
+    Args:
+        query: 임베딩할 텍스트
+        
+    Returns:
+        임베딩 벡터 (리스트)
+    """
+    model_name = os.getenv("OPENROUTER_EMBEDDING_MODEL", "baai/bge-m3")
+    
+    cache_key = _embedding_cache_key(model_name, query)
+    cached = _EMBEDDING_CACHE.get(cache_key)
+    if cached is not None:
+        return cached.tolist()
+    
+    embedding = _post_embeddings(query, model_name)[0]
+    _EMBEDDING_CACHE.set(cache_key, np.asarray(embedding, dtype=np.float32))
+    return embedding
+
+
+def get_embeddings_batch(
+    texts: List[str],
+    batch_size: int = 64,
+    max_concurrency: int = 4,
+    max_retries: int = 3,
+    use_cache: bool = True,
+) -> np.ndarray:
     """
-    OpenRouter API를 사용하여 bge-m3 임베딩 생성
-    
+    여러 텍스트를 배치로 임베딩한다. (재색인, 인기 쿼리 사전 워밍, 쿼리 로그 평가용)
+
+    - 캐시에 있는 텍스트는 API를 호출하지 않는다.
+      (use_cache=False면 쿼리 임베딩 캐시를 읽지도 쓰지도 않는다. 문서 색인처럼 다시 조회하지 않을 텍스트용)
+    - 중복 텍스트는 한 번만 요청한다.
+    - batch_size 단위로 나눠 최대 max_concurrency개를 동시에 요청하고,
+      실패한 배치는 max_retries번까지 재시도한다 (지수 백오프).
+
     Args:
-        query: 임베딩할 텍스트
-        
+        texts: 임베딩할 텍스트 리스트
+        batch_size: API 요청 하나에 넣을 텍스트 개수
+        max_concurrency: 동시에 보낼 요청 수
+        max_retries: 배치별 최대 재시도 횟수
+        use_cache: 쿼리 임베딩 캐시 사용 여부
+
     Returns:
-        임베딩 벡터 (리스트)
+        (len(texts), dim) 크기의 float32 행렬 (입력 순서 유지)
     """
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENROUTER_API_KEY 환경변수가 설정되지 않았습니다.")
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+    logger = logging.getLogger(__name__)
+    
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
     
     model_name = os.getenv("OPENROUTER_EMBEDDING_MODEL", "baai/bge-m3")
+    keys = [_embedding_cache_key(model_name, text) for text in texts]
     
-    url = "https://openrouter.ai/api/v1/embeddings"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": os.getenv("OPENROUTER_HTTP_REFERER", ""),
-        "X-Title": os.getenv("OPENROUTER_APP_NAME", "LangGraph Agent"),
-    }
+    # 캐시 조회 + 중복 제거
+    vectors: Dict[str, np.ndarray] = {}
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key in vectors or key in missing:
+            continue
+        cached = _EMBEDDING_CACHE.get(key) if use_cache else None
+        if cached is not None:
+            vectors[key] = cached
+        else:
+            missing[key] = text
     
-    data = {
-        "model": model_name,
-        "input": query
-    }
+    missing_items = list(missing.items())
+    batches = [missing_items[i:i + batch_size] for i in range(0, len(missing_items), batch_size)]
+    logger.info(
+        f"[get_embeddings_batch] 전체 {len(texts)}개 (캐시 {len(vectors)}개, 요청 {len(missing_items)}개 / {len(batches)}개 배치)"
+    )
     
-    try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        result = response.json()
-        
-        # OpenRouter 응답 형식: {"data": [{"embedding": [...]}]}
-        if "data" in result and len(result["data"]) > 0:
-            return result["data"][0]["embedding"]
-        else:
-            raise ValueError(f"Unexpected response format: {result}")
-            
-    except requests.exceptions.RequestException as e:
-        raise RuntimeError(f"OpenRouter API 호출 실패: {str(e)}")
+    def _embed_batch(batch: List[Tuple[str, str]]) -> List[Tuple[str, np.ndarray]]:
+        last_error: Exception | None = None
+        for attempt in range(max_retries + 1):
+            try:
+                embeddings = _post_embeddings([text for _, text in batch], model_name)
+                if len(embeddings) != len(batch):
+                    raise ValueError(f"임베딩 개수 불일치: 요청 {len(batch)}개, 응답 {len(embeddings)}개")
+                return [
+                    (key, np.asarray(embedding, dtype=np.float32))
+                    for (key, _), embedding in zip(batch, embeddings)
+                ]
+            except Exception as e:
+                last_error = e
+                if attempt < max_retries:
+                    wait = 0.5 * (2 ** attempt)
+                    logger.warning(f"[get_embeddings_batch] 배치 실패, {wait:.1f}s 후 재시도 ({attempt + 1}/{max_retries}): {e}")
+                    time.sleep(wait)
+        raise RuntimeError(f"임베딩 배치 요청 실패 (재시도 {max_retries}회): {last_error}")
+    
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as executor:
+            for batch_result in executor.map(_embed_batch, batches):
+                for key, vector in batch_result:
+                    vectors[key] = vector
+                    if use_cache:
+                        _EMBEDDING_CACHE.set(key, vector)
+    
+    # 입력 순서대로 연속된 float32 행렬로 합치기
+    return np.ascontiguousarray(np.stack([vectors[key] for key in keys]), dtype=np.float32)
+
+
+def _build_knn_body(query_vector: List[float], size: int) -> Dict[str, Any]:
+    return {
+        "knn": {
+            "field": "embedding",  # 일반적으로 많이 쓰는 필드명
+            "query_vector": query_vector,
+            "k": size,
+            "num_candidates": size * 2  # 후보 개수 (정확도와 성능의 균형)
+        }
+    }
+
+
+def _local_dense_search(query_vector: List[float], size: int) -> List[Dict[str, Any]]:
+    """
+    DENSE_BACKEND=local: 프로세스 내 LocalVectorIndex에서 KNN 검색
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    local_index = get_local_vector_index()
+    start = time.perf_counter()
+    results = local_index.search(query_vector, k=size)
+    logger.info(
+        f"[dense_search] 로컬 인덱스 검색 완료: {len(results)}개 결과 "
+        f"({(time.perf_counter() - start) * 1000:.2f}ms, 문서 {len(local_index)}개)"
+    )
+    return results
 
 
 def dense_search(query: str, index: str | None = None, size: int = 5) -> List[Dict[str, Any]]:
     """
     bge-m3 임베딩 기반 ES KNN Dense Search
+    (DENSE_BACKEND=local 이면 ES 대신 프로세스 내 LocalVectorIndex에서 검색)
     
     Args:
         query: 검색 쿼리
@@ -446,9 +922,10 @@ def dense_search(query: str, index: str | None = None, size: int = 5) -> List[Di
     try:
         logger.info(f"[dense_search] 검색 시작: query='{query}', size={size}")
         
+        if dense_backend() == "local":
+            return _local_dense_search(get_embedding_from_openrouter(query), size)
+        
         es = get_es_client()
-        if es is None:
-            raise RuntimeError("Elasticsearch 클라이언트를 생성할 수 없습니다.")
         
         index = index or os.getenv("ES_INDEX", "restaurant_docs")
         logger.info(f"[dense_search] ES Host: {os.getenv('ES_HOST')}, Index: {index}")
@@ -460,16 +937,7 @@ def dense_search(query: str, index: str | None = None, size: int = 5) -> List[Di
         
         # ES KNN 검색 (search API에 knn 쿼리 포함)
         logger.info("[dense_search] ES KNN 검색 실행 중...")
-        body = {
-            "knn": {
-                "field": "embedding",  # 일반적으로 많이 쓰는 필드명
-                "query_vector": query_vector,
-                "k": size,
-                "num_candidates": size * 2  # 후보 개수 (정확도와 성능의 균형)
-            }
-        }
-        
-        response = es.search(index=index, body=body)
+        response = es.search(index=index, body=_build_knn_body(query_vector, size))
         
         hits = response.get("hits", {}).get("hits", [])
         logger.info(f"[dense_search] ES KNN 검색 완료: {len(hits)}개 결과")
@@ -494,6 +962,434 @@ def dense_search(query: str, index: str | None = None, size: int = 5) -> List[Di
 
 
 
+###########################################
+# 7) 단일 요청 하이브리드 검색 (ES 네이티브 RRF)
+###########################################
+
+# (host, index) → "retriever" | "rank" | "none"
+# 클러스터가 지원하는 RRF 문법을 한 번 확인하면 기억해 두고, 지원하지 않으면 바로 Python 결합으로 넘어간다.
+_HYBRID_SUPPORT: Dict[tuple, str] = {}
+
+# hybrid_search에서 번역(BM25 body)과 동시에 임베딩을 요청하기 위한 스레드 풀
+_HYBRID_EMBED_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("HYBRID_SEARCH_WORKERS", "8")),
+    thread_name_prefix="hybrid-embed",
+)
+
+
+def _build_native_hybrid_body(
+    style: str,
+    bm25_query: Dict[str, Any],
+    query_vector: List[float],
+    size: int,
+    window_size: int,
+    rank_constant: int,
+) -> Dict[str, Any]:
+    # ES는 size가 rank window보다 크면 400을 돌려주므로 window 안으로 맞춘다
+    size = min(size, window_size)
+    knn = {
+        "field": "embedding",
+        "query_vector": query_vector,
+        "k": window_size,
+        "num_candidates": window_size * 2,
+    }
+    if style == "retriever":
+        # ES 8.14+ : retriever 기반 RRF
+        return {
+            "retriever": {
+                "rrf": {
+                    "retrievers": [
+                        {"standard": {"query": bm25_query}},
+                        {"knn": knn},
+                    ],
+                    "rank_constant": rank_constant,
+                    "rank_window_size": window_size,
+                }
+            },
+            "size": size,
+        }
+    # ES 8.8 ~ 8.13 : query + knn + rank.rrf
+    return {
+        "query": bm25_query,
+        "knn": knn,
+        "rank": {"rrf": {"rank_constant": rank_constant, "window_size": window_size}},
+        "size": size,
+    }
+
+
+# RRF 문법/라이선스 미지원을 나타내는 에러 메시지 (이 경우에만 클러스터를 미지원으로 기억한다)
+_RRF_FEATURE_PATTERN = re.compile(r"\brrf\b|reciprocal rank fusion|\bretriever\b|\[rank\]|\brank\b")
+_UNSUPPORTED_PATTERN = re.compile(
+    r"unknown|unrecognized|not supported|unsupported|does not support|no such|non-compliant|license"
+)
+
+
+def _is_unsupported_feature_error(e: Exception) -> bool:
+    """
+    RRF 문법을 모르는 클러스터(400) 또는 라이선스가 없는 클러스터(403)의 에러인지 확인
+
+    400/403이라도 에러 내용이 rrf/retriever/rank 기능 자체를 가리킬 때만 True
+    (size/window 같은 요청 값 오류나 권한 부족은 미지원으로 보지 않는다)
+    """
+    unsupported_types = tuple(t for t in (BadRequestError, AuthorizationException) if t is not None)
+    if not unsupported_types or not isinstance(e, unsupported_types):
+        return False
+    text = f"{e} {getattr(e, 'body', '')}".lower()
+    return bool(_RRF_FEATURE_PATTERN.search(text) and _UNSUPPORTED_PATTERN.search(text))
+
+
+def _hybrid_plan(index: str) -> Tuple[tuple, List[str]] | None:
+    """
+    ES_HYBRID_MODE와 이전에 확인한 클러스터 지원 여부로 시도할 RRF 문법 목록을 정한다.
+
+    Returns:
+        (support_key, styles) 튜플. 네이티브 RRF를 쓰지 않으면 None
+    """
+    mode = os.getenv("ES_HYBRID_MODE", "auto").strip().lower()
+    if mode == "off" or dense_backend() == "local":
+        # 로컬 Dense 백엔드를 쓰면 KNN은 ES 밖에서 하므로 Python RRF 결합을 사용
+        return None
+
+    support_key = (os.getenv("ES_HOST", "http://localhost:9200"), index)
+    support = _HYBRID_SUPPORT.get(support_key)
+    if support == "none":
+        return None
+
+    styles = ["retriever", "rank"] if mode == "auto" else [mode]
+    if support in styles:
+        styles = [support]
+    return support_key, styles
+
+
+def hybrid_search(
+    query: str,
+    dense_query: str | None = None,
+    index: str | None = None,
+    size: int = 20,
+    window_size: int = 10,
+    rank_constant: int = 60,
+) -> List[Dict[str, Any]] | None:
+    """
+    BM25 쿼리와 KNN 쿼리를 하나의 ES 요청으로 보내고, ES 안에서 RRF로 결합한다.
+
+    ES_HYBRID_MODE 환경변수로 방식을 고를 수 있다.
+    - auto (기본값): retriever → rank 순서로 시도
+    - retriever / rank: 해당 문법만 사용
+    - off: 사용하지 않음
+
+    Args:
+        query: BM25 검색 쿼리
+        dense_query: 임베딩할 쿼리 (None이면 query 사용)
+        index: ES 인덱스명 (None이면 환경변수에서 가져옴)
+        size: 반환할 결과 개수
+        window_size: 각 검색에서 RRF에 넣을 후보 개수
+        rank_constant: RRF 상수 k
+
+    Returns:
+        [{"id": str, "score": float, "source": dict}, ...]
+        클러스터가 네이티브 RRF를 지원하지 않으면 None (호출 측에서 Python RRF로 결합)
+
+    Raises:
+        TimeoutError: HYBRID_DENSE_TIMEOUT(초) 안에 임베딩을 받지 못한 경우
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    index = index or os.getenv("ES_INDEX", "restaurant_docs")
+    plan = _hybrid_plan(index)
+    if plan is None:
+        return None
+    support_key, styles = plan
+
+    es = get_es_client()
+    # 임베딩은 번역과 동시에 시작하고 HYBRID_DENSE_TIMEOUT 안에 받지 못하면 포기한다 (호출 측이 Python RRF로 대체)
+    dense_timeout = float(os.getenv("HYBRID_DENSE_TIMEOUT", "15"))
+    started = time.monotonic()
+    vector_future = _HYBRID_EMBED_EXECUTOR.submit(get_embedding_from_openrouter, dense_query or query)
+    body, translated_query = _build_bm25_body(query, size)
+    query_vector = vector_future.result(timeout=max(0.0, dense_timeout - (time.monotonic() - started)))
+
+    for style in styles:
+        hybrid_body = _build_native_hybrid_body(
+            style, body["query"], query_vector, size, window_size, rank_constant
+        )
+        try:
+            res = es.search(index=index, body=hybrid_body)
+        except Exception as e:
+            if _is_unsupported_feature_error(e):
+                logger.info(f"[hybrid_search] '{style}' RRF 미지원 클러스터: {str(e)[:200]}")
+                continue
+            raise
+
+        _HYBRID_SUPPORT[support_key] = style
+        hits = res.get("hits", {}).get("hits", [])
+        logger.info(f"[hybrid_search] 네이티브 RRF({style}) 검색 완료: {len(hits)}개 결과 (쿼리: {translated_query})")
+        return [
+            {"id": h["_id"], "score": float(h.get("_score") or 0.0), "source": h["_source"]}
+            for h in hits
+        ]
+
+    logger.info("[hybrid_search] 네이티브 RRF를 사용할 수 없어 Python RRF 결합으로 대체합니다.")
+    _HYBRID_SUPPORT[support_key] = "none"
+    return None
+
+
+###########################################
+# 8) 비동기 검색 (AsyncElasticsearch + httpx)
+###########################################
+#
+# FastAPI 핸들러 / graph.astream 안에서 워커 스레드나 이벤트 루프를 막지 않고 검색하기 위한 비동기 버전.
+# 쿼리 body, 캐시, 결과 형식은 동기 함수와 같은 헬퍼를 공유한다.
+
+# 이벤트 루프 → {(host, api_key): AsyncElasticsearch}
+# 비동기 커넥션은 만든 이벤트 루프에서만 쓸 수 있으므로 루프별로 클라이언트를 공유한다.
+_ASYNC_ES_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
+
+
+def _async_node_class() -> str:
+    """
+    AsyncElasticsearch의 HTTP 구현 (ES_ASYNC_NODE_CLASS)
+    기본값: aiohttp가 설치되어 있으면 aiohttp, 없으면 httpx(httpxasync)
+    """
+    node_class = os.getenv("ES_ASYNC_NODE_CLASS")
+    if node_class:
+        return node_class
+    try:
+        import aiohttp  # noqa: F401
+        return "aiohttp"
+    except ImportError:
+        return "httpxasync"
+
+
+def get_async_es_client(host: str | None = None, api_key: str | None = None) -> "AsyncElasticsearch":
+    """
+    현재 이벤트 루프에서 (host, api_key) 단위로 공유되는 AsyncElasticsearch 클라이언트를 반환한다.
+    커넥션 풀 설정은 동기 클라이언트와 같다. (_es_client_options)
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    if AsyncElasticsearch is None:
+        raise RuntimeError("AsyncElasticsearch를 사용할 수 없습니다. elasticsearch[async] 패키지가 설치되어 있는지 확인하세요.")
+
+    host = host or os.getenv("ES_HOST", "http://localhost:9200")
+    api_key = api_key if api_key is not None else os.getenv("ES_API_KEY")
+    key = (host, api_key)
+
+    clients = _ASYNC_ES_CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(key)
+    if client is None:
+        node_class = _async_node_class()
+        logger.info(f"[get_async_es_client] AsyncElasticsearch 클라이언트 생성: {host} ({node_class})")
+        client = AsyncElasticsearch(hosts=[host], api_key=api_key, node_class=node_class, **_es_client_options())
+        clients[key] = client
+    return client
+
+
+async def aclose_es_clients() -> None:
+    """
+    현재 이벤트 루프의 AsyncElasticsearch 클라이언트를 모두 닫는다.
+    FastAPI 앱 종료(shutdown) 시 호출한다.
+    """
+    clients = _ASYNC_ES_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+
+async def atranslate_query_to_english(query: str) -> str:
+    """
+    translate_query_to_english의 비동기 버전 (LLM 호출만 httpx로 비동기 처리)
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    translated, local = _translation_fast_path(query, check_cache=False)
+    if translated is not None:
+        return translated
+
+    cache_key = _translation_cache_key(query)
+    cached = await _TRANSLATION_CACHE.aget(cache_key)
+    if cached is not None:
+        logger.info(f"[translate_query] 캐시 사용: '{query}' → '{cached}'")
+        return cached
+
+    llm_input = " ".join(local.residual) if local is not None else query
+    fallback = local.text if local is not None else query
+
+    request = _translation_request(llm_input)
+    if request is None:
+        return fallback
+    headers, data = request
+
+    try:
+        response = await get_async_http_client().post(_OPENROUTER_CHAT_URL, headers=headers, json=data, timeout=30)
+        response.raise_for_status()
+        translated = _finish_translation(query, local, response.json(), store=False)
+        if translated:
+            await _TRANSLATION_CACHE.aset(cache_key, translated)
+        return translated or fallback
+    except Exception as e:
+        logger.warning(f"[translate_query] 번역 실패 (원본 사용): {str(e)}")
+        return fallback
+
+
+async def _apost_embeddings(inputs: str | List[str], model_name: str) -> List[List[float]]:
+    """
+    _post_embeddings의 비동기 버전
+    """
+    headers, data = _embedding_request(inputs, model_name)
+
+    try:
+        response = await get_async_http_client().post(_OPENROUTER_EMBEDDINGS_URL, headers=headers, json=data, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"OpenRouter API 호출 실패: {str(e)}")
+
+    return _parse_embeddings(result)
+
+
+async def aget_embedding_from_openrouter(query: str) -> List[float]:
+    """
+    get_embedding_from_openrouter의 비동기 버전 (같은 임베딩 캐시 사용)
+    """
+    model_name = os.getenv("OPENROUTER_EMBEDDING_MODEL", "baai/bge-m3")
+
+    cache_key = _embedding_cache_key(model_name, query)
+    cached = await _EMBEDDING_CACHE.aget(cache_key)
+    if cached is not None:
+        return cached.tolist()
+
+    embedding = (await _apost_embeddings(query, model_name))[0]
+    await _EMBEDDING_CACHE.aset(cache_key, np.asarray(embedding, dtype=np.float32))
+    return embedding
+
+
+async def asearch_es(query: str, index: str | None = None, size: int = 5) -> List[Dict[str, Any]]:
+    """
+    search_es의 비동기 버전 (ES BM25 기반 Sparse 검색)
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    try:
+        es = get_async_es_client()
+        index = index or os.getenv("ES_INDEX", "restaurant_docs")
+
+        translated = await atranslate_query_to_english(query)
+        body, translated_query = _build_bm25_body(query, size, translated_query=translated)
+
+        res = await es.search(index=index, body=body)
+        hits = res.get("hits", {}).get("hits", [])
+        logger.info(f"[asearch_es] ES 검색 완료: {len(hits)}개 결과 (쿼리: {translated_query})")
+
+        return [
+            {"id": h["_id"], "score": h["_score"], "source": h["_source"]}
+            for h in hits
+        ]
+
+    except Exception as e:
+        error_msg = f"ES 검색 실패: {str(e)}"
+        logger.error(f"[asearch_es] {error_msg}")
+        raise RuntimeError(error_msg) from e
+
+
+async def adense_search(query: str, index: str | None = None, size: int = 5) -> List[Dict[str, Any]]:
+    """
+    dense_search의 비동기 버전 (bge-m3 임베딩 + ES KNN, DENSE_BACKEND=local이면 LocalVectorIndex)
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    try:
+        query_vector = await aget_embedding_from_openrouter(query)
+
+        if dense_backend() == "local":
+            # 메모리 내 행렬 연산이라 ms 단위로 끝나므로 이벤트 루프에서 바로 실행
+            # (인덱스가 아직 없으면 npz 로드/ES scan이 필요하므로 스레드에서 실행)
+            if local_vector_index_loaded():
+                return _local_dense_search(query_vector, size)
+            return await asyncio.to_thread(_local_dense_search, query_vector, size)
+
+        es = get_async_es_client()
+        index = index or os.getenv("ES_INDEX", "restaurant_docs")
+
+        response = await es.search(index=index, body=_build_knn_body(query_vector, size))
+        hits = response.get("hits", {}).get("hits", [])
+        logger.info(f"[adense_search] ES KNN 검색 완료: {len(hits)}개 결과")
+
+        return [
+            {"id": h["_id"], "score": float(h["_score"]), "source": h["_source"]}
+            for h in hits
+        ]
+
+    except Exception as e:
+        error_msg = f"ES KNN 검색 실패: {str(e)}"
+        logger.error(f"[adense_search] {error_msg}")
+        raise RuntimeError(error_msg) from e
+
+
+async def ahybrid_search(
+    query: str,
+    dense_query: str | None = None,
+    index: str | None = None,
+    size: int = 20,
+    window_size: int = 10,
+    rank_constant: int = 60,
+) -> List[Dict[str, Any]] | None:
+    """
+    hybrid_search의 비동기 버전 (번역과 임베딩을 동시에 요청한 뒤 ES 네이티브 RRF 한 번)
+
+    Returns:
+        [{"id": str, "score": float, "source": dict}, ...]
+        클러스터가 네이티브 RRF를 지원하지 않으면 None
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    index = index or os.getenv("ES_INDEX", "restaurant_docs")
+    plan = _hybrid_plan(index)
+    if plan is None:
+        return None
+    support_key, styles = plan
+
+    es = get_async_es_client()
+    translated, query_vector = await asyncio.gather(
+        atranslate_query_to_english(query),
+        asyncio.wait_for(
+            aget_embedding_from_openrouter(dense_query or query),
+            timeout=float(os.getenv("HYBRID_DENSE_TIMEOUT", "15")),
+        ),
+    )
+    body, translated_query = _build_bm25_body(query, size, translated_query=translated)
+
+    for style in styles:
+        hybrid_body = _build_native_hybrid_body(
+            style, body["query"], query_vector, size, window_size, rank_constant
+        )
+        try:
+            res = await es.search(index=index, body=hybrid_body)
+        except Exception as e:
+            if _is_unsupported_feature_error(e):
+                logger.info(f"[ahybrid_search] '{style}' RRF 미지원 클러스터: {str(e)[:200]}")
+                continue
+            raise
+
+        _HYBRID_SUPPORT[support_key] = style
+        hits = res.get("hits", {}).get("hits", [])
+        logger.info(f"[ahybrid_search] 네이티브 RRF({style}) 검색 완료: {len(hits)}개 결과 (쿼리: {translated_query})")
+        return [
+            {"id": h["_id"], "score": float(h.get("_score") or 0.0), "source": h["_source"]}
+            for h in hits
+        ]
+
+    _HYBRID_SUPPORT[support_key] = "none"
+    return None
+
+
 # -----------------------------
 # 2) CSV + BM25 기반 테스트용 검색
 # -----------------------------
@@ -510,75 +1406,119 @@ def _tokenize(text: str) -> List[str]:
     return text.lower().replace(",", " ").replace("/", " ").split()
 
 
-def _build_bm25_index(rows: List[Dict[str, str]], fields: List[str]):
-    """
-    주어진 rows(각 row는 CSV 한 줄)와 사용할 필드 리스트를 받아
-    BM25 계산에 필요한 통계값을 만든다.
-    반환값:
-    - docs_tokens: 각 문서별 토큰 리스트
-    - doc_lens: 각 문서 길이
-    - avgdl: 평균 문서 길이
-    - df: 토큰별 document frequency
-    """
-    docs_tokens: List[List[str]] = []
-    doc_lens: List[int] = []
-    df: Dict[str, int] = {}
-
-    for row in rows:
-        # 여러 필드를 이어붙여 하나의 문서 텍스트로 사용
-        parts = []
-        for f in fields:
-            val = row.get(f)
-            if val:
-                parts.append(str(val))
-        doc_text = " ".join(parts)
-        tokens = _tokenize(doc_text)
-        docs_tokens.append(tokens)
-        doc_lens.append(len(tokens))
-
-        seen = set()
-        for t in tokens:
-            if t not in seen:
-                df[t] = df.get(t, 0) + 1
-                seen.add(t)
-
-    avgdl = sum(doc_lens) / len(doc_lens) if doc_lens else 0.0
-    return docs_tokens, doc_lens, avgdl, df
-
-
-def _bm25_score(
-    query_tokens: List[str],
-    docs_tokens: List[List[str]],
-    doc_lens: List[int],
-    avgdl: float,
-    df: Dict[str, int],
-    k1: float = 1.5,
-    b: float = 0.75,
-) -> List[float]:
-    """
-    각 문서에 대해 BM25 점수를 계산해 리스트로 반환.
-    """
-    N = len(docs_tokens)
-    scores = [0.0 for _ in range(N)]
-
-    # query term 빈도는 따로 고려하지 않고, unique query term 기준으로만 합산 (테스트용이므로 단순화)
-    for q in set(query_tokens):
-        if q not in df:
-            continue
-        n_q = df[q]
-        idf = math.log((N - n_q + 0.5) / (n_q + 0.5) + 1)
+class CsvBm25Index:
+    """
+    CSV 한 개에 대한 BM25 역색인 (CSV 파일 mtime 기준으로 한 번만 생성).
+
+    - postings: 토큰 → [(문서 번호, tf), ...]
+    - idf: 토큰별 IDF (미리 계산)
+    - norms: 문서별 길이 정규화 값 k1 * (1 - b + b * dl / avgdl) (미리 계산)
+    검색 시에는 쿼리 토큰의 postings에 있는 문서만 점수를 계산한다.
+    """
+
+    def __init__(self, rows: List[Dict[str, str]], fields: List[str], k1: float = 1.5, b: float = 0.75):
+        self.rows = rows
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lens: List[int] = []
+        for doc_id, row in enumerate(rows):
+            # 여러 필드를 이어붙여 하나의 문서 텍스트로 사용
+            doc_text = " ".join(str(row[f]) for f in fields if row.get(f))
+            tokens = _tokenize(doc_text)
+            doc_lens.append(len(tokens))
 
-        # 각 문서에서 q의 term frequency 계산
-        for i, tokens in enumerate(docs_tokens):
-            tf = tokens.count(q)
-            if tf == 0:
+            tf: Dict[str, int] = {}
+            for t in tokens:
+                tf[t] = tf.get(t, 0) + 1
+            for t, count in tf.items():
+                postings.setdefault(t, []).append((doc_id, count))
+
+        N = len(rows)
+        avgdl = sum(doc_lens) / N if N else 0.0
+        self.postings = postings
+        self.idf = {
+            t: math.log((N - len(plist) + 0.5) / (len(plist) + 0.5) + 1)
+            for t, plist in postings.items()
+        }
+        self.norms = [
+            k1 * (1 - b + b * (dl if dl > 0 else 1) / (avgdl if avgdl > 0 else 1))
+            for dl in doc_lens
+        ]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def score(self, query_tokens: List[str]) -> Dict[int, float]:
+        """
+        쿼리 토큰이 하나라도 들어 있는 문서의 BM25 점수 {문서 번호: 점수}.
+        (query term 빈도는 고려하지 않고 unique query term 기준으로 합산)
+        """
+        k1 = self.k1
+        norms = self.norms
+        scores: Dict[int, float] = {}
+        for q in set(query_tokens):
+            plist = self.postings.get(q)
+            if not plist:
                 continue
-            dl = doc_lens[i] if doc_lens[i] > 0 else 1
-            denom = tf + k1 * (1 - b + b * dl / (avgdl if avgdl > 0 else 1))
-            score = idf * (tf * (k1 + 1) / denom)
-            scores[i] += score
+            idf = self.idf[q]
+            for doc_id, tf in plist:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (tf * (k1 + 1) / (tf + norms[doc_id]))
+        return scores
+
+    def search(self, query: str, size: int = 5) -> List[Tuple[int, float]]:
+        """
+        상위 size개의 (문서 번호, 점수). 점수가 같으면 CSV 순서를 따르고,
+        매칭 문서가 size개보다 적으면 나머지는 점수 0인 문서로 CSV 순서대로 채운다.
+        """
+        scores = self.score(_tokenize(query))
+        ranked = heapq.nsmallest(size, scores.items(), key=lambda x: (-x[1], x[0]))
+        if len(ranked) < size:
+            for doc_id in range(len(self.rows)):
+                if len(ranked) >= size:
+                    break
+                if doc_id not in scores:
+                    ranked.append((doc_id, 0.0))
+        return ranked
+
+
+# (csv 경로, 필드) → (mtime, 파일 크기, CsvBm25Index)
+_CSV_BM25_INDEXES: Dict[tuple, tuple] = {}
+_CSV_BM25_LOCK = threading.Lock()
 
-    return scores
+
+def get_csv_bm25_index(csv_path: str | Path, fields: List[str]) -> CsvBm25Index:
+    """
+    CSV를 읽어 BM25 인덱스를 만들고 재사용한다. 파일이 바뀌면(mtime/크기 변경) 다시 만든다.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    key = (str(csv_path.resolve()), tuple(fields))
+
+    entry = _CSV_BM25_INDEXES.get(key)
+    if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+        return entry[2]
+
+    with _CSV_BM25_LOCK:
+        entry = _CSV_BM25_INDEXES.get(key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+
+        start = time.perf_counter()
+        with csv_path.open("r", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        index = CsvBm25Index(rows, fields)
+        _CSV_BM25_INDEXES[key] = (stat.st_mtime_ns, stat.st_size, index)
+        logger.info(
+            f"[search_es_csv_bm25] BM25 인덱스 생성: {csv_path} "
+            f"(문서 {len(index)}개, 토큰 {len(index.postings)}개, {time.perf_counter() - start:.2f}s)"
+        )
+        return index
 
 
 def search_es_csv_bm25(
@@ -610,38 +1550,16 @@ def search_es_csv_bm25(
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV 파일을 찾을 수 없습니다: {csv_path}")
 
-    # CSV 로드
-    rows: List[Dict[str, str]] = []
-    with csv_path.open("r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
-
-    if not rows:
-        return []
-
-    # BM25 인덱스 구축
+    # BM25 인덱스 (CSV가 바뀔 때만 다시 생성)
     fields = ["name", "area", "category", "keywords", "address", "review_snippet"]
-    docs_tokens, doc_lens, avgdl, df = _build_bm25_index(rows, fields)
+    index = get_csv_bm25_index(csv_path, fields)
 
-    # 쿼리 토큰화
-    query_tokens = _tokenize(query)
-    if not query_tokens:
+    if not index.rows or not _tokenize(query):
         return []
 
-    # BM25 점수 계산
-    scores = _bm25_score(query_tokens, docs_tokens, doc_lens, avgdl, df)
-
-    # 점수 기준 정렬
-    ranked = sorted(
-        enumerate(rows),
-        key=lambda x: scores[x[0]],
-        reverse=True,
-    )
-
     results: List[Dict[str, Any]] = []
-    for i, (idx, row) in enumerate(ranked[:size]):
-        score = scores[idx]
+    for idx, score in index.search(query, size=size):
+        row = index.rows[idx]
         # ES 호환 구조로 반환
         rid = row.get("restaurant_id") or row.get("id") or str(idx)
         results.append(
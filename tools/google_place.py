@@ -1,14 +1,25 @@
 # tools/google_places.py
 
 import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 from typing import List, Dict, Any, Optional
 import requests
 
+from .async_http import get_async_http_client
+from .name_index import best_name_match
+
 # Google Places API 엔드포인트
 TEXT_ENDPOINT = "https://maps.googleapis.com/maps/api/place/textsearch/json"
 NEARBY_ENDPOINT = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
 DETAILS_ENDPOINT = "https://maps.googleapis.com/maps/api/place/details/json"
 
+logger = logging.getLogger(__name__)
+
+# 위치 근처에서 이름이 맞는 장소를 찾지 못했을 때의 error 값
+NO_MATCH_ERROR = "근처에서 일치하는 장소를 찾지 못했습니다"
+
 
 def _get_api_key() -> str:
     api_key = os.getenv("GOOGLE_PLACES_API_KEY")
@@ -41,21 +52,30 @@ def search_place(
     }
     형태의 dict.
     """
-    api_key = _get_api_key()
+    resp = requests.get(TEXT_ENDPOINT, params=_text_search_params(query, region, language), timeout=10)
+    resp.raise_for_status()
+    return _parse_places(resp.json(), address_field="formatted_address", limit=limit)
+
 
+def _text_search_params(query: str, region: Optional[str], language: str) -> Dict[str, Any]:
     params = {
-        "key": api_key,
+        "key": _get_api_key(),
         "query": query,
         "language": language,
     }
     if region:
         params["region"] = region
+    return params
 
-    resp = requests.get(TEXT_ENDPOINT, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
 
-    results = data.get("results", [])[:limit]
+def _parse_places(data: Dict[str, Any], address_field: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Text Search / Nearby Search 응답을 공통 형식으로 변환
+    (nearbysearch에서는 formatted_address 대신 vicinity 사용)
+    """
+    results = data.get("results", [])
+    if limit is not None:
+        results = results[:limit]
 
     places: List[Dict[str, Any]] = []
     for r in results:
@@ -63,7 +83,7 @@ def search_place(
             {
                 "place_id": r.get("place_id"),  # place_id 추가
                 "name": r.get("name"),
-                "address": r.get("formatted_address"),
+                "address": r.get(address_field),
                 "location": r.get("geometry", {}).get("location"),
                 "rating": r.get("rating"),
                 "user_ratings_total": r.get("user_ratings_total"),
@@ -92,37 +112,28 @@ def search_place_by_location(
 
     반환값 형식은 search_place와 동일.
     """
-    api_key = _get_api_key()
+    params = _nearby_search_params(latitude, longitude, keyword, radius, language)
+    resp = requests.get(NEARBY_ENDPOINT, params=params, timeout=10)
+    resp.raise_for_status()
+    return _parse_places(resp.json(), address_field="vicinity")
+
 
+def _nearby_search_params(
+    latitude: float,
+    longitude: float,
+    keyword: Optional[str],
+    radius: int,
+    language: str,
+) -> Dict[str, Any]:
     params = {
-        "key": api_key,
+        "key": _get_api_key(),
         "location": f"{latitude},{longitude}",
         "radius": radius,      # 미터 단위. 테스트용이면 100~200 정도로 충분
         "language": language,
     }
     if keyword:
         params["keyword"] = keyword
-
-    resp = requests.get(NEARBY_ENDPOINT, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-
-    results = data.get("results", [])
-
-    places: List[Dict[str, Any]] = []
-    for r in results:
-        places.append(
-            {
-                "place_id": r.get("place_id"),  # place_id 추가
-                "name": r.get("name"),
-                "address": r.get("vicinity"),  # nearbysearch에서는 formatted_address 대신 vicinity 사용
-                "location": r.get("geometry", {}).get("location"),
-                "rating": r.get("rating"),
-                "user_ratings_total": r.get("user_ratings_total"),
-                "types": r.get("types"),
-            }
-        )
-    return places
+    return params
 
 
 # --------------------------------------------------
@@ -151,19 +162,21 @@ def get_place_details(
             "opening_hours": List[str]  # 요일별 영업시간
         }
     """
-    api_key = _get_api_key()
-    
-    params = {
-        "key": api_key,
+    resp = requests.get(DETAILS_ENDPOINT, params=_details_params(place_id, language), timeout=10)
+    resp.raise_for_status()
+    return _parse_details(resp.json())
+
+
+def _details_params(place_id: str, language: str) -> Dict[str, Any]:
+    return {
+        "key": _get_api_key(),
         "place_id": place_id,
         "language": language,
         "fields": "name,formatted_address,rating,user_ratings_total,reviews,formatted_phone_number,opening_hours",  # 필요한 필드만 요청
     }
-    
-    resp = requests.get(DETAILS_ENDPOINT, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    
+
+
+def _parse_details(data: Dict[str, Any]) -> Dict[str, Any]:
     result = data.get("result", {})
     
     # 리뷰는 상위 3개만
@@ -218,53 +231,227 @@ def get_place_reviews_by_name_and_location(
         language=language,
     )
     
-    if not places:
-        return {
-            "name": restaurant_name,
-            "address": None,
-            "rating": None,
-            "user_ratings_total": 0,
-            "reviews": [],
-            "phone_number": None,
-            "opening_hours": [],
-        }
-    
-    # 식당 이름과 가장 유사한 결과 찾기
-    best_match = None
-    for place in places:
-        place_name = place.get("name", "").lower()
-        if restaurant_name.lower() in place_name or place_name in restaurant_name.lower():
-            best_match = place
-            break
-    
-    # 매칭되는 게 없으면 첫 번째 결과 사용
-    if not best_match:
-        best_match = places[0]
+    best_match = _pick_best_place(restaurant_name, places)
+    if best_match is None:
+        return {**_basic_place_info(restaurant_name, {}), "error": NO_MATCH_ERROR}
     
     # place_id가 있으면 Place Details API 호출
     place_id = best_match.get("place_id")
     if place_id:
         try:
             return get_place_details(place_id, language)
-        except Exception as e:
+        except Exception:
             # Place Details API 실패 시 기본 정보만 반환
-            return {
-                "name": best_match.get("name", restaurant_name),
-                "address": best_match.get("address"),
-                "rating": best_match.get("rating"),
-                "user_ratings_total": best_match.get("user_ratings_total", 0),
-                "reviews": [],
-                "phone_number": None,
-                "opening_hours": [],
-            }
+            pass
     
     # place_id가 없으면 기본 정보만 반환
+    return _basic_place_info(restaurant_name, best_match)
+
+
+def _pick_best_place(restaurant_name: str, places: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Nearby Search 결과에서 식당 이름과 가장 유사한 장소 (결과가 없으면 None)
+    """
+    if not places:
+        return None
+    
+    # 식당 이름과 가장 유사한 결과 찾기 (n-gram/자모/로마자 표기 기반 유사도)
+    best_pos = best_name_match(restaurant_name, [place.get("name", "") for place in places])
+    
+    # 매칭되는 게 없으면 첫 번째 결과 사용
+    return places[best_pos] if best_pos is not None else places[0]
+
+
+def _basic_place_info(restaurant_name: str, place: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Place Details를 가져오지 못했을 때 검색 결과만으로 만드는 get_place_details 형식의 dict
+    """
     return {
-        "name": best_match.get("name", restaurant_name),
-        "address": best_match.get("address"),
-        "rating": best_match.get("rating"),
-        "user_ratings_total": best_match.get("user_ratings_total", 0),
+        "name": place.get("name", restaurant_name),
+        "address": place.get("address"),
+        "rating": place.get("rating"),
+        "user_ratings_total": place.get("user_ratings_total", 0),
         "reviews": [],
         "phone_number": None,
         "opening_hours": [],
     }
+
+
+# --------------------------------------------------
+# 4) 비동기 버전 (공유 httpx.AsyncClient 커넥션 풀 사용)
+# --------------------------------------------------
+
+async def _aget_json(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    resp = await get_async_http_client().get(url, params=params, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def asearch_place(
+    query: str,
+    region: Optional[str] = None,
+    language: str = "ko",
+    limit: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    search_place의 비동기 버전
+    """
+    data = await _aget_json(TEXT_ENDPOINT, _text_search_params(query, region, language))
+    return _parse_places(data, address_field="formatted_address", limit=limit)
+
+
+async def asearch_place_by_location(
+    latitude: float,
+    longitude: float,
+    keyword: Optional[str] = None,
+    radius: int = 150,
+    language: str = "ko",
+) -> List[Dict[str, Any]]:
+    """
+    search_place_by_location의 비동기 버전
+    """
+    params = _nearby_search_params(latitude, longitude, keyword, radius, language)
+    return _parse_places(await _aget_json(NEARBY_ENDPOINT, params), address_field="vicinity")
+
+
+async def aget_place_details(
+    place_id: str,
+    language: str = "ko",
+) -> Dict[str, Any]:
+    """
+    get_place_details의 비동기 버전
+    """
+    return _parse_details(await _aget_json(DETAILS_ENDPOINT, _details_params(place_id, language)))
+
+
+async def aget_place_reviews_by_name_and_location(
+    restaurant_name: str,
+    latitude: float,
+    longitude: float,
+    language: str = "ko",
+) -> Dict[str, Any]:
+    """
+    get_place_reviews_by_name_and_location의 비동기 버전
+    """
+    places = await asearch_place_by_location(
+        latitude=latitude,
+        longitude=longitude,
+        keyword=restaurant_name,
+        radius=100,
+        language=language,
+    )
+    best_match = _pick_best_place(restaurant_name, places)
+    if best_match is None:
+        return {**_basic_place_info(restaurant_name, {}), "error": NO_MATCH_ERROR}
+
+    place_id = best_match.get("place_id")
+    if place_id:
+        try:
+            return await aget_place_details(place_id, language)
+        except Exception:
+            pass
+    return _basic_place_info(restaurant_name, best_match)
+
+
+# --------------------------------------------------
+# 5) 여러 식당 상세 정보 일괄 조회 (검색 결과 → Place Details 병렬 호출)
+# --------------------------------------------------
+
+# 동시에 보낼 Google Places 요청 수 (모든 요청이 같은 풀을 공유해서 전체 동시 호출 수를 제한)
+GOOGLE_PLACES_CONCURRENCY = int(os.getenv("GOOGLE_PLACES_CONCURRENCY", "5"))
+# 일괄 조회 전체에 주는 시간 (초). 넘으면 끝나지 않은 식당은 error="시간 초과"로 돌려준다 (0이면 제한 없음)
+GOOGLE_PLACES_BATCH_TIMEOUT = float(os.getenv("GOOGLE_PLACES_BATCH_TIMEOUT", "15"))
+
+_PLACES_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, GOOGLE_PLACES_CONCURRENCY),
+    thread_name_prefix="google-places",
+)
+
+
+def _enrich_one(restaurant: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """
+    식당 하나의 상세 정보 (실패하면 error 필드에 사유)
+    """
+    name = restaurant.get("name") or ""
+    try:
+        return get_place_reviews_by_name_and_location(
+            restaurant_name=name,
+            latitude=float(restaurant["latitude"]),
+            longitude=float(restaurant["longitude"]),
+            language=language,
+        )
+    except Exception as e:
+        logger.warning("[google_place] %s 상세 정보 조회 실패: %s", name, e)
+        return {**_basic_place_info(name, {}), "error": str(e)}
+
+
+def _timed_out(restaurant: Dict[str, Any]) -> Dict[str, Any]:
+    name = restaurant.get("name") or ""
+    logger.warning("[google_place] %s 상세 정보 조회 시간 초과", name)
+    return {**_basic_place_info(name, {}), "error": "시간 초과"}
+
+
+def enrich_places(
+    restaurants: List[Dict[str, Any]],
+    language: str = "ko",
+    timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    검색된 식당들(name, latitude, longitude)의 상세 정보와 리뷰를 한 번에 가져온다.
+    식당마다 get_place_reviews_by_name_and_location을 공유 스레드 풀에서 동시에 실행한다.
+
+    Args:
+        timeout: 일괄 조회 전체의 마감 시간 (초, None이면 제한 없음)
+
+    Returns:
+        restaurants와 같은 순서의 get_place_details 형식 dict 리스트
+        (실패하거나 마감까지 끝나지 않은 식당은 기본 정보 + error)
+    """
+    futures = [_PLACES_EXECUTOR.submit(_enrich_one, restaurant, language) for restaurant in restaurants]
+    _, pending = wait_futures(futures, timeout=timeout)
+    results = []
+    for restaurant, future in zip(restaurants, futures):
+        if future in pending:
+            # 아직 시작하지 않은 요청은 취소해서 풀을 비운다
+            future.cancel()
+            results.append(_timed_out(restaurant))
+        else:
+            results.append(future.result())
+    return results
+
+
+async def aenrich_places(
+    restaurants: List[Dict[str, Any]],
+    language: str = "ko",
+    max_concurrency: int = GOOGLE_PLACES_CONCURRENCY,
+    timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    enrich_places의 비동기 버전 (동시 요청 수는 max_concurrency로 제한)
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def enrich_one(restaurant: Dict[str, Any]) -> Dict[str, Any]:
+        name = restaurant.get("name") or ""
+        async with semaphore:
+            try:
+                return await aget_place_reviews_by_name_and_location(
+                    restaurant_name=name,
+                    latitude=float(restaurant["latitude"]),
+                    longitude=float(restaurant["longitude"]),
+                    language=language,
+                )
+            except Exception as e:
+                logger.warning("[google_place] %s 상세 정보 조회 실패: %s", name, e)
+                return {**_basic_place_info(name, {}), "error": str(e)}
+
+    tasks = [asyncio.ensure_future(enrich_one(restaurant)) for restaurant in restaurants]
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    return [
+        _timed_out(restaurant) if task in pending else task.result()
+        for restaurant, task in zip(restaurants, tasks)
+    ]
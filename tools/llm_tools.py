@@ -2,16 +2,44 @@
 
 from __future__ import annotations
 import os
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.tools import tool
 
-from .es_search import search_es, search_es_csv_bm25, dense_search, extract_cuisine_type, translate_query_to_english
-from .google_place import search_place, search_place_by_location, get_place_reviews_by_name_and_location, get_place_details
+from .es_search import (
+    search_es,
+    search_es_csv_bm25,
+    dense_search,
+    hybrid_search,
+    extract_cuisine_type,
+    translate_query_to_english,
+    asearch_es,
+    adense_search,
+    ahybrid_search,
+    atranslate_query_to_english,
+)
+from .google_place import (
+    search_place,
+    search_place_by_location,
+    get_place_reviews_by_name_and_location,
+    get_place_details,
+    asearch_place,
+    aget_place_details,
+    aget_place_reviews_by_name_and_location,
+    enrich_places,
+    aenrich_places,
+    GOOGLE_PLACES_BATCH_TIMEOUT,
+)
 from .utility_func import (
     calculator,
     load_menus_for_restaurant,
+    get_menu_store,
 )
+from .name_index import NameMatch, get_restaurant_name_index
+from .records import SearchHit, PlaceDetail, MenuItem, MenuQuote, _to_float
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -28,8 +56,8 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-@tool
-def es_search_tool(query: str, size: int = 5) -> str:
+@tool(response_format="content_and_artifact")
+def es_search_tool(query: str, size: int = 5) -> Tuple[str, List[SearchHit]]:
     """
     ES BM25 (Sparse) + bge-m3 Dense (KNN) 하이브리드 검색
     RRF(Reciprocal Rank Fusion)로 결과 결합
@@ -50,135 +78,366 @@ def es_search_tool(query: str, size: int = 5) -> str:
         translated_query = query
         if not cuisine_type:
             translated_query = translate_query_to_english(query)
-            if translated_query != query:
-                logger.info(f"[es_search_tool] 쿼리 번역: '{query}' → '{translated_query}' (BM25 검색용)")
-                cuisine_type, _ = extract_cuisine_type(translated_query)
+            cuisine_type = _cuisine_from_translation(query, translated_query)
         
-        # 1) Sparse Search (BM25) - 10개 가져오기
-        sparse_results = []
-        try:
-            logger.info(f"[es_search_tool] [BM25] 검색 시작... (쿼리: '{translated_query}')")
-            sparse_results = search_es(translated_query, size=10)
-            logger.info(f"[es_search_tool] [BM25] 검색 완료: {len(sparse_results)}개 결과 발견")
-        except Exception as e:
-            logger.warning(f"[es_search_tool] [BM25] 검색 실패 (계속 진행): {str(e)}")
+        # 1) Sparse Search (BM25) + 2) Dense Search (KNN) + 3) RRF 결합 - 각각 10개
+        logger.info(f"[es_search_tool] [BM25] 쿼리: '{translated_query}' / [Dense/KNN] 쿼리: '{query}'")
+        fused_results = _hybrid_retrieve(translated_query, query, window_size=10)
+        return _format_es_search_results(fused_results, cuisine_type, size)
         
-        # 2) Dense Search (KNN) - 10개 가져오기
-        dense_results = []
-        try:
-            logger.info(f"[es_search_tool] [Dense/KNN] 검색 시작... (쿼리: '{query}')")
-            dense_results = dense_search(query, size=10)
-            logger.info(f"[es_search_tool] [Dense/KNN] 검색 완료: {len(dense_results)}개 결과 발견")
-        except Exception as e:
-            logger.warning(f"[es_search_tool] [Dense/KNN] 검색 실패 (Sparse 결과만 사용): {str(e)}")
+    except Exception as e:
+        import traceback
+        error_msg = f"[오류] 검색 실패: {str(e)}\n{traceback.format_exc()}"
+        logger.error(f"[es_search_tool] {error_msg}")
+        return error_msg, []
+
+
+async def _aes_search_tool(query: str, size: int = 5) -> Tuple[str, List[SearchHit]]:
+    """
+    es_search_tool의 비동기 버전 (번역/검색을 이벤트 루프에서 비동기로 처리)
+    """
+    try:
+        logger.info(f"[es_search_tool] 비동기 검색 시작: query='{query}', size={size}")
         
-        # 검색 결과 요약 로그
-        logger.info(f"[es_search_tool] ===== 검색 결과 요약 =====")
-        logger.info(f"[es_search_tool] BM25 (Sparse): {len(sparse_results)}개 결과")
-        logger.info(f"[es_search_tool] Dense (KNN): {len(dense_results)}개 결과")
-        logger.info(f"[es_search_tool] ==========================")
+        cuisine_type, _ = extract_cuisine_type(query)
+        translated_query = query
+        if not cuisine_type:
+            translated_query = await atranslate_query_to_english(query)
+            cuisine_type = _cuisine_from_translation(query, translated_query)
         
-        # 둘 다 실패한 경우
-        if not sparse_results and not dense_results:
-            logger.error("[es_search_tool] Sparse와 Dense 검색 모두 실패했습니다.")
-            return "검색 결과가 없습니다. Elasticsearch 연결 또는 인덱스를 확인해주세요."
+        fused_results = await _ahybrid_retrieve(translated_query, query, window_size=10)
+        return _format_es_search_results(fused_results, cuisine_type, size)
         
-        # 3) RRF로 결과 결합 (k=60)
-        logger.info("[es_search_tool] [RRF] 결과 결합 시작...")
-        fused_results = _rrf_fusion(sparse_results, dense_results, k=60)
-        logger.info(f"[es_search_tool] [RRF] 결합 완료: {len(fused_results)}개 결과 (BM25: {len(sparse_results)}개 + Dense: {len(dense_results)}개 → {len(fused_results)}개)")
+    except Exception as e:
+        import traceback
+        error_msg = f"[오류] 검색 실패: {str(e)}\n{traceback.format_exc()}"
+        logger.error(f"[es_search_tool] {error_msg}")
+        return error_msg, []
+
+
+es_search_tool.coroutine = _aes_search_tool
+
+
+def _cuisine_from_translation(query: str, translated_query: str) -> str | None:
+    if translated_query == query:
+        return None
+    logger.info(f"[es_search_tool] 쿼리 번역: '{query}' → '{translated_query}' (BM25 검색용)")
+    cuisine_type, _ = extract_cuisine_type(translated_query)
+    return cuisine_type
+
+
+def _format_es_search_results(
+    fused_results: List[Dict[str, Any]] | None,
+    cuisine_type: str | None,
+    size: int,
+) -> Tuple[str, List[SearchHit]]:
+    """
+    하이브리드 검색 결과를 음식 종류로 필터링하고 LLM에 넘길 텍스트로 만든다.
+    (es_search_tool 동기/비동기 공통)
+
+    Returns:
+        (LLM에 넘길 텍스트, 검색된 식당 목록) - 식당 목록은 ToolMessage.artifact로 전달되어
+        places 단계에서 텍스트를 다시 파싱하지 않고 이름/좌표를 그대로 사용한다.
+    """
+    if fused_results is None:
+        logger.error("[es_search_tool] Sparse와 Dense 검색 모두 실패했습니다.")
+        return "검색 결과가 없습니다. Elasticsearch 연결 또는 인덱스를 확인해주세요.", []
+    
+    # 4) 특정 음식 종류 검색인 경우 결과 필터링 (cuisines에 해당 키워드 포함 확인)
+    if cuisine_type:
+        logger.info(f"[es_search_tool] {cuisine_type} 음식 검색: cuisines 필드 필터링 시작...")
+        filtered_results = []
+        cuisine_type_lower = cuisine_type.lower()
         
-        # 4) 특정 음식 종류 검색인 경우 결과 필터링 (cuisines에 해당 키워드 포함 확인)
-        if cuisine_type:
-            logger.info(f"[es_search_tool] {cuisine_type} 음식 검색: cuisines 필드 필터링 시작...")
-            filtered_results = []
-            cuisine_type_lower = cuisine_type.lower()
+        for result in fused_results:
+            source = result.get("source", {})
+            cuisines = source.get("cuisines", "") or source.get("Cuisines", "") or ""
+            cuisines_lower = cuisines.lower()
             
-            for result in fused_results:
-                source = result.get("source", {})
-                cuisines = source.get("cuisines", "") or source.get("Cuisines", "") or ""
-                cuisines_lower = cuisines.lower()
-                
-                # 해당 음식 키워드가 cuisines에 포함되어 있는지 확인
-                if cuisine_type_lower in cuisines_lower:
-                    filtered_results.append(result)
-                    logger.info(f"[es_search_tool] ✅ {cuisine_type} 매칭: {source.get('restaurant_name', 'N/A')} (cuisines: {cuisines})")
-                else:
-                    logger.info(f"[es_search_tool] ❌ {cuisine_type} 아님 (제외): {source.get('restaurant_name', 'N/A')} (cuisines: {cuisines})")
-            
-            logger.info(f"[es_search_tool] 필터링 완료: {len(fused_results)}개 → {len(filtered_results)}개 ({cuisine_type}만)")
-            fused_results = filtered_results
-            
-            if not fused_results:
-                logger.warning(f"[es_search_tool] {cuisine_type} 음식 검색 결과가 없습니다.")
-                cuisine_name = {"Korean": "한국", "Japanese": "일본", "Chinese": "중국", "Italian": "이탈리아", 
-                               "Thai": "태국", "Indian": "인도", "Mexican": "멕시코", "French": "프랑스",
-                               "Western": "서양", "European": "유럽"}.get(cuisine_type, cuisine_type)
-                return f"검색 결과가 없습니다. {cuisine_name}음식을 제공하는 식당을 찾지 못했습니다."
+            # 해당 음식 키워드가 cuisines에 포함되어 있는지 확인
+            if cuisine_type_lower in cuisines_lower:
+                filtered_results.append(result)
+                logger.info(f"[es_search_tool] ✅ {cuisine_type} 매칭: {source.get('restaurant_name', 'N/A')} (cuisines: {cuisines})")
+            else:
+                logger.info(f"[es_search_tool] ❌ {cuisine_type} 아님 (제외): {source.get('restaurant_name', 'N/A')} (cuisines: {cuisines})")
         
-        # 5) 상위 N개 선택
-        top_results = fused_results[:size]
+        logger.info(f"[es_search_tool] 필터링 완료: {len(fused_results)}개 → {len(filtered_results)}개 ({cuisine_type}만)")
+        fused_results = filtered_results
         
-        if not top_results:
-            logger.warning("[es_search_tool] 검색 결과가 없습니다.")
-            return "검색 결과가 없습니다."
+        if not fused_results:
+            logger.warning(f"[es_search_tool] {cuisine_type} 음식 검색 결과가 없습니다.")
+            cuisine_name = {"Korean": "한국", "Japanese": "일본", "Chinese": "중국", "Italian": "이탈리아", 
+                           "Thai": "태국", "Indian": "인도", "Mexican": "멕시코", "French": "프랑스",
+                           "Western": "서양", "European": "유럽"}.get(cuisine_type, cuisine_type)
+            return f"검색 결과가 없습니다. {cuisine_name}음식을 제공하는 식당을 찾지 못했습니다.", []
+    
+    # 5) 상위 N개 선택
+    top_results = fused_results[:size]
+    
+    if not top_results:
+        logger.warning("[es_search_tool] 검색 결과가 없습니다.")
+        return "검색 결과가 없습니다.", []
+    
+    logger.info(f"[es_search_tool] 최종 결과 {len(top_results)}개 반환")
+    
+    # 5) 결과 포맷팅
+    lines = ["[맛집 검색 결과]"]
+    hits = []
+    for i, result in enumerate(top_results, start=1):
+        source = result["source"]
+        rrf_score = result["rrf_score"]
         
-        logger.info(f"[es_search_tool] 최종 결과 {len(top_results)}개 반환")
+        # 실제 필드명에 맞춰 추출 (모두 소문자+언더스코어)
+        name = source.get("restaurant_name") or source.get("Restaurant Name") or source.get("name") or "이름 없음"
+        city = source.get("city") or source.get("City") or ""
+        cuisines = source.get("cuisines") or source.get("Cuisines") or ""
+        address = source.get("address") or source.get("Address") or ""
+        locality = source.get("locality") or source.get("Locality") or ""
+        locality_verbose = source.get("locality_verbose") or source.get("Locality Verbose") or ""
+        rating = source.get("aggregate_rating") or source.get("Aggregate rating") or source.get("rating") or "N/A"
+        votes = source.get("votes") or source.get("Votes") or "0"
+        price_range = source.get("price_range") or source.get("Price range") or ""
+        avg_cost = source.get("average_cost_for_two") or source.get("Average Cost for two") or ""
+        currency = source.get("currency") or source.get("Currency") or ""
+        latitude = source.get("latitude") or source.get("Latitude") or "?"
+        longitude = source.get("longitude") or source.get("Longitude") or "?"
         
-        # 5) 결과 포맷팅
-        lines = ["[맛집 검색 결과]"]
-        for i, result in enumerate(top_results, start=1):
-            source = result["source"]
-            rrf_score = result["rrf_score"]
-            
-            # 실제 필드명에 맞춰 추출 (모두 소문자+언더스코어)
-            name = source.get("restaurant_name") or source.get("Restaurant Name") or source.get("name") or "이름 없음"
-            city = source.get("city") or source.get("City") or ""
-            cuisines = source.get("cuisines") or source.get("Cuisines") or ""
-            address = source.get("address") or source.get("Address") or ""
-            locality = source.get("locality") or source.get("Locality") or ""
-            locality_verbose = source.get("locality_verbose") or source.get("Locality Verbose") or ""
-            rating = source.get("aggregate_rating") or source.get("Aggregate rating") or source.get("rating") or "N/A"
-            votes = source.get("votes") or source.get("Votes") or "0"
-            price_range = source.get("price_range") or source.get("Price range") or ""
-            avg_cost = source.get("average_cost_for_two") or source.get("Average Cost for two") or ""
-            currency = source.get("currency") or source.get("Currency") or ""
-            latitude = source.get("latitude") or source.get("Latitude") or "?"
-            longitude = source.get("longitude") or source.get("Longitude") or "?"
-            
-            # 지역 정보 (locality_verbose 우선, 없으면 locality)
-            location_info = locality_verbose or locality
-            location_str = f", {location_info}" if location_info else ""
-            
-            # cuisines 정보 강조 (검색 쿼리와 관련된 경우)
-            cuisines_display = cuisines if cuisines else "요리 정보 없음"
-            # RRF 스코어도 포함 (디버깅/신뢰도 표시용)
-            
-            lines.append(
-                f"[{i}] {name} ({city}{location_str})\n"
-                f"- 🍽️ 요리 종류: {cuisines_display}\n"
-                f"- 📍 주소: {address}\n"
-                f"- ⭐ 평점: {rating}점 ({votes}표)\n"
-                + (f"- 💰 가격대: {price_range} ({avg_cost} {currency})" if avg_cost else "- 💰 가격 정보 없음")
-                + f"\n- 🗺️ 좌표: ({latitude}, {longitude})"
-                + f"\n- 📊 검색 매칭 점수: {rrf_score:.4f}"
-            )
+        # 지역 정보 (locality_verbose 우선, 없으면 locality)
+        location_info = locality_verbose or locality
+        location_str = f", {location_info}" if location_info else ""
         
-        result_text = "\n\n".join(lines)
-        logger.info(f"[es_search_tool] 검색 완료. 결과 길이: {len(result_text)}자")
-        return result_text
+        # cuisines 정보 강조 (검색 쿼리와 관련된 경우)
+        cuisines_display = cuisines if cuisines else "요리 정보 없음"
+        # RRF 스코어도 포함 (디버깅/신뢰도 표시용)
         
-    except Exception as e:
-        import traceback
-        error_msg = f"[오류] 검색 실패: {str(e)}\n{traceback.format_exc()}"
-        logger.error(f"[es_search_tool] {error_msg}")
-        return error_msg
+        lines.append(
+            f"[{i}] {name} ({city}{location_str})\n"
+            f"- 🍽️ 요리 종류: {cuisines_display}\n"
+            f"- 📍 주소: {address}\n"
+            f"- ⭐ 평점: {rating}점 ({votes}표)\n"
+            + (f"- 💰 가격대: {price_range} ({avg_cost} {currency})" if avg_cost else "- 💰 가격 정보 없음")
+            + f"\n- 🗺️ 좌표: ({latitude}, {longitude})"
+            + f"\n- 📊 검색 매칭 점수: {rrf_score:.4f}"
+        )
+        hits.append(SearchHit(
+            rank=i,
+            name=name,
+            restaurant_id=str(source.get("restaurant_id") or result.get("id") or "") or None,
+            city=city,
+            locality=location_info,
+            cuisines=cuisines,
+            address=address,
+            rating=_to_float(rating),
+            votes=int(_to_float(votes) or 0),
+            avg_cost=f"{avg_cost} {currency}".strip() if avg_cost else "",
+            latitude=_to_float(latitude),
+            longitude=_to_float(longitude),
+            score=rrf_score,
+        ))
+    
+    result_text = "\n\n".join(lines)
+    logger.info(f"[es_search_tool] 검색 완료. 결과 길이: {len(result_text)}자")
+    return result_text, hits
 
 
 ##############################################
 # 하이브리드 검색 툴 (BM25 + Dense + RRF)
 ##############################################
 
+# BM25 / Dense 검색을 동시에 실행하기 위한 공유 스레드 풀 (동시 실행 수 제한)
+_SEARCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("HYBRID_SEARCH_WORKERS", "8")),
+    thread_name_prefix="hybrid-search",
+)
+
+
+def _run_hybrid_legs(
+    sparse_query: str,
+    dense_query: str,
+    size: int = 10,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    BM25(Sparse) 검색과 임베딩+KNN(Dense) 검색을 동시에 시작하고,
+    각 검색의 제한 시간 안에 끝난 결과만 반환한다.
+
+    - HYBRID_SPARSE_TIMEOUT: BM25 검색 제한 시간(초, 기본값 10)
+    - HYBRID_DENSE_TIMEOUT: 임베딩+KNN 검색 제한 시간(초, 기본값 15)
+
+    한쪽이 실패하거나 제한 시간을 넘기면 해당 결과는 빈 리스트로 처리한다 (부분 결과 사용).
+
+    Returns:
+        (sparse_results, dense_results)
+    """
+    leg_timeouts = {
+        "BM25": float(os.getenv("HYBRID_SPARSE_TIMEOUT", "10")),
+        "Dense/KNN": float(os.getenv("HYBRID_DENSE_TIMEOUT", "15")),
+    }
+    futures = {
+        "BM25": _SEARCH_EXECUTOR.submit(search_es, sparse_query, size=size),
+        "Dense/KNN": _SEARCH_EXECUTOR.submit(dense_search, dense_query, size=size),
+    }
+    started = time.monotonic()
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for leg, future in futures.items():
+        remaining = leg_timeouts[leg] - (time.monotonic() - started)
+        try:
+            results[leg] = future.result(timeout=max(remaining, 0.0))
+            logger.info(f"[hybrid] [{leg}] 검색 완료: {len(results[leg])}개 결과 ({time.monotonic() - started:.2f}s)")
+        except FuturesTimeoutError:
+            # 실행 중인 작업은 취소할 수 없으므로 결과만 버린다
+            future.cancel()
+            logger.warning(f"[hybrid] [{leg}] 제한 시간({leg_timeouts[leg]}s) 초과, 부분 결과만 사용")
+            results[leg] = []
+        except Exception as e:
+            logger.warning(f"[hybrid] [{leg}] 검색 실패 (다른 결과만 사용): {str(e)}")
+            results[leg] = []
+
+    return results["BM25"], results["Dense/KNN"]
+
+
+
+def _hybrid_retrieve(
+    sparse_query: str,
+    dense_query: str,
+    window_size: int = 10,
+    k: int = 60,
+) -> List[Dict[str, Any]] | None:
+    """
+    BM25 + Dense 하이브리드 검색 결과를 RRF로 결합해서 반환한다.
+
+    1) ES 네이티브 RRF가 가능하면 한 번의 ES 요청으로 처리 (hybrid_search)
+    2) 클러스터가 지원하지 않거나(None) 임베딩이 제한 시간을 넘기면
+       BM25 / Dense 검색을 동시에 실행하고 Python에서 RRF 결합 (_rrf_fusion)
+
+    Returns:
+        _rrf_fusion과 같은 형식의 결과 리스트. 두 검색이 모두 실패하면 None.
+
+    Raises:
+        ES 연결/전송 오류는 Python RRF로 다시 시도하지 않고 그대로 올라간다 (호출 측의 오류 처리)
+    """
+    try:
+        native_results = hybrid_search(
+            sparse_query,
+            dense_query=dense_query,
+            size=window_size,
+            window_size=window_size,
+            rank_constant=k,
+        )
+    except FuturesTimeoutError:
+        # 임베딩이 늦은 경우만 대체 (ES 연결/전송 오류는 다시 ES를 호출하지 않고 그대로 올려 보낸다)
+        logger.warning("[hybrid] 네이티브 RRF용 임베딩 시간 초과 (Python RRF로 대체)")
+        native_results = None
+
+    if native_results is not None:
+        logger.info(f"[hybrid] [ES RRF] 단일 요청 결합 완료: {len(native_results)}개 결과")
+        return [
+            {
+                "id": r["id"],
+                "source": r["source"],
+                "rrf_score": r["score"],
+                "sparse_rank": None,
+                "dense_rank": None,
+            }
+            for r in native_results
+        ]
+
+    sparse_results, dense_results = _run_hybrid_legs(sparse_query, dense_query, size=window_size)
+
+    # 검색 결과 요약 로그
+    logger.info(f"[hybrid] ===== 검색 결과 요약 =====")
+    logger.info(f"[hybrid] BM25 (Sparse): {len(sparse_results)}개 결과")
+    logger.info(f"[hybrid] Dense (KNN): {len(dense_results)}개 결과")
+    logger.info(f"[hybrid] ==========================")
+
+    # 둘 다 실패한 경우
+    if not sparse_results and not dense_results:
+        return None
+
+    # RRF로 결과 결합
+    fused_results = _rrf_fusion(sparse_results, dense_results, k=k)
+    logger.info(f"[hybrid] [RRF] 결합 완료: {len(fused_results)}개 결과 (BM25: {len(sparse_results)}개 + Dense: {len(dense_results)}개 → {len(fused_results)}개)")
+    return fused_results
+
+async def _arun_hybrid_legs(
+    sparse_query: str,
+    dense_query: str,
+    size: int = 10,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    _run_hybrid_legs의 비동기 버전
+    스레드 풀 없이 asearch_es / adense_search를 동시에 실행하고, 제한 시간을 넘기면 취소한다.
+    """
+    leg_timeouts = {
+        "BM25": float(os.getenv("HYBRID_SPARSE_TIMEOUT", "10")),
+        "Dense/KNN": float(os.getenv("HYBRID_DENSE_TIMEOUT", "15")),
+    }
+    legs = {
+        "BM25": asearch_es(sparse_query, size=size),
+        "Dense/KNN": adense_search(dense_query, size=size),
+    }
+    started = time.monotonic()
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(coro, timeout=leg_timeouts[leg]) for leg, coro in legs.items()),
+        return_exceptions=True,
+    )
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for leg, outcome in zip(legs, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            logger.warning(f"[hybrid] [{leg}] 제한 시간({leg_timeouts[leg]}s) 초과, 부분 결과만 사용")
+            results[leg] = []
+        elif isinstance(outcome, BaseException):
+            logger.warning(f"[hybrid] [{leg}] 검색 실패 (다른 결과만 사용): {str(outcome)}")
+            results[leg] = []
+        else:
+            results[leg] = outcome
+            logger.info(f"[hybrid] [{leg}] 검색 완료: {len(outcome)}개 결과 ({time.monotonic() - started:.2f}s)")
+
+    return results["BM25"], results["Dense/KNN"]
+
+
+async def _ahybrid_retrieve(
+    sparse_query: str,
+    dense_query: str,
+    window_size: int = 10,
+    k: int = 60,
+) -> List[Dict[str, Any]] | None:
+    """
+    _hybrid_retrieve의 비동기 버전 (ES 네이티브 RRF → 미지원/임베딩 시간 초과 시 비동기 병렬 검색 + Python RRF)
+    """
+    try:
+        native_results = await ahybrid_search(
+            sparse_query,
+            dense_query=dense_query,
+            size=window_size,
+            window_size=window_size,
+            rank_constant=k,
+        )
+    except asyncio.TimeoutError:
+        # 임베딩이 늦은 경우만 대체 (ES 연결/전송 오류는 다시 ES를 호출하지 않고 그대로 올려 보낸다)
+        logger.warning("[hybrid] 네이티브 RRF용 임베딩 시간 초과 (Python RRF로 대체)")
+        native_results = None
+
+    if native_results is not None:
+        logger.info(f"[hybrid] [ES RRF] 단일 요청 결합 완료: {len(native_results)}개 결과")
+        return [
+            {
+                "id": r["id"],
+                "source": r["source"],
+                "rrf_score": r["score"],
+                "sparse_rank": None,
+                "dense_rank": None,
+            }
+            for r in native_results
+        ]
+
+    sparse_results, dense_results = await _arun_hybrid_legs(sparse_query, dense_query, size=window_size)
+    if not sparse_results and not dense_results:
+        return None
+    return _rrf_fusion(sparse_results, dense_results, k=k)
+
+
 def _rrf_fusion(
     sparse_results: List[Dict[str, Any]],
     dense_results: List[Dict[str, Any]],
@@ -255,61 +514,72 @@ def hybrid_search_tool(query: str, size: int = 5) -> str:
     LLM이 가장 많이 사용할 근본 검색 툴.
     """
     try:
-        # 1) Sparse Search (BM25) - 10개 가져오기
-        sparse_results = search_es(query, size=10)
-        
-        # 2) Dense Search (KNN) - 10개 가져오기
-        dense_results = dense_search(query, size=10)
-        
-        # 3) RRF로 결과 결합 (k=60)
-        fused_results = _rrf_fusion(sparse_results, dense_results, k=60)
-        
-        # 4) 상위 N개 선택
-        top_results = fused_results[:size]
-        
-        if not top_results:
-            return "검색 결과가 없습니다."
-        
-        # 5) 결과 포맷팅
-        lines = ["[하이브리드 검색 결과 (BM25 + Dense + RRF)]"]
-        for i, result in enumerate(top_results, start=1):
-            source = result["source"]
-            doc_id = result["id"]
-            rrf_score = result["rrf_score"]
-            
-            # 실제 필드명에 맞춰 추출
-            name = source.get("Restaurant Name") or source.get("name") or "이름 없음"
-            city = source.get("City") or source.get("city") or ""
-            cuisines = source.get("Cuisines") or source.get("cuisines") or ""
-            address = source.get("Address") or source.get("address") or ""
-            locality = source.get("Locality") or source.get("locality") or ""
-            rating = source.get("Aggregate rating") or source.get("rating") or "N/A"
-            votes = source.get("Votes") or source.get("votes") or "0"
-            price_range = source.get("Price range") or source.get("price_range") or ""
-            avg_cost = source.get("Average Cost for two") or source.get("average_cost") or ""
-            currency = source.get("Currency") or source.get("currency") or ""
-            
-            lines.append(
-                f"[{i}] {name}\n"
-                f"- 위치: {city}" + (f", {locality}" if locality else "") + "\n"
-                f"- 요리: {cuisines}\n"
-                f"- 주소: {address}\n"
-                f"- 평점: {rating}점 ({votes}표)\n"
-                + (f"- 가격대: {price_range} ({avg_cost} {currency})" if avg_cost else "- 가격 정보 없음")
-                + f"\n- RRF Score: {rrf_score:.6f}"
-                + (f" (Sparse: {result['sparse_rank']}, Dense: {result['dense_rank']})" 
-                   if result['sparse_rank'] and result['dense_rank'] 
-                   else f" (Sparse: {result['sparse_rank'] or 'N/A'}, Dense: {result['dense_rank'] or 'N/A'})")
-            )
-        
-        return "\n\n".join(lines)
+        # 1) Sparse Search (BM25) + 2) Dense Search (KNN) + 3) RRF 결합 - 각각 10개
+        fused_results = _hybrid_retrieve(query, query, window_size=10) or []
+        return _format_hybrid_search_results(fused_results, size)
         
     except Exception as e:
         return f"[오류] Hybrid 검색 실패: {str(e)}"
 
 
-@tool
-def google_places_tool(query: str) -> str:
+async def _ahybrid_search_tool(query: str, size: int = 5) -> str:
+    """
+    hybrid_search_tool의 비동기 버전
+    """
+    try:
+        fused_results = await _ahybrid_retrieve(query, query, window_size=10) or []
+        return _format_hybrid_search_results(fused_results, size)
+    except Exception as e:
+        return f"[오류] Hybrid 검색 실패: {str(e)}"
+
+
+hybrid_search_tool.coroutine = _ahybrid_search_tool
+
+
+def _format_hybrid_search_results(fused_results: List[Dict[str, Any]], size: int) -> str:
+    # 4) 상위 N개 선택
+    top_results = fused_results[:size]
+    
+    if not top_results:
+        return "검색 결과가 없습니다."
+    
+    # 5) 결과 포맷팅
+    lines = ["[하이브리드 검색 결과 (BM25 + Dense + RRF)]"]
+    for i, result in enumerate(top_results, start=1):
+        source = result["source"]
+        doc_id = result["id"]
+        rrf_score = result["rrf_score"]
+        
+        # 실제 필드명에 맞춰 추출
+        name = source.get("Restaurant Name") or source.get("name") or "이름 없음"
+        city = source.get("City") or source.get("city") or ""
+        cuisines = source.get("Cuisines") or source.get("cuisines") or ""
+        address = source.get("Address") or source.get("address") or ""
+        locality = source.get("Locality") or source.get("locality") or ""
+        rating = source.get("Aggregate rating") or source.get("rating") or "N/A"
+        votes = source.get("Votes") or source.get("votes") or "0"
+        price_range = source.get("Price range") or source.get("price_range") or ""
+        avg_cost = source.get("Average Cost for two") or source.get("average_cost") or ""
+        currency = source.get("Currency") or source.get("currency") or ""
+        
+        lines.append(
+            f"[{i}] {name}\n"
+            f"- 위치: {city}" + (f", {locality}" if locality else "") + "\n"
+            f"- 요리: {cuisines}\n"
+            f"- 주소: {address}\n"
+            f"- 평점: {rating}점 ({votes}표)\n"
+            + (f"- 가격대: {price_range} ({avg_cost} {currency})" if avg_cost else "- 가격 정보 없음")
+            + f"\n- RRF Score: {rrf_score:.6f}"
+            + (f" (Sparse: {result['sparse_rank']}, Dense: {result['dense_rank']})" 
+               if result['sparse_rank'] and result['dense_rank'] 
+               else f" (Sparse: {result['sparse_rank'] or 'N/A'}, Dense: {result['dense_rank'] or 'N/A'})")
+        )
+    
+    return "\n\n".join(lines)
+
+
+@tool(response_format="content_and_artifact")
+def google_places_tool(query: str) -> Tuple[str, List[PlaceDetail]]:
     """
     Google Places API로 특정 식당 이름(query)을 검색하고, 상세 정보와 리뷰를 가져온다.
     
@@ -324,60 +594,108 @@ def google_places_tool(query: str) -> str:
         limit=1,  # 특정 식당이므로 첫 번째 결과만 사용
     )
     if not places:
-        return f"'{query}'에 대한 검색 결과가 없습니다."
+        return f"'{query}'에 대한 검색 결과가 없습니다.", []
 
     # 첫 번째 결과 사용
     place = places[0]
     place_id = place.get("place_id")
     
-    lines = [f"[Google Places 검색 결과] {place.get('name', query)}"]
-    lines.append(f"- 주소: {place.get('address', '주소 정보 없음')}")
-    lines.append(f"- 평점: {place.get('rating', 'N/A')}점 (전체 리뷰 {place.get('user_ratings_total', 0)}개)")
-    
     # place_id가 있으면 상세 정보와 리뷰 가져오기
+    details, error = None, None
     if place_id:
         try:
             details = get_place_details(place_id, language="ko")
-            reviews = details.get("reviews", [])
-            phone_number = details.get("phone_number")
-            opening_hours = details.get("opening_hours", [])
-            
-            # 전화번호
-            if phone_number:
-                lines.append(f"- 전화번호: {phone_number}")
-            
-            # 영업시간
-            if opening_hours:
-                lines.append(f"\n[영업시간]")
-                for hours in opening_hours:
-                    lines.append(f"  {hours}")
-            
-            # 리뷰 (상위 3개)
-            if reviews:
-                lines.append(f"\n[리뷰 요약] (상위 {len(reviews)}개):")
-                for i, review in enumerate(reviews, start=1):
-                    author_name = review.get("author_name", "익명")
-                    rating = review.get("rating", "N/A")
-                    text = review.get("text", "")
-                    # 리뷰 텍스트가 너무 길면 200자로 제한
-                    if len(text) > 200:
-                        text = text[:200] + "..."
-                    
-                    lines.append(
-                        f"\n{i}. {author_name} ({rating}점):\n   {text}"
-                    )
-            else:
-                lines.append("\n[리뷰] 리뷰 정보를 가져오지 못했습니다.")
         except Exception as e:
-            lines.append(f"\n[오류] 상세 정보를 가져오는 중 오류 발생: {str(e)}")
-    else:
+            error = e
+    return _format_google_place(query, place, details, error)
+
+
+async def _agoogle_places_tool(query: str) -> Tuple[str, List[PlaceDetail]]:
+    """
+    google_places_tool의 비동기 버전
+    """
+    places = await asearch_place(
+        query=query,
+        region=os.getenv("GOOGLE_PLACES_REGION", "kr"),
+        limit=1,
+    )
+    if not places:
+        return f"'{query}'에 대한 검색 결과가 없습니다.", []
+
+    place = places[0]
+    details, error = None, None
+    if place.get("place_id"):
+        try:
+            details = await aget_place_details(place["place_id"], language="ko")
+        except Exception as e:
+            error = e
+    return _format_google_place(query, place, details, error)
+
+
+google_places_tool.coroutine = _agoogle_places_tool
+
+
+def _format_google_place(
+    query: str,
+    place: Dict[str, Any],
+    details: Dict[str, Any] | None,
+    error: Exception | None,
+) -> Tuple[str, List[PlaceDetail]]:
+    lines = [f"[Google Places 검색 결과] {place.get('name', query)}"]
+    lines.append(f"- 주소: {place.get('address', '주소 정보 없음')}")
+    lines.append(f"- 평점: {place.get('rating', 'N/A')}점 (전체 리뷰 {place.get('user_ratings_total', 0)}개)")
+    
+    if not place.get("place_id"):
         lines.append("\n[오류] place_id가 없어 상세 정보를 가져올 수 없습니다.")
+    elif error is not None:
+        lines.append(f"\n[오류] 상세 정보를 가져오는 중 오류 발생: {str(error)}")
+    else:
+        _append_place_details(lines, details)
     
-    return "\n".join(lines)
+    info = details if details else {**place, "error": str(error) if error else None}
+    return "\n".join(lines), [PlaceDetail.from_place_info(query, info)]
 
 
-@tool
-def google_places_by_location_tool(latitude: float, longitude: float, restaurant_name: str = "") -> str:
+def _append_place_details(lines: List[str], details: Dict[str, Any]) -> None:
+    """
+    Place Details의 전화번호 / 영업시간 / 리뷰(상위 3개)를 lines에 추가한다.
+    """
+    reviews = details.get("reviews", [])
+    phone_number = details.get("phone_number")
+    opening_hours = details.get("opening_hours", [])
+    
+    # 전화번호
+    if phone_number:
+        lines.append(f"- 전화번호: {phone_number}")
+    
+    # 영업시간
+    if opening_hours:
+        lines.append(f"\n[영업시간]")
+        for hours in opening_hours:
+            lines.append(f"  {hours}")
+    
+    # 리뷰 (상위 3개)
+    if reviews:
+        lines.append(f"\n[리뷰 요약] (상위 {len(reviews)}개):")
+        for i, review in enumerate(reviews, start=1):
+            author_name = review.get("author_name", "익명")
+            rating = review.get("rating", "N/A")
+            text = review.get("text", "")
+            # 리뷰 텍스트가 너무 길면 200자로 제한
+            if len(text) > 200:
+                text = text[:200] + "..."
+            
+            lines.append(
+                f"\n{i}. {author_name} ({rating}점):\n   {text}"
+            )
+    else:
+        lines.append("\n[리뷰] 리뷰 정보를 가져오지 못했습니다.")
+
+
+@tool(response_format="content_and_artifact")
+def google_places_by_location_tool(
+    latitude: float, longitude: float, restaurant_name: str = ""
+) -> Tuple[str, List[PlaceDetail]]:
     """
     위도/경도와 식당 이름을 사용해서 Google Places API에서 상세 정보와 리뷰를 가져온다.
     
@@ -390,7 +708,7 @@ def google_places_by_location_tool(latitude: float, longitude: float, restaurant
         restaurant_name: 식당 이름 (필수, es_search_tool 결과에서 가져온 이름)
     """
     if not restaurant_name:
-        return f"식당 이름이 필요합니다. 위도 {latitude}, 경도 {longitude}만으로는 리뷰를 가져올 수 없습니다."
+        return f"식당 이름이 필요합니다. 위도 {latitude}, 경도 {longitude}만으로는 리뷰를 가져올 수 없습니다.", []
     
     try:
         place_info = get_place_reviews_by_name_and_location(
@@ -399,50 +717,114 @@ def google_places_by_location_tool(latitude: float, longitude: float, restaurant
             longitude=longitude,
             language="ko",
         )
+        return _format_place_info(restaurant_name, place_info), [PlaceDetail.from_place_info(restaurant_name, place_info)]
         
-        name = place_info.get("name", restaurant_name)
-        address = place_info.get("address", "주소 정보 없음")
-        rating = place_info.get("rating", "N/A")
-        user_ratings_total = place_info.get("user_ratings_total", 0)
-        reviews = place_info.get("reviews", [])
-        phone_number = place_info.get("phone_number")
-        opening_hours = place_info.get("opening_hours", [])
-        
-        lines = [f"[Google Places 상세 정보] {name}"]
-        lines.append(f"- 주소: {address}")
-        lines.append(f"- 평점: {rating}점 (전체 리뷰 {user_ratings_total}개)")
-        
-        # 전화번호
-        if phone_number:
-            lines.append(f"- 전화번호: {phone_number}")
-        
-        # 영업시간
-        if opening_hours:
-            lines.append(f"\n[영업시간]")
-            for hours in opening_hours:
-                lines.append(f"  {hours}")
-        
-        # 리뷰 (상위 3개)
-        if reviews:
-            lines.append(f"\n[리뷰 요약] (상위 {len(reviews)}개):")
-            for i, review in enumerate(reviews, start=1):
-                author_name = review.get("author_name", "익명")
-                rating = review.get("rating", "N/A")
-                text = review.get("text", "")
-                # 리뷰 텍스트가 너무 길면 200자로 제한
-                if len(text) > 200:
-                    text = text[:200] + "..."
-                
-                lines.append(
-                    f"\n{i}. {author_name} ({rating}점):\n   {text}"
-                )
-        else:
-            lines.append("\n[리뷰] 리뷰 정보를 가져오지 못했습니다.")
-        
-        return "\n".join(lines)
-        
     except Exception as e:
-        return f"Google Places API 호출 중 오류 발생: {str(e)}"
+        return f"Google Places API 호출 중 오류 발생: {str(e)}", []
+
+
+async def _agoogle_places_by_location_tool(
+    latitude: float, longitude: float, restaurant_name: str = ""
+) -> Tuple[str, List[PlaceDetail]]:
+    """
+    google_places_by_location_tool의 비동기 버전
+    """
+    if not restaurant_name:
+        return f"식당 이름이 필요합니다. 위도 {latitude}, 경도 {longitude}만으로는 리뷰를 가져올 수 없습니다.", []
+    
+    try:
+        place_info = await aget_place_reviews_by_name_and_location(
+            restaurant_name=restaurant_name,
+            latitude=latitude,
+            longitude=longitude,
+            language="ko",
+        )
+        return _format_place_info(restaurant_name, place_info), [PlaceDetail.from_place_info(restaurant_name, place_info)]
+    except Exception as e:
+        return f"Google Places API 호출 중 오류 발생: {str(e)}", []
+
+
+google_places_by_location_tool.coroutine = _agoogle_places_by_location_tool
+
+
+def _format_place_info(restaurant_name: str, place_info: Dict[str, Any]) -> str:
+    name = place_info.get("name", restaurant_name)
+    address = place_info.get("address") or "주소 정보 없음"
+    rating = place_info.get("rating", "N/A")
+    user_ratings_total = place_info.get("user_ratings_total", 0)
+    
+    lines = [f"[Google Places 상세 정보] {name}"]
+    if place_info.get("error"):
+        lines.append(f"\n[오류] 상세 정보를 가져오지 못했습니다: {place_info['error']}")
+        return "\n".join(lines)
+    lines.append(f"- 주소: {address}")
+    lines.append(f"- 평점: {rating}점 (전체 리뷰 {user_ratings_total}개)")
+    _append_place_details(lines, place_info)
+    
+    return "\n".join(lines)
+
+
+##############################################
+# 검색 결과 일괄 보강 (LLM 없이 Place Details 병렬 조회)
+##############################################
+
+def _places_to_enrich(hits: List[SearchHit], limit: int) -> List[Dict[str, Any]]:
+    """
+    검색 결과 중 좌표가 있는 식당 (이름 중복 제거, 최대 limit개)
+    """
+    seen = set()
+    restaurants = []
+    for hit in hits:
+        if not hit.name or hit.name in seen or not hit.has_location:
+            continue
+        seen.add(hit.name)
+        restaurants.append({"name": hit.name, "latitude": hit.latitude, "longitude": hit.longitude})
+    return restaurants[:limit]
+
+
+def _format_enriched_places(
+    restaurants: List[Dict[str, Any]], results: List[Dict[str, Any]]
+) -> Tuple[str, List[PlaceDetail]]:
+    blocks = []
+    for restaurant, place_info in zip(restaurants, results):
+        name = restaurant["name"]
+        if place_info.get("error"):
+            blocks.append(f"[Google Places 상세 정보] {name}\n- 상세 정보를 가져오지 못했습니다: {place_info['error']}")
+        else:
+            blocks.append(_format_place_info(name, place_info))
+    details = [PlaceDetail.from_place_info(r["name"], info) for r, info in zip(restaurants, results)]
+    return "\n\n".join(blocks), details
+
+
+def enrich_search_hits(hits: List[SearchHit], limit: int = 5) -> Tuple[str, List[PlaceDetail]]:
+    """
+    검색된 식당들의 Google Places 상세 정보/리뷰를 한 번에 가져와서 하나의 텍스트로 만든다.
+    (식당마다 LLM이 툴을 호출하는 대신 Place Details를 병렬로 호출)
+
+    Returns:
+        (결과 텍스트, 식당별 PlaceDetail - 실패한 식당은 error가 채워짐)
+    """
+    restaurants = _places_to_enrich(hits, limit)
+    if not restaurants:
+        return "", []
+    start = time.perf_counter()
+    results = enrich_places(restaurants, language="ko", timeout=GOOGLE_PLACES_BATCH_TIMEOUT or None)
+    succeeded = sum(1 for result in results if not result.get("error"))
+    logger.info(
+        f"[enrich_search_hits] {len(restaurants)}개 식당 조회 완료 (성공 {succeeded}개, {time.perf_counter() - start:.2f}s)"
+    )
+    return _format_enriched_places(restaurants, results)
+
+
+async def aenrich_search_hits(hits: List[SearchHit], limit: int = 5) -> Tuple[str, List[PlaceDetail]]:
+    """
+    enrich_search_hits의 비동기 버전
+    """
+    restaurants = _places_to_enrich(hits, limit)
+    if not restaurants:
+        return "", []
+    results = await aenrich_places(restaurants, language="ko", timeout=GOOGLE_PLACES_BATCH_TIMEOUT or None)
+    return _format_enriched_places(restaurants, results)
 
 
 @tool
@@ -458,8 +840,27 @@ def calculator_tool(expression: str) -> str:
         return f"수식을 계산할 수 없습니다: {e}"
 
 
-@tool
-def menu_price_tool(restaurant_name: str) -> str:
+def _confident_name_match(candidates: List[NameMatch]) -> Optional[NameMatch]:
+    """
+    이름 인덱스 후보 중 확실한 하나를 고른다. (애매하면 None → 후보 목록을 LLM에 돌려준다)
+
+    - 1순위 점수가 NAME_MATCH_THRESHOLD(기본값 0.8) 이상
+    - 이름이 다른 2순위 후보보다 NAME_MATCH_MARGIN(기본값 0.15) 이상 높음
+      (예: "Cafe" → "Cafe E" 0.67 / "Cafe Lota" 0.6 처럼 비슷한 후보가 여럿이면 고르지 않는다)
+    """
+    if not candidates:
+        return None
+    best = candidates[0]
+    if best.score < float(os.getenv("NAME_MATCH_THRESHOLD", "0.8")):
+        return None
+    runner_up = next((c for c in candidates[1:] if c.name != best.name), None)
+    if runner_up is not None and best.score - runner_up.score < float(os.getenv("NAME_MATCH_MARGIN", "0.15")):
+        return None
+    return best
+
+
+@tool(response_format="content_and_artifact")
+def menu_price_tool(restaurant_name: str) -> Tuple[str, List[MenuQuote]]:
     """
     특정 식당(restaurant_name)의 메뉴와 가격 목록을 반환한다.
     LLM은 이 정보를 보고 어떤 메뉴를 몇 개 시킬지 결정한 뒤,
@@ -468,10 +869,26 @@ def menu_price_tool(restaurant_name: str) -> str:
     csv_path = os.getenv("MENU_CSV_PATH", "data/restaurants_menus_mock.csv")
 
     rows = load_menus_for_restaurant(restaurant_name=restaurant_name, csv_path=csv_path)
+    resolved_note = ""
     if not rows:
-        return f"'{restaurant_name}'에 대한 메뉴 정보를 찾을 수 없습니다."
+        # 정확한 이름이 아니면 이름 인덱스로 가장 비슷한 식당을 찾는다 (ReAct 재시도 줄이기)
+        candidates = get_restaurant_name_index(csv_path).lookup(restaurant_name, limit=5)
+        best = _confident_name_match(candidates)
+        if best is not None:
+            rows = get_menu_store(csv_path).by_restaurant_id(best.id) or load_menus_for_restaurant(
+                restaurant_name=best.name, csv_path=csv_path
+            )
+            resolved_note = f"('{restaurant_name}' → '{best.name}'로 찾은 결과)"
+        if not rows:
+            if candidates:
+                names = ", ".join(f"'{c.name}'" for c in candidates)
+                return f"'{restaurant_name}'에 대한 메뉴 정보를 찾을 수 없습니다. 비슷한 식당: {names}", []
+            return f"'{restaurant_name}'에 대한 메뉴 정보를 찾을 수 없습니다.", []
 
     lines = ["[메뉴 목록]"]
+    items = []
+    if resolved_note:
+        lines.append(resolved_note)
     for r in rows:
         menu_name = r.get("menu_name")
         menu_type = r.get("menu_type")
@@ -495,5 +912,26 @@ def menu_price_tool(restaurant_name: str) -> str:
             price_int = price
 
         lines.append(f"- {menu_name} ({menu_type}, {price}원){rec_flag}")
+        items.append(MenuItem(
+            name=str(menu_name),
+            menu_type=str(menu_type or ""),
+            price=price_int if isinstance(price_int, int) else None,
+            recommended=is_rec,
+        ))
 
-    return "\n".join(lines)
\ No newline at end of file
+    # 가격대 요약 (예산 계산용)
+    stats = get_menu_store(csv_path).price_stats(rows[0].get("restaurant_id"))
+    if stats:
+        lines.append(
+            f"[가격대] 최저 {stats['min']}원 / 최고 {stats['max']}원 / 평균 {round(stats['mean'])}원 (메뉴 {stats['count']}개)"
+        )
+
+    quote = MenuQuote(
+        restaurant=str(rows[0].get("restaurant_name") or restaurant_name),
+        requested_name=restaurant_name,
+        items=tuple(items),
+        min_price=stats["min"] if stats else None,
+        max_price=stats["max"] if stats else None,
+        mean_price=round(stats["mean"]) if stats else None,
+    )
+    return "\n".join(lines), [quote]
\ No newline at end of file
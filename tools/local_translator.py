@@ -0,0 +1,418 @@
+# tools/local_translator.py
+
+from __future__ import annotations
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+###########################################
+# 1) 사전 (음식 종류 / 지명 / 음식 / 수식어)
+###########################################
+
+# 국가별 음식 매핑 (한글 → 영어 키워드)
+# extract_cuisine_type의 cuisines 필터링과 로컬 번역기가 같이 사용한다.
+CUISINE_MAPPING: Dict[str, str] = {
+    # 한식
+    "한식": "Korean",
+    "한국": "Korean",
+    "한국음식": "Korean",
+    "korean": "Korean",
+
+    # 일식
+    "일식": "Japanese",
+    "일본": "Japanese",
+    "일본음식": "Japanese",
+    "japanese": "Japanese",
+
+    # 중식
+    "중식": "Chinese",
+    "중국": "Chinese",
+    "중국음식": "Chinese",
+    "chinese": "Chinese",
+
+    # 양식 (Western)
+    "양식": "Western",
+    "서양": "Western",
+    "western": "Western",
+
+    # 유럽음식
+    "유럽": "European",
+    "유럽음식": "European",
+    "european": "European",
+
+    # 이탈리안
+    "이탈리안": "Italian",
+    "이탈리아": "Italian",
+    "italian": "Italian",
+
+    # 멕시칸
+    "멕시칸": "Mexican",
+    "멕시코": "Mexican",
+    "mexican": "Mexican",
+
+    # 태국음식
+    "태국": "Thai",
+    "태국음식": "Thai",
+    "thai": "Thai",
+
+    # 인도음식
+    "인도": "Indian",
+    "인도음식": "Indian",
+    "indian": "Indian",
+
+    # 프랑스음식
+    "프랑스": "French",
+    "프랑스음식": "French",
+    "french": "French",
+}
+
+# 지명 사전 (서울 구/동/역 + 데이터에 많이 나오는 해외 도시)
+PLACES: Dict[str, str] = {
+    # 서울 25개 구
+    "서울": "Seoul",
+    "강남구": "Gangnam-gu", "강동구": "Gangdong-gu", "강북구": "Gangbuk-gu", "강서구": "Gangseo-gu",
+    "관악구": "Gwanak-gu", "광진구": "Gwangjin-gu", "구로구": "Guro-gu", "금천구": "Geumcheon-gu",
+    "노원구": "Nowon-gu", "도봉구": "Dobong-gu", "동대문구": "Dongdaemun-gu", "동작구": "Dongjak-gu",
+    "마포구": "Mapo-gu", "서대문구": "Seodaemun-gu", "서초구": "Seocho-gu", "성동구": "Seongdong-gu",
+    "성북구": "Seongbuk-gu", "송파구": "Songpa-gu", "양천구": "Yangcheon-gu", "영등포구": "Yeongdeungpo-gu",
+    "용산구": "Yongsan-gu", "은평구": "Eunpyeong-gu", "종로구": "Jongno-gu", "중구": "Jung-gu",
+    "중랑구": "Jungnang-gu",
+    # 주요 상권 / 동네
+    "홍대": "Hongdae", "홍익대": "Hongdae", "강남": "Gangnam", "신촌": "Sinchon", "이태원": "Itaewon",
+    "명동": "Myeongdong", "종로": "Jongno", "여의도": "Yeouido", "잠실": "Jamsil", "성수": "Seongsu",
+    "성수동": "Seongsu-dong", "연남동": "Yeonnam-dong", "연남": "Yeonnam", "압구정": "Apgujeong",
+    "건대": "Konkuk University", "합정": "Hapjeong", "망원": "Mangwon", "망원동": "Mangwon-dong",
+    "을지로": "Euljiro", "광화문": "Gwanghwamun", "인사동": "Insadong", "삼청동": "Samcheong-dong",
+    "가로수길": "Garosu-gil", "신사": "Sinsa", "신사동": "Sinsa-dong", "청담": "Cheongdam",
+    "청담동": "Cheongdam-dong", "한남동": "Hannam-dong", "한남": "Hannam", "용산": "Yongsan",
+    "경리단길": "Gyeongnidan-gil", "익선동": "Ikseon-dong", "서촌": "Seochon", "북촌": "Bukchon",
+    "대학로": "Daehangno", "혜화": "Hyehwa", "왕십리": "Wangsimni", "노량진": "Noryangjin",
+    "신림": "Sillim", "사당": "Sadang", "교대": "Seoul National University of Education",
+    "역삼": "Yeoksam", "선릉": "Seolleung", "삼성동": "Samseong-dong", "잠실새내": "Jamsilsaenae",
+    "문래": "Mullae", "문래동": "Mullae-dong", "상수": "Sangsu", "서울숲": "Seoul Forest",
+    "동대문": "Dongdaemun", "남대문": "Namdaemun", "영등포": "Yeongdeungpo", "목동": "Mokdong",
+    "마포": "Mapo", "공덕": "Gongdeok", "서울역": "Seoul Station", "강남역": "Gangnam Station",
+    "홍대입구": "Hongik University Station", "홍대입구역": "Hongik University Station",
+    "신촌역": "Sinchon Station", "합정역": "Hapjeong Station", "잠실역": "Jamsil Station",
+    # 해외 국가 / 도시 (식당 데이터에 포함된 지역)
+    "한국": "Korea", "일본": "Japan", "중국": "China", "인도": "India", "태국": "Thailand",
+    "미국": "United States", "영국": "United Kingdom", "필리핀": "Philippines",
+    "인도네시아": "Indonesia", "싱가포르": "Singapore", "호주": "Australia", "브라질": "Brazil",
+    "튀르키예": "Turkey", "터키": "Turkey", "카타르": "Qatar", "아랍에미리트": "UAE",
+    "뉴질랜드": "New Zealand", "남아공": "South Africa", "캐나다": "Canada",
+    "뉴델리": "New Delhi", "델리": "Delhi", "구르가온": "Gurgaon", "구르그람": "Gurgaon",
+    "노이다": "Noida", "파리다바드": "Faridabad", "가지아바드": "Ghaziabad", "뭄바이": "Mumbai",
+    "방갈로르": "Bangalore", "벵갈루루": "Bangalore", "첸나이": "Chennai", "콜카타": "Kolkata",
+    "아그라": "Agra", "자이푸르": "Jaipur", "고아": "Goa", "마닐라": "Manila", "자카르타": "Jakarta",
+    "두바이": "Dubai", "도하": "Doha", "런던": "London", "시드니": "Sydney", "이스탄불": "Istanbul",
+    "앙카라": "Ankara", "상파울루": "Sao Paulo", "올랜도": "Orlando", "웰링턴": "Wellington",
+    "오클랜드": "Auckland", "케이프타운": "Cape Town", "요하네스버그": "Johannesburg",
+}
+
+# 음식 / 식당 종류 사전
+FOOD_TERMS: Dict[str, str] = {
+    "음식": "food", "요리": "cuisine", "식당": "restaurant", "레스토랑": "restaurant",
+    "맛집": "restaurant", "밥집": "restaurant", "한식당": "Korean restaurant", "일식당": "Japanese restaurant",
+    "중식당": "Chinese restaurant", "중국집": "Chinese restaurant", "양식당": "Western restaurant",
+    "우동": "udon", "라멘": "ramen", "라면": "ramen", "소바": "soba", "초밥": "sushi", "스시": "sushi",
+    "회": "sashimi", "사시미": "sashimi", "돈카츠": "tonkatsu", "돈까스": "tonkatsu", "텐동": "tendon",
+    "덮밥": "rice bowl", "규동": "gyudon", "카레": "curry", "커리": "curry", "비리야니": "biryani",
+    "탄두리": "tandoori", "난": "naan", "파스타": "pasta", "피자": "pizza", "리조또": "risotto",
+    "스테이크": "steak", "버거": "burger", "햄버거": "burger", "치킨": "chicken", "닭": "chicken",
+    "삼겹살": "pork belly", "고기": "meat", "고깃집": "BBQ", "바베큐": "BBQ", "바비큐": "BBQ",
+    "갈비": "galbi", "불고기": "bulgogi", "비빔밥": "bibimbap", "김치찌개": "kimchi stew",
+    "된장찌개": "doenjang stew", "찌개": "stew", "국밥": "gukbap", "냉면": "naengmyeon",
+    "칼국수": "kalguksu", "떡볶이": "tteokbokki", "분식": "street food", "김밥": "gimbap",
+    "짜장면": "jajangmyeon", "짬뽕": "jjamppong", "탕수육": "sweet and sour pork", "딤섬": "dim sum",
+    "마라탕": "malatang", "훠궈": "hot pot", "쌀국수": "pho", "팟타이": "pad thai", "타코": "tacos",
+    "부리또": "burrito", "케밥": "kebab", "해산물": "seafood", "샐러드": "salad", "샌드위치": "sandwich",
+    "브런치": "brunch", "베이커리": "bakery", "빵집": "bakery", "빵": "bread", "디저트": "dessert",
+    "케이크": "cake", "아이스크림": "ice cream", "카페": "cafe", "커피": "coffee", "차": "tea",
+    "술집": "bar", "바": "bar", "펍": "pub", "와인": "wine", "맥주": "beer", "칵테일": "cocktail",
+    "뷔페": "buffet", "채식": "vegetarian", "비건": "vegan", "패스트푸드": "fast food",
+    "집": "restaurant",  # "국밥집", "고기집" 등
+}
+
+# 수식어 / 표현
+MODIFIERS: Dict[str, str] = {
+    "근처": "near", "주변": "near", "가성비": "affordable", "저렴한": "cheap", "싼": "cheap",
+    "비싼": "expensive", "고급": "fine dining", "분위기": "ambience", "데이트": "date",
+    "혼밥": "solo dining", "점심": "lunch", "저녁": "dinner", "아침": "breakfast", "야식": "late night",
+    "평점": "rating", "높은": "high", "맛있는": "delicious", "유명한": "famous", "인기": "popular",
+    "가장": "best", "최고": "best", "좋은": "good", "조용한": "quiet", "단체": "group",
+    "배달": "delivery", "포장": "takeaway",
+}
+
+# 번역 결과에서 버리는 단어 (검색에 의미 없는 요청 표현)
+STOPWORDS = {
+    "추천", "추천해줘", "추천해", "추천해주세요", "찾아줘", "찾아", "찾아주세요", "알려줘", "알려주세요",
+    "좀", "해줘", "곳", "데", "어디", "어디야", "있어", "있는", "싶어", "가고", "먹고", "할만한", "갈만한",
+}
+
+# 조사 (토큰 끝에서 제거)
+PARTICLES = ["에서", "으로", "에", "의", "은", "는", "이", "가", "을", "를", "도", "로", "랑", "와", "과"]
+
+# 음식 종류 단어 뒤에 오면 국가명이 아니라 음식 종류로 해석하는 단어 (예: "인도 음식")
+_FOOD_NOUNS = {"음식", "요리", "식당", "레스토랑", "맛집"}
+
+
+def _build_lexicon() -> Dict[str, str]:
+    # 뒤에 오는 사전이 우선 (지명 > 음식 종류)
+    lexicon: Dict[str, str] = {}
+    for mapping in (
+        {k: v for k, v in CUISINE_MAPPING.items() if not k.isascii()},
+        MODIFIERS,
+        FOOD_TERMS,
+        PLACES,
+    ):
+        lexicon.update(mapping)
+    for word in STOPWORDS:
+        lexicon[word] = ""
+    return lexicon
+
+
+# 사전을 한 번만 합쳐 둔다 (조회는 dict lookup)
+_LEXICON: Dict[str, str] = _build_lexicon()
+_MAX_KEY_LEN = max(len(k) for k in _LEXICON)
+
+# 한 글자 음식 단어는 일반 단어와 겹친다 ("난" = 나는, "차" = 자동차, "바" = ~하는 바).
+# 바로 앞뒤에 다른 음식 단어가 있을 때만 음식으로 번역하고, 아니면 residual로 남긴다.
+_AMBIGUOUS_FOOD = {word for word in FOOD_TERMS if len(word) == 1}
+
+
+def _is_food_word(word: Optional[str]) -> bool:
+    if not word or word in _AMBIGUOUS_FOOD:
+        return False
+    return word in FOOD_TERMS or word in _FOOD_NOUNS or word in CUISINE_MAPPING
+
+
+def _food_context_ok(words: List[str], prev_word: Optional[str], next_word: Optional[str]) -> bool:
+    """
+    words 안의 한 글자 음식 단어마다 바로 앞이나 뒤(토큰 밖 이웃 포함)에 음식 단어가 있는지
+    """
+    for i, word in enumerate(words):
+        if word not in _AMBIGUOUS_FOOD:
+            continue
+        before = words[i - 1] if i > 0 else prev_word
+        after = words[i + 1] if i + 1 < len(words) else next_word
+        if not (_is_food_word(before) or _is_food_word(after)):
+            return False
+    return True
+
+
+###########################################
+# 2) 로마자 표기 (국립국어원 로마자 표기법, 음운 변화는 연음만 반영)
+###########################################
+
+_INITIALS = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+_MEDIALS = ["a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u", "wo", "we", "wi", "yu", "eu", "ui", "i"]
+# 받침 (음절 끝)
+_FINALS = ["", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p", "l", "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t"]
+# 뒤 음절이 모음으로 시작할 때 (연음)
+_FINALS_LIAISON = ["", "g", "kk", "ks", "n", "nj", "nh", "d", "r", "lg", "lm", "lb", "ls", "lt", "lp", "lh", "m", "b", "ps", "s", "ss", "ng", "j", "ch", "k", "t", "p", "h"]
+
+# 지명 사전(PLACES)에 있는 어간 뒤에 붙으면 지명으로 보고 표기할 접미사 (예: "합정" + "역")
+_PLACE_SUFFIXES = {"동": "-dong", "구": "-gu", "역": " Station", "로": "-ro", "길": "-gil", "시": " City"}
+
+
+def _decompose(ch: str) -> Optional[tuple]:
+    code = ord(ch) - 0xAC00
+    if not 0 <= code < 11172:
+        return None
+    return code // 588, (code % 588) // 28, code % 28
+
+
+def romanize(text: str) -> str:
+    """
+    한글을 로마자로 표기한다. (예: "망원" → "mangwon")
+    한글이 아닌 문자는 그대로 둔다.
+    """
+    syllables = [_decompose(ch) for ch in text]
+    out: List[str] = []
+    for i, ch in enumerate(text):
+        parts = syllables[i]
+        if parts is None:
+            out.append(ch)
+            continue
+        initial, medial, final = parts
+        out.append(_INITIALS[initial] + _MEDIALS[medial])
+        if final:
+            next_parts = syllables[i + 1] if i + 1 < len(syllables) else None
+            # 다음 음절이 ㅇ(무음)으로 시작하면 받침을 연음
+            if next_parts is not None and next_parts[0] == 11 and final != 21:
+                out.append(_FINALS_LIAISON[final])
+            else:
+                out.append(_FINALS[final])
+    # ㄹ+ㄹ → ll
+    return "".join(out).replace("lr", "ll")
+
+
+def _romanize_place(token: str) -> Optional[str]:
+    """
+    사전에 없는 '~동', '~역' 형태의 지명을 표기한다. (예: "합정역" → "Hapjeong Station")
+
+    어간이 지명 사전(PLACES)에 있을 때만 지명으로 본다.
+    접미사만 보고 추측하면 "친구"(→ "Chin-gu") 같은 일반 단어도 지명이 되므로, 모르는 어간은 None (LLM 번역)
+    """
+    if len(token) < 2:
+        return None
+    suffix = _PLACE_SUFFIXES.get(token[-1])
+    stem = PLACES.get(token[:-1])
+    if suffix is None or stem is None:
+        return None
+    return stem + suffix
+
+
+###########################################
+# 3) 로컬 번역 (사전 기반 fast-path)
+###########################################
+
+@dataclass
+class LocalTranslation:
+    """
+    로컬 번역 결과.
+    - text: 번역된 쿼리 (사전에 없는 토큰 자리는 residual 원문 그대로)
+    - residual: 사전으로 번역하지 못한 토큰 목록 (LLM으로 번역 필요)
+    """
+    text: str
+    residual: List[str] = field(default_factory=list)
+    parts: List[Optional[str]] = field(default_factory=list)  # 토큰별 번역 (None이면 residual)
+
+    @property
+    def covered(self) -> bool:
+        return not self.residual
+
+    def merge(self, residual_translation: str) -> str:
+        """
+        residual 토큰들의 번역 결과를 첫 residual 위치에 끼워 넣어 최종 쿼리를 만든다.
+        """
+        merged: List[str] = []
+        inserted = False
+        for part in self.parts:
+            if part is None:
+                if not inserted:
+                    merged.append(residual_translation)
+                    inserted = True
+                continue
+            if part:
+                merged.append(part)
+        return " ".join(merged)
+
+
+def _segment(token: str) -> Optional[List[str]]:
+    """
+    띄어쓰기 없이 붙은 토큰을 사전 단어들로 분할한다. (예: "홍대우동맛집" → ["홍대", "우동", "맛집"])
+    분할할 수 없으면 None.
+    """
+    n = len(token)
+    # best[i] = token[:i]를 분할한 결과 (단어 수가 가장 적은 것)
+    best: List[Optional[List[str]]] = [None] * (n + 1)
+    best[0] = []
+    for i in range(n):
+        if best[i] is None:
+            continue
+        for j in range(min(n, i + _MAX_KEY_LEN), i, -1):
+            word = token[i:j]
+            if word in _LEXICON:
+                candidate = best[i] + [word]
+                if best[j] is None or len(candidate) < len(best[j]):
+                    best[j] = candidate
+    return best[n]
+
+
+def _strip_particle(token: str) -> str:
+    for particle in PARTICLES:
+        if len(token) > len(particle) and token.endswith(particle):
+            return token[: -len(particle)]
+    return token
+
+
+def _translate_token(token: str, next_token: Optional[str], prev_token: Optional[str] = None) -> Optional[str]:
+    """
+    토큰 하나를 번역한다. 번역할 수 없으면 None.
+    (prev_token / next_token은 조사를 뗀 앞뒤 토큰으로, 한 글자 음식 단어의 문맥 확인에 쓴다)
+    """
+    if token.isascii():
+        return token
+
+    for candidate in (token, _strip_particle(token)):
+        # "인도 음식"처럼 뒤에 음식 명사가 오면 국가명 대신 음식 종류로 해석
+        if next_token in _FOOD_NOUNS and candidate in CUISINE_MAPPING:
+            return CUISINE_MAPPING[candidate]
+        if candidate in _LEXICON and _food_context_ok([candidate], prev_token, next_token):
+            return _LEXICON[candidate]
+
+    for candidate in (token, _strip_particle(token)):
+        words = _segment(candidate)
+        if words and _food_context_ok(words, prev_token, next_token):
+            translated = []
+            for i, word in enumerate(words):
+                following = words[i + 1] if i + 1 < len(words) else next_token
+                if following in _FOOD_NOUNS and word in CUISINE_MAPPING:
+                    translated.append(CUISINE_MAPPING[word])
+                else:
+                    translated.append(_LEXICON[word])
+            return " ".join(w for w in translated if w)
+
+    for candidate in (token, _strip_particle(token)):
+        place = _romanize_place(candidate)
+        if place:
+            return place
+
+    return None
+
+
+# 커버리지 통계
+_STATS_LOCK = threading.Lock()
+_STATS = {"queries": 0, "full": 0, "partial": 0, "none": 0, "tokens": 0, "residual_tokens": 0}
+
+
+def translate_locally(query: str) -> LocalTranslation:
+    """
+    사전/규칙 기반으로 쿼리를 영어로 번역한다 (네트워크 호출 없음).
+
+    Returns:
+        LocalTranslation (residual이 비어 있으면 LLM 번역이 필요 없음)
+    """
+    tokens = query.split()
+    parts: List[Optional[str]] = []
+    residual: List[str] = []
+    for i, token in enumerate(tokens):
+        next_token = _strip_particle(tokens[i + 1]) if i + 1 < len(tokens) else None
+        prev_token = _strip_particle(tokens[i - 1]) if i > 0 else None
+        translated = _translate_token(token, next_token, prev_token)
+        parts.append(translated)
+        if translated is None:
+            residual.append(token)
+
+    text = " ".join(p if p is not None else tok for p, tok in zip(parts, tokens) if p != "")
+
+    with _STATS_LOCK:
+        _STATS["queries"] += 1
+        _STATS["tokens"] += len(tokens)
+        _STATS["residual_tokens"] += len(residual)
+        if not residual:
+            _STATS["full"] += 1
+        elif len(residual) < len(tokens):
+            _STATS["partial"] += 1
+        else:
+            _STATS["none"] += 1
+
+    return LocalTranslation(text=text, residual=residual, parts=parts)
+
+
+def get_local_translation_stats() -> Dict[str, float]:
+    """
+    로컬 번역 커버리지 통계.
+    - full: LLM 호출 없이 번역된 쿼리 수
+    - partial: 일부 토큰만 LLM으로 번역한 쿼리 수
+    - none: 전체를 LLM으로 번역한 쿼리 수
+    """
+    with _STATS_LOCK:
+        stats: Dict[str, float] = dict(_STATS)
+    queries = stats["queries"]
+    stats["llm_avoided_rate"] = round(stats["full"] / queries, 4) if queries else 0.0
+    stats["token_coverage"] = (
+        round(1 - stats["residual_tokens"] / stats["tokens"], 4) if stats["tokens"] else 0.0
+    )
+    return stats
@@ -0,0 +1,298 @@
+# tools/menu_columnar.py
+
+from __future__ import annotations
+import csv
+import json
+import logging
+import os
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 메뉴 데이터셋 컬럼 (generate_menus_from_es.py CSV와 같은 순서)
+STRING_COLUMNS = ["restaurant_id", "restaurant_name", "menu_type", "menu_name", "menu_category"]
+INT_COLUMNS = {"price": np.int32, "is_recommended": np.int8}
+COLUMNS = STRING_COLUMNS + list(INT_COLUMNS)
+
+FORMAT_VERSION = 1
+
+
+def default_columns_dir(csv_path: str | Path) -> Path:
+    """
+    CSV와 같은 위치의 컬럼형 디렉터리 경로 (restaurants_menus.csv → restaurants_menus.columns/)
+    """
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.stem + ".columns")
+
+
+def columns_dir_for(csv_path: str | Path) -> Path:
+    """
+    CSV에 대응하는 컬럼형 디렉터리.
+    MENU_COLUMNS_DIR은 기본 메뉴 CSV(MENU_CSV_PATH)에만 적용하고, 다른 CSV는 항상 <이름>.columns/
+    """
+    columns_dir = os.getenv("MENU_COLUMNS_DIR")
+    default_csv = os.getenv("MENU_CSV_PATH", "data/restaurants_menus_mock.csv")
+    if columns_dir and Path(csv_path).resolve() == Path(default_csv).resolve():
+        return Path(columns_dir)
+    return default_columns_dir(csv_path)
+
+
+def _source_stamp(csv_path: str | Path) -> Dict[str, Any]:
+    stat = Path(csv_path).stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.upper() in ("Y", "TRUE"):
+            return 1
+        if value.upper() in ("N", "FALSE", ""):
+            return 0
+    return int(value)
+
+
+# write_menu_columns가 한 번에 메모리에 올리는 row 수 (나머지는 임시 파일에 둔다)
+WRITE_CHUNK_ROWS = 1 << 20
+
+
+def _spill(buffers: Dict[str, array], files: Dict[str, Any]) -> None:
+    for col, buf in buffers.items():
+        files[col].write(buf.tobytes())
+        del buf[:]
+
+
+def write_menu_columns(
+    rows: Iterable[Dict[str, Any]],
+    out_dir: str | Path,
+    source_csv: str | Path | None = None,
+    chunk_rows: int = WRITE_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    메뉴 row들을 컬럼형 바이너리 디렉터리로 저장한다.
+
+    - 문자열 컬럼: 사전 인코딩 ({col}.codes.npy int32 + {col}.values.npy 고정 길이 유니코드)
+    - price / is_recommended: int32 / int8 .npy
+    - row는 restaurant_id 순으로 정렬하고, restaurant_offsets.npy로 식당별 구간을 바로 찾는다
+    - 모든 .npy는 np.load(mmap_mode="r")로 메모리 매핑해서 읽을 수 있다
+    - source_csv를 주면 그 CSV의 mtime/크기를 meta.json에 기록한다 (CSV가 바뀌면 MenuStore가 컬럼 데이터를 무시)
+
+    메모리 사용량은 row 수와 무관하다 (chunk_rows개 row + 문자열 사전 + 식당 수만큼의 카운터).
+    1) 입력을 읽으면서 컬럼별 코드를 chunk_rows개마다 임시 파일에 쓰고 식당별 row 수를 센다
+    2) 식당별 시작 위치(counting sort)를 구한 뒤, 임시 파일을 chunk 단위로 다시 읽어
+       출력 .npy(open_memmap)의 제자리에 쓴다 (같은 식당 안에서는 입력 순서 유지)
+
+    Returns:
+        meta.json에 기록한 메타 정보
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    chunk_rows = max(1, chunk_rows)
+
+    vocabs: Dict[str, Dict[str, int]] = {col: {} for col in STRING_COLUMNS}
+    buffers: Dict[str, array] = {col: array("i") for col in STRING_COLUMNS}
+    buffers.update({col: array("q") for col in INT_COLUMNS})
+    counts = np.zeros(0, dtype=np.int64)
+    n_rows = 0
+
+    # 1) 컬럼별 코드를 임시 파일로 내보내면서 식당별 row 수를 센다
+    tmp_paths = {col: out_dir / f"{col}.spill.tmp" for col in COLUMNS}
+    files = {col: open(path, "wb") for col, path in tmp_paths.items()}
+    try:
+        def flush() -> None:
+            nonlocal counts
+            chunk_counts = np.bincount(
+                np.frombuffer(buffers["restaurant_id"], dtype=np.int32),
+                minlength=len(vocabs["restaurant_id"]),
+            )
+            if len(chunk_counts) > len(counts):
+                counts = np.concatenate([counts, np.zeros(len(chunk_counts) - len(counts), dtype=np.int64)])
+            counts[: len(chunk_counts)] += chunk_counts
+            _spill(buffers, files)
+
+        for row in rows:
+            for col in STRING_COLUMNS:
+                value = "" if row.get(col) is None else str(row.get(col))
+                vocab = vocabs[col]
+                buffers[col].append(vocab.setdefault(value, len(vocab)))
+            for col in INT_COLUMNS:
+                buffers[col].append(_to_int(row.get(col, 0)))
+            n_rows += 1
+            if len(buffers["restaurant_id"]) >= chunk_rows:
+                flush()
+        flush()
+        for f in files.values():
+            f.close()
+
+        n_restaurants = len(vocabs["restaurant_id"])
+        counts = np.concatenate([counts, np.zeros(n_restaurants - len(counts), dtype=np.int64)])
+
+        # restaurant_id 코드 c의 row 구간 = [offsets[c], offsets[c + 1])
+        offsets = np.zeros(n_restaurants + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        np.save(out_dir / "restaurant_offsets.npy", offsets)
+
+        # 2) 임시 파일을 chunk 단위로 읽어 출력 파일의 제자리에 쓴다
+        spilled = {
+            col: np.memmap(tmp_paths[col], dtype=np.int32 if col in STRING_COLUMNS else np.int64, mode="r")
+            if n_rows else np.zeros(0, dtype=np.int64)
+            for col in COLUMNS
+        }
+        outputs = {
+            col: np.lib.format.open_memmap(
+                out_dir / (f"{col}.codes.npy" if col in STRING_COLUMNS else f"{col}.npy"),
+                mode="w+",
+                dtype=np.int32 if col in STRING_COLUMNS else INT_COLUMNS[col],
+                shape=(n_rows,),
+            )
+            for col in COLUMNS
+        }
+        cursor = offsets[:-1].copy()
+        for start in range(0, n_rows, chunk_rows):
+            chunk_codes = np.asarray(spilled["restaurant_id"][start:start + chunk_rows])
+            order = np.argsort(chunk_codes, kind="stable")
+            sorted_codes = chunk_codes[order]
+            # 같은 식당 안에서의 순번 = 위치 - 그 식당이 chunk 안에서 처음 나온 위치
+            rank = np.arange(len(sorted_codes)) - np.searchsorted(sorted_codes, sorted_codes, side="left")
+            dest = cursor[sorted_codes] + rank
+            for col in COLUMNS:
+                outputs[col][dest] = np.asarray(spilled[col][start:start + chunk_rows])[order]
+            cursor += np.bincount(chunk_codes, minlength=n_restaurants)
+        for output in outputs.values():
+            output.flush()
+        del spilled, outputs
+    finally:
+        for f in files.values():
+            f.close()
+        for path in tmp_paths.values():
+            path.unlink(missing_ok=True)
+
+    for col in STRING_COLUMNS:
+        values = list(vocabs[col])
+        np.save(out_dir / f"{col}.values.npy", np.asarray(values, dtype=np.str_) if values else np.zeros(0, dtype="<U1"))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "rows": n_rows,
+        "restaurants": n_restaurants,
+        "columns": COLUMNS,
+        "created_at": time.time(),
+    }
+    if source_csv is not None:
+        meta["source"] = _source_stamp(source_csv)
+    # meta.json은 마지막에 써서, meta.json이 있으면 나머지 파일이 모두 준비된 상태임을 보장
+    (out_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info(f"[menu_columnar] 저장 완료: {out_dir} (메뉴 {n_rows}개, 식당 {meta['restaurants']}개)")
+    return meta
+
+
+def csv_to_menu_columns(csv_path: str | Path, out_dir: str | Path | None = None) -> Path:
+    """
+    기존 메뉴 CSV를 컬럼형 디렉터리로 변환 (ES 없이 CSV만 있을 때)
+    """
+    out_dir = Path(out_dir) if out_dir else columns_dir_for(csv_path)
+    with Path(csv_path).open("r", encoding="utf-8-sig") as f:
+        write_menu_columns(csv.DictReader(f), out_dir, source_csv=csv_path)
+    return out_dir
+
+
+class MenuColumns:
+    """
+    write_menu_columns로 만든 디렉터리를 메모리 매핑으로 연다.
+    """
+
+    def __init__(self, path: str | Path, mmap: bool = True):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        self.meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 메뉴 데이터 형식입니다: {self.meta.get('format_version')}")
+        mode = "r" if mmap else None
+
+        self.codes = {col: np.load(self.path / f"{col}.codes.npy", mmap_mode=mode) for col in STRING_COLUMNS}
+        # 문자열 테이블은 식당/메뉴 종류 수만큼만 있어서 메모리에 올려 둔다
+        self.values = {col: np.load(self.path / f"{col}.values.npy").tolist() for col in STRING_COLUMNS}
+        self.ints = {col: np.load(self.path / f"{col}.npy", mmap_mode=mode) for col in INT_COLUMNS}
+        self.offsets = np.load(self.path / "restaurant_offsets.npy")
+
+        self.restaurant_code = {rid: code for code, rid in enumerate(self.values["restaurant_id"])}
+        # 식당 코드 → 이름 (각 식당 구간의 첫 row 기준)
+        name_codes = self.codes["restaurant_name"]
+        self.restaurant_names = [
+            self.values["restaurant_name"][int(name_codes[self.offsets[c]])] if self.offsets[c] < self.offsets[c + 1] else ""
+            for c in range(len(self.values["restaurant_id"]))
+        ]
+
+    def __len__(self) -> int:
+        return int(self.meta["rows"])
+
+    @staticmethod
+    def signature(path: str | Path) -> Optional[tuple]:
+        meta_path = Path(path) / "meta.json"
+        if not meta_path.exists():
+            return None
+        stat = meta_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def is_fresh_for(path: str | Path, csv_path: str | Path) -> bool:
+        """
+        컬럼형 데이터가 csv_path의 현재 내용으로 만들어졌는지 확인한다.
+        - CSV가 없으면 컬럼형 데이터만 배포한 경우이므로 True
+        - meta.json에 기록된 CSV mtime/크기가 다르면 False
+        - 기록이 없는 예전 형식이면 meta.json이 CSV보다 나중에 쓰였을 때만 True
+        """
+        csv_path = Path(csv_path)
+        if not csv_path.exists():
+            return True
+        meta_path = Path(path) / "meta.json"
+        try:
+            source = json.loads(meta_path.read_text(encoding="utf-8")).get("source")
+        except (OSError, ValueError):
+            return False
+        if source is None:
+            return meta_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns
+        return source == _source_stamp(csv_path)
+
+    def _slice(self, restaurant_id: str) -> Optional[slice]:
+        code = self.restaurant_code.get(str(restaurant_id))
+        if code is None:
+            return None
+        return slice(int(self.offsets[code]), int(self.offsets[code + 1]))
+
+    def rows_for_restaurant(self, restaurant_id: str) -> List[Dict[str, Any]]:
+        """
+        식당 하나의 메뉴 row들 (price / is_recommended는 int)
+        """
+        sl = self._slice(restaurant_id)
+        if sl is None:
+            return []
+        columns = {col: [self.values[col][c] for c in self.codes[col][sl].tolist()] for col in STRING_COLUMNS}
+        columns.update({col: self.ints[col][sl].tolist() for col in INT_COLUMNS})
+        return [dict(zip(COLUMNS, values)) for values in zip(*(columns[col] for col in COLUMNS))]
+
+    def price_stats(self, restaurant_id: str | None = None) -> Optional[Dict[str, float]]:
+        """
+        가격 통계 (restaurant_id가 None이면 전체). 메뉴가 없으면 None.
+        """
+        if restaurant_id is None:
+            prices = self.ints["price"]
+        else:
+            sl = self._slice(restaurant_id)
+            if sl is None:
+                return None
+            prices = self.ints["price"][sl]
+        if len(prices) == 0:
+            return None
+        return {
+            "count": int(len(prices)),
+            "min": int(prices.min()),
+            "max": int(prices.max()),
+            "mean": float(prices.mean()),
+            "median": float(np.median(prices)),
+        }
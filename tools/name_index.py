@@ -0,0 +1,255 @@
+# tools/name_index.py
+
+from __future__ import annotations
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .local_translator import romanize
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^0-9a-zᄀ-ᇿ가-힣]+")
+
+
+@dataclass
+class NameMatch:
+    id: str
+    name: str
+    score: float
+
+
+def _compact(text: str) -> str:
+    """
+    NFC + 소문자 + 공백/기호 제거 ("Le Petit-Souffle" → "lepetitsouffle")
+    """
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return _NON_WORD.sub("", text)
+
+
+def name_variants(name: str) -> Set[str]:
+    """
+    이름 하나에 대한 비교용 표기들.
+    - 기본형 (공백/기호 제거, 소문자)
+    - 한글 자모 분해형 ("돈카츠" ↔ "돈까스" 처럼 한두 글자 다른 표기도 n-gram이 겹치도록)
+    - 로마자 표기 ("텐동야" ↔ "tendongya")
+    """
+    base = _compact(name)
+    if not base:
+        return set()
+    variants = {base}
+    if any("가" <= ch <= "힣" for ch in base):
+        variants.add(unicodedata.normalize("NFD", base))
+        variants.add(_compact(romanize(base)))
+    return variants
+
+
+def _ngrams(text: str, n: int = 3) -> Set[str]:
+    padded = f"^{text}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class NameIndex:
+    """
+    식당 이름 퍼지 검색용 문자 n-gram 역색인.
+
+    - 표기 변형(기본형/자모 분해/로마자)마다 3-gram을 만들어 postings에 넣는다.
+    - 조회 시 쿼리 변형들의 n-gram과 겹치는 이름만 Dice 계수로 점수를 매긴다.
+    - 기본형이 정확히 같으면 점수 1.0
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._names: List[Tuple[str, str]] = []          # entry → (id, name)
+        self._gram_counts: List[Dict[str, int]] = []     # entry → {variant: n-gram 개수}
+        self._postings: Dict[str, List[Tuple[int, str]]] = {}  # n-gram → [(entry, variant)]
+        self._exact: Dict[str, List[int]] = {}           # 기본형 → [entry]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, id: str, name: str) -> None:
+        variants = name_variants(name)
+        if not variants:
+            return
+        entry = len(self._names)
+        self._names.append((str(id), name))
+        counts: Dict[str, int] = {}
+        for variant in variants:
+            grams = _ngrams(variant, self.n)
+            counts[variant] = len(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append((entry, variant))
+        self._gram_counts.append(counts)
+        self._exact.setdefault(_compact(name), []).append(entry)
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        for id, name in items:
+            self.add(id, name)
+
+    def lookup(self, query: str, limit: int = 5, min_score: float = 0.3) -> List[NameMatch]:
+        """
+        Args:
+            query: 찾을 식당 이름 (LLM이 넘긴 부정확한 이름도 가능)
+            limit: 반환할 후보 수
+            min_score: 최소 점수 (0~1)
+
+        Returns:
+            점수 내림차순 후보 리스트 [NameMatch(id, name, score), ...]
+        """
+        best: Dict[int, float] = {entry: 1.0 for entry in self._exact.get(_compact(query), [])}
+
+        for q_variant in name_variants(query):
+            q_grams = _ngrams(q_variant, self.n)
+            overlap: Dict[Tuple[int, str], int] = {}
+            for gram in q_grams:
+                for posting in self._postings.get(gram, ()):
+                    overlap[posting] = overlap.get(posting, 0) + 1
+            for (entry, variant), shared in overlap.items():
+                score = 2.0 * shared / (len(q_grams) + self._gram_counts[entry][variant])
+                if score > best.get(entry, 0.0):
+                    best[entry] = score
+
+        ranked = sorted(
+            ((entry, score) for entry, score in best.items() if score >= min_score),
+            key=lambda x: (-x[1], x[0]),
+        )[:limit]
+        return [NameMatch(self._names[e][0], self._names[e][1], round(s, 4)) for e, s in ranked]
+
+    def resolve(self, query: str, min_score: float = 0.6) -> Optional[NameMatch]:
+        """
+        가장 유사한 이름 하나 (min_score 미만이면 None)
+        """
+        matches = self.lookup(query, limit=1, min_score=min_score)
+        return matches[0] if matches else None
+
+
+def best_name_match(query: str, names: List[str], min_score: float = 0.3) -> Optional[int]:
+    """
+    names 리스트 중 query와 가장 유사한 이름의 위치 (없으면 None).
+    Google Places 검색 결과처럼 후보가 몇 개뿐일 때 쓰는 일회성 인덱스.
+    """
+    index = NameIndex()
+    index.add_many((str(i), name) for i, name in enumerate(names))
+    match = index.resolve(query, min_score=min_score)
+    return int(match.id) if match else None
+
+
+# -----------------------------
+# 식당 이름 인덱스 (메뉴 CSV + ES 식당명)
+# -----------------------------
+_RESTAURANT_INDEX: Optional[NameIndex] = None
+_RESTAURANT_INDEX_SIGNATURE: Optional[tuple] = None
+_RESTAURANT_INDEX_LOCK = threading.Lock()
+
+# ES 식당명은 전체 scan이 필요하므로 백그라운드 스레드에서 한 번만 읽는다 (None이면 아직 읽는 중)
+_ES_NAMES: Optional[List[Tuple[str, str]]] = None
+_ES_NAMES_THREAD: Optional[threading.Thread] = None
+_ES_NAMES_LOCK = threading.Lock()
+
+
+def _name_index_from_es() -> bool:
+    return os.getenv("NAME_INDEX_FROM_ES", "true").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def _es_restaurant_names() -> List[Tuple[str, str]]:
+    """
+    ES 인덱스의 restaurant_id / restaurant_name 목록 (실패하면 빈 리스트)
+    """
+    try:
+        from elasticsearch import helpers
+        from .es_search import get_es_client
+
+        items = []
+        for doc in helpers.scan(
+            get_es_client(),
+            index=os.getenv("ES_INDEX", "restaurant_docs"),
+            query={"query": {"match_all": {}}},
+            _source=["restaurant_id", "restaurant_name"],
+            size=1000,
+        ):
+            src = doc.get("_source", {})
+            name = src.get("restaurant_name")
+            if name:
+                items.append((str(src.get("restaurant_id") or doc["_id"]), name))
+        return items
+    except Exception as e:
+        logger.warning(f"[NameIndex] ES 식당명을 읽지 못해 메뉴 CSV만 사용합니다: {e}")
+        return []
+
+
+def _load_es_names() -> None:
+    global _ES_NAMES, _RESTAURANT_INDEX_SIGNATURE
+    start = time.perf_counter()
+    names = _es_restaurant_names()
+    with _RESTAURANT_INDEX_LOCK:
+        _ES_NAMES = names
+        # 다음 조회에서 ES 식당명을 포함해 다시 만들도록
+        _RESTAURANT_INDEX_SIGNATURE = None
+    logger.info(f"[NameIndex] ES 식당명 {len(names)}개 로드 ({time.perf_counter() - start:.2f}s)")
+
+
+def _start_es_names_load() -> None:
+    """
+    ES 식당명 로드를 백그라운드에서 시작한다 (이미 시작했거나 NAME_INDEX_FROM_ES=false면 아무것도 하지 않음)
+    """
+    global _ES_NAMES_THREAD
+    if not _name_index_from_es():
+        return
+    with _ES_NAMES_LOCK:
+        if _ES_NAMES_THREAD is None:
+            _ES_NAMES_THREAD = threading.Thread(target=_load_es_names, name="name-index-es", daemon=True)
+            _ES_NAMES_THREAD.start()
+
+
+def warm_restaurant_name_index(menu_csv_path: str | Path | None = None) -> None:
+    """
+    앱 시작 시 호출: ES 식당명 로드를 백그라운드로 시작하고 메뉴 CSV 인덱스를 미리 만든다.
+    (실패해도 첫 조회 때 다시 시도하므로 경고만 남긴다)
+    """
+    try:
+        get_restaurant_name_index(menu_csv_path)
+    except Exception as e:
+        logger.warning(f"[NameIndex] 식당 이름 인덱스를 미리 만들지 못했습니다: {e}")
+
+
+def get_restaurant_name_index(menu_csv_path: str | Path | None = None) -> NameIndex:
+    """
+    메뉴 CSV와 ES의 식당 이름으로 만든 NameIndex (메뉴 CSV가 바뀌거나 ES 식당명 로드가 끝나면 다시 생성).
+    같은 (id, 이름) 쌍은 한 번만 넣는다.
+
+    ES 식당명은 요청 경로에서 기다리지 않는다. 로드가 끝나기 전에는 메뉴 CSV 이름만으로 찾는다.
+    """
+    global _RESTAURANT_INDEX, _RESTAURANT_INDEX_SIGNATURE
+    from .utility_func import get_menu_store
+
+    _start_es_names_load()
+    store = get_menu_store(menu_csv_path or os.getenv("MENU_CSV_PATH", "data/restaurants_menus_mock.csv"))
+    store.ensure_fresh()
+    signature = (str(store.csv_path), store.signature)
+    if _RESTAURANT_INDEX is not None and _RESTAURANT_INDEX_SIGNATURE == signature:
+        return _RESTAURANT_INDEX
+
+    with _RESTAURANT_INDEX_LOCK:
+        if _RESTAURANT_INDEX is not None and _RESTAURANT_INDEX_SIGNATURE == signature:
+            return _RESTAURANT_INDEX
+
+        start = time.perf_counter()
+        seen: Set[Tuple[str, str]] = set()
+        index = NameIndex()
+        for item in store.restaurants() + (_ES_NAMES or []):
+            if item[1] and item not in seen:
+                seen.add(item)
+                index.add(*item)
+
+        _RESTAURANT_INDEX, _RESTAURANT_INDEX_SIGNATURE = index, signature
+        logger.info(f"[NameIndex] 식당 이름 인덱스 생성: {len(index)}개 ({time.perf_counter() - start:.2f}s)")
+        return index
@@ -0,0 +1,166 @@
+# tools/records.py
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# =====================
+# 툴 실행 결과 레코드
+# =====================
+#
+# 툴은 LLM에 넘길 텍스트와 함께 이 레코드를 ToolMessage.artifact로 돌려준다.
+# 그래프 state(search_hits / place_details / menu_quotes)에 그대로 쌓이므로
+# 이후 노드는 tool_trace 텍스트를 정규식으로 다시 파싱하지 않고 필드를 바로 읽는다.
+# (checkpointer에 매 노드마다 저장되므로 필요한 필드만 작게 유지)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """
+    es_search_tool 검색 결과 식당 하나
+    """
+    rank: int
+    name: str
+    restaurant_id: Optional[str] = None
+    city: str = ""
+    locality: str = ""
+    cuisines: str = ""
+    address: str = ""
+    rating: Optional[float] = None
+    votes: Optional[int] = None
+    avg_cost: str = ""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    score: float = 0.0
+
+    @property
+    def has_location(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+    def to_line(self) -> str:
+        location = ", ".join(part for part in (self.city, self.locality) if part)
+        parts = [f"[{self.rank}] {self.name}" + (f" ({location})" if location else "")]
+        if self.cuisines:
+            parts.append(f"요리: {self.cuisines}")
+        if self.rating is not None:
+            parts.append(f"평점: {self.rating}점 ({self.votes or 0}표)")
+        if self.avg_cost:
+            parts.append(f"2인 평균: {self.avg_cost}")
+        if self.address:
+            parts.append(f"주소: {self.address}")
+        return " | ".join(parts)
+
+
+@dataclass(frozen=True, slots=True)
+class PlaceDetail:
+    """
+    Google Places 상세 정보 (리뷰는 앞부분만)
+    """
+    name: str
+    query_name: str = ""  # 조회에 사용한 식당 이름 (검색 결과 이름)
+    address: Optional[str] = None
+    rating: Optional[float] = None
+    user_ratings_total: int = 0
+    phone_number: Optional[str] = None
+    opening_hours: Tuple[str, ...] = ()
+    reviews: Tuple[str, ...] = ()  # "작성자 (평점): 내용" 형식
+    error: Optional[str] = None
+
+    REVIEW_LIMIT = 3
+    REVIEW_CHARS = 200
+
+    def __post_init__(self) -> None:
+        # checkpoint에서 복원하면 tuple이 list로 돌아오므로 다시 tuple로 맞춘다 (frozen이라 object.__setattr__)
+        object.__setattr__(self, "opening_hours", tuple(self.opening_hours))
+        object.__setattr__(self, "reviews", tuple(self.reviews))
+
+    @classmethod
+    def from_place_info(cls, query_name: str, info: Dict[str, Any]) -> "PlaceDetail":
+        """
+        get_place_details / get_place_reviews_by_name_and_location 결과로 만든다.
+        """
+        reviews = []
+        for review in (info.get("reviews") or [])[: cls.REVIEW_LIMIT]:
+            text = (review.get("text") or "").strip()
+            if len(text) > cls.REVIEW_CHARS:
+                text = text[: cls.REVIEW_CHARS] + "..."
+            reviews.append(f"{review.get('author_name', '익명')} ({review.get('rating', 'N/A')}점): {text}")
+        return cls(
+            name=info.get("name") or query_name,
+            query_name=query_name,
+            address=info.get("address"),
+            rating=_to_float(info.get("rating")),
+            user_ratings_total=int(info.get("user_ratings_total") or 0),
+            phone_number=info.get("phone_number"),
+            opening_hours=tuple(info.get("opening_hours") or ()),
+            reviews=tuple(reviews),
+            error=info.get("error"),
+        )
+
+    def to_line(self) -> str:
+        if self.error:
+            return f"{self.query_name or self.name}: 상세 정보 없음 ({self.error})"
+        parts = [self.name]
+        if self.rating is not None:
+            parts.append(f"평점: {self.rating}점 (전체 리뷰 {self.user_ratings_total}개)")
+        if self.address:
+            parts.append(f"주소: {self.address}")
+        if self.phone_number:
+            parts.append(f"전화번호: {self.phone_number}")
+        line = " | ".join(parts)
+        if self.reviews:
+            line += "".join(f"\n    - {review}" for review in self.reviews)
+        return line
+
+
+@dataclass(frozen=True, slots=True)
+class MenuItem:
+    name: str
+    menu_type: str = ""
+    price: Optional[int] = None
+    recommended: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class MenuQuote:
+    """
+    menu_price_tool로 조회한 식당 하나의 메뉴/가격
+    """
+    restaurant: str
+    requested_name: str = ""  # 툴에 넘어온 이름 (이름 인덱스로 다른 이름을 찾은 경우 restaurant와 다름)
+    items: Tuple[MenuItem, ...] = ()
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    mean_price: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        # checkpoint에서 복원하면 items가 list로 돌아오므로 다시 tuple로 맞춘다
+        object.__setattr__(self, "items", tuple(self.items))
+
+    def to_line(self) -> str:
+        line = f"{self.restaurant}: 메뉴 {len(self.items)}개"
+        if self.min_price is not None:
+            line += f" (최저 {self.min_price}원 / 최고 {self.max_price}원 / 평균 {self.mean_price}원)"
+        recommended = [item.name for item in self.items if item.recommended]
+        if recommended:
+            line += f" | 추천: {', '.join(recommended)}"
+        return line
+
+    def menu_lines(self) -> List[str]:
+        return [
+            f"- {item.name} ({item.menu_type}, {item.price}원)" + (" (추천)" if item.recommended else "")
+            for item in self.items
+        ]
+
+
+# checkpointer(JsonPlusSerializer)가 역직렬화를 허용할 타입
+CHECKPOINT_RECORD_TYPES = [
+    (__name__, cls.__name__) for cls in (SearchHit, PlaceDetail, MenuItem, MenuQuote)
+]
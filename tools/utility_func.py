@@ -1,10 +1,21 @@
 from __future__ import annotations
-from typing import Union, Optional, Tuple, List, Dict
+from typing import Any, Union, Optional, Tuple, List, Dict
 import csv
+import logging
+import os
+import threading
+import time
 from pathlib import Path
 
+import numpy as np
+
+from .cache import normalize_cache_text
+from .menu_columnar import MenuColumns, columns_dir_for
+
 Number = Union[int, float]
 
+logger = logging.getLogger(__name__)
+
 
 def calculator(expression: str) -> Number:
     """
@@ -17,6 +28,174 @@ def calculator(expression: str) -> Number:
         raise ValueError(f"잘못된 수식입니다: {expression}") from e
 
 
+class MenuStore:
+    """
+    메뉴 데이터를 한 번만 읽어서 메모리에 올려 두는 조회용 저장소.
+
+    - 컬럼형 디렉터리(CSV 옆의 <이름>.columns/, 기본 메뉴 CSV는 MENU_COLUMNS_DIR)가 있고
+      지금 CSV로 만든 것이면 메모리 매핑으로 열고, 없거나 CSV가 더 새로우면 CSV를 읽는다
+    - restaurant_id / restaurant_name / 정규화된 restaurant_name 해시 인덱스로 O(1) 조회
+    - 조회할 때 파일 mtime/크기를 확인해서 바뀌었으면 자동으로 다시 읽는다
+    """
+
+    def __init__(self, csv_path: str | Path, columns_dir: str | Path | None = None):
+        self.csv_path = Path(csv_path)
+        self.columns_dir = Path(columns_dir) if columns_dir else columns_dir_for(self.csv_path)
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._columns_fresh: Optional[tuple] = None  # ((컬럼 signature, CSV signature), 최신 여부)
+        self._columns: Optional[MenuColumns] = None
+        self._by_id: Dict[str, List[Dict[str, Any]]] = {}
+        self._names: Dict[str, str] = {}              # restaurant_id → restaurant_name
+        self._by_name: Dict[str, List[str]] = {}      # restaurant_name → [restaurant_id]
+        self._by_norm_name: Dict[str, List[str]] = {}
+
+    @property
+    def signature(self) -> Optional[tuple]:
+        return self._signature
+
+    def _file_signature(self) -> tuple:
+        columns_signature = MenuColumns.signature(self.columns_dir)
+        csv_stat = self.csv_path.stat() if self.csv_path.exists() else None
+        csv_signature = (csv_stat.st_mtime_ns, csv_stat.st_size) if csv_stat else None
+        if columns_signature is not None:
+            # meta.json은 두 파일 중 하나가 바뀔 때만 다시 읽는다
+            key = (columns_signature, csv_signature)
+            if self._columns_fresh is None or self._columns_fresh[0] != key:
+                self._columns_fresh = (key, MenuColumns.is_fresh_for(self.columns_dir, self.csv_path))
+            if self._columns_fresh[1]:
+                return ("columns",) + columns_signature + (csv_signature,)
+        if csv_signature is None:
+            raise FileNotFoundError(self.csv_path)
+        return ("csv",) + csv_signature
+
+    def _load(self, signature: tuple) -> None:
+        start = time.perf_counter()
+        columns: Optional[MenuColumns] = None
+        by_id: Dict[str, List[Dict[str, Any]]] = {}
+        names: Dict[str, str] = {}
+
+        if signature[0] == "columns":
+            columns = MenuColumns(self.columns_dir)
+            names = dict(zip(columns.values["restaurant_id"], columns.restaurant_names))
+            n_rows = len(columns)
+            source = self.columns_dir
+        else:
+            if MenuColumns.signature(self.columns_dir) is not None:
+                logger.warning(f"[MenuStore] 컬럼형 데이터가 CSV보다 오래되어 CSV를 사용합니다: {self.columns_dir}")
+            with self.csv_path.open("r", encoding="utf-8-sig") as f:
+                rows = list(csv.DictReader(f))
+            for row in rows:
+                rid = row.get("restaurant_id") or ""
+                by_id.setdefault(rid, []).append(row)
+                names.setdefault(rid, row.get("restaurant_name") or "")
+            n_rows = len(rows)
+            source = self.csv_path
+
+        by_name: Dict[str, List[str]] = {}
+        by_norm_name: Dict[str, List[str]] = {}
+        for rid, name in names.items():
+            by_name.setdefault(name, []).append(rid)
+            by_norm_name.setdefault(normalize_cache_text(name), []).append(rid)
+
+        # 인덱스를 다 만든 뒤 한 번에 교체 (조회 중인 스레드는 이전 인덱스를 그대로 사용)
+        self._columns, self._by_id, self._names, self._by_name, self._by_norm_name = (
+            columns, by_id, names, by_name, by_norm_name
+        )
+        self._signature = signature
+        logger.info(
+            f"[MenuStore] 메뉴 로드 완료: {source} "
+            f"(메뉴 {n_rows}개, 식당 {len(names)}개, {time.perf_counter() - start:.2f}s)"
+        )
+
+    def ensure_fresh(self) -> None:
+        """
+        처음 조회하거나 파일이 바뀌었으면 다시 읽는다.
+        """
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature != self._signature:
+                self._load(signature)
+
+    def _rows_for_id(self, restaurant_id: str) -> List[Dict[str, Any]]:
+        if self._columns is not None:
+            return self._columns.rows_for_restaurant(restaurant_id)
+        return list(self._by_id.get(restaurant_id, []))
+
+    def by_restaurant_id(self, restaurant_id: str | int) -> List[Dict[str, Any]]:
+        self.ensure_fresh()
+        return self._rows_for_id(str(restaurant_id))
+
+    def by_restaurant_name(self, restaurant_name: str) -> List[Dict[str, Any]]:
+        """
+        정확히 같은 이름을 먼저 찾고, 없으면 정규화된 이름(대소문자/공백 무시)으로 찾는다.
+        """
+        self.ensure_fresh()
+        ids = self._by_name.get(restaurant_name)
+        if ids is None:
+            ids = self._by_norm_name.get(normalize_cache_text(restaurant_name), [])
+        rows: List[Dict[str, Any]] = []
+        for rid in ids:
+            rows.extend(self._rows_for_id(rid))
+        return rows
+
+    def restaurant_names(self) -> List[str]:
+        self.ensure_fresh()
+        return list(self._by_name.keys())
+
+    def restaurants(self) -> List[Tuple[str, str]]:
+        """
+        (restaurant_id, restaurant_name) 목록
+        """
+        self.ensure_fresh()
+        return list(self._names.items())
+
+    def price_stats(self, restaurant_id: str | int | None = None) -> Optional[Dict[str, float]]:
+        """
+        가격 통계 {count, min, max, mean, median} (restaurant_id가 None이면 전체, 메뉴가 없으면 None)
+        """
+        self.ensure_fresh()
+        if self._columns is not None:
+            return self._columns.price_stats(None if restaurant_id is None else str(restaurant_id))
+
+        if restaurant_id is None:
+            rows = [row for rows in self._by_id.values() for row in rows]
+        else:
+            rows = self._by_id.get(str(restaurant_id), [])
+        prices = []
+        for row in rows:
+            try:
+                prices.append(int(row.get("price")))
+            except (TypeError, ValueError):
+                continue
+        if not prices:
+            return None
+        arr = np.asarray(prices, dtype=np.int64)
+        return {
+            "count": int(arr.size),
+            "min": int(arr.min()),
+            "max": int(arr.max()),
+            "mean": float(arr.mean()),
+            "median": float(np.median(arr)),
+        }
+
+
+# csv 경로 → MenuStore (프로세스 전역 공유)
+_MENU_STORES: Dict[str, MenuStore] = {}
+_MENU_STORES_LOCK = threading.Lock()
+
+
+def get_menu_store(csv_path: str | Path) -> MenuStore:
+    key = str(Path(csv_path).resolve())
+    store = _MENU_STORES.get(key)
+    if store is None:
+        with _MENU_STORES_LOCK:
+            store = _MENU_STORES.setdefault(key, MenuStore(csv_path))
+    return store
+
+
 def load_menus_for_restaurant(
     restaurant_name: str,
     csv_path: str | Path,
@@ -24,14 +203,6 @@ def load_menus_for_restaurant(
     """
     menu CSV에서 특정 식당(restaurant_name)의 모든 메뉴 row를 반환.
     - restaurant_id, restaurant_name, menu_name, menu_type, price, is_recommended 등 포함.
+    - 데이터는 MenuStore가 한 번만 읽고, 이후에는 이름 인덱스로 바로 조회한다.
     """
-    csv_path = Path(csv_path)
-    rows: List[Dict[str, str]] = []
-
-    with csv_path.open("r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get("restaurant_name") == restaurant_name:
-                rows.append(row)
-
-    return rows
+    return get_menu_store(csv_path).by_restaurant_name(restaurant_name)
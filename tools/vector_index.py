@@ -0,0 +1,304 @@
+# tools/vector_index.py
+
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    행 단위 L2 정규화 (내적 = 코사인 유사도가 되도록).
+    길이가 0인 벡터는 그대로 둔다.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    점수 배열에서 상위 k개의 위치를 내림차순으로 반환 (argpartition + 부분 정렬).
+    """
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _kmeans(matrix: np.ndarray, nlist: int, iterations: int = 20, seed: int = 42) -> np.ndarray:
+    """
+    정규화된 벡터에 대한 간단한 spherical k-means (IVF 중심점 학습용).
+    """
+    rng = np.random.default_rng(seed)
+    nlist = min(nlist, matrix.shape[0])
+    centroids = matrix[rng.choice(matrix.shape[0], size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = matrix[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+            else:
+                # 빈 클러스터는 임의의 점으로 다시 시작
+                centroids[c] = matrix[rng.integers(matrix.shape[0])]
+        centroids = _normalize_rows(centroids)
+    return centroids
+
+
+class LocalVectorIndex:
+    """
+    프로세스 내 Dense 검색 인덱스 (ES KNN 대체용).
+
+    - 모든 임베딩을 미리 정규화된 float32 행렬로 메모리에 올려 두고,
+      쿼리 벡터와의 내적 + argpartition으로 top-k를 구한다.
+    - nlist > 0 이면 IVF(역파일) 인덱스를 만들어 nprobe개 클러스터만 탐색한다.
+      (문서 수가 많을 때 사용, 정확도 대신 속도)
+    - .npz 파일로 저장/로드, 또는 ES 인덱스를 scan해서 만들 수 있다.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        sources: Optional[List[Dict[str, Any]]] = None,
+        nlist: int = 0,
+        nprobe: int = 8,
+        centroids: Optional[np.ndarray] = None,
+        assignments: Optional[np.ndarray] = None,
+    ):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError(f"vectors는 2차원 행렬이어야 합니다: shape={vectors.shape}")
+        if len(ids) != vectors.shape[0]:
+            raise ValueError(f"ids 개수({len(ids)})와 벡터 개수({vectors.shape[0]})가 다릅니다.")
+
+        self.matrix = _normalize_rows(vectors)
+        self.ids = [str(i) for i in ids]
+        self.sources = sources if sources is not None else [{} for _ in self.ids]
+        self.nprobe = nprobe
+
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        if centroids is not None and assignments is not None:
+            self._set_ivf(np.asarray(centroids, dtype=np.float32), np.asarray(assignments))
+        elif nlist > 0 and self.matrix.shape[0] > nlist:
+            self.build_ivf(nlist)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    # ---------- IVF ----------
+
+    def _set_ivf(self, centroids: np.ndarray, assignments: np.ndarray) -> None:
+        self.centroids = centroids
+        self._assignments = assignments.astype(np.int32)
+        self._lists = [np.flatnonzero(self._assignments == c) for c in range(centroids.shape[0])]
+
+    def build_ivf(self, nlist: int, iterations: int = 20) -> None:
+        """
+        k-means로 nlist개 클러스터를 학습하고 각 벡터를 가장 가까운 클러스터에 배정한다.
+        """
+        start = time.perf_counter()
+        centroids = _kmeans(self.matrix, nlist, iterations=iterations)
+        assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+        self._set_ivf(centroids, assignments)
+        logger.info(
+            f"[LocalVectorIndex] IVF 생성 완료: nlist={centroids.shape[0]}, "
+            f"문서 {len(self)}개, {time.perf_counter() - start:.2f}s"
+        )
+
+    # ---------- 검색 ----------
+
+    def search(self, query_vector, k: int = 5, nprobe: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Args:
+            query_vector: 쿼리 임베딩 (리스트 또는 1차원 배열)
+            k: 반환할 결과 개수
+            nprobe: IVF 사용 시 탐색할 클러스터 수 (None이면 인덱스 기본값)
+
+        Returns:
+            [{"id": str, "score": float, "source": dict}, ...]  (dense_search와 같은 형식)
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            raise ValueError(f"쿼리 차원({query.shape[0]})이 인덱스 차원({self.dim})과 다릅니다.")
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        if self.centroids is not None:
+            probe = min(nprobe or self.nprobe, self.centroids.shape[0])
+            nearest = _top_k(self.centroids @ query, probe)
+            candidates = np.concatenate([self._lists[c] for c in nearest])
+            scores = self.matrix[candidates] @ query
+            order = _top_k(scores, k)
+            positions, top_scores = candidates[order], scores[order]
+        else:
+            scores = self.matrix @ query
+            positions = _top_k(scores, k)
+            top_scores = scores[positions]
+
+        return [
+            {"id": self.ids[p], "score": float(s), "source": self.sources[p]}
+            for p, s in zip(positions.tolist(), top_scores.tolist())
+        ]
+
+    # ---------- 저장 / 로드 ----------
+
+    def save(self, path: str | Path) -> None:
+        """
+        .npz 파일로 저장 (행렬은 정규화된 상태로 저장된다).
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays: Dict[str, Any] = {
+            "matrix": self.matrix,
+            "ids": np.asarray(self.ids, dtype=np.str_),
+            "sources": np.asarray(json.dumps(self.sources, ensure_ascii=False)),
+        }
+        if self.centroids is not None:
+            arrays["centroids"] = self.centroids
+            arrays["assignments"] = self._assignments
+        np.savez(path, **arrays)
+        logger.info(f"[LocalVectorIndex] 저장 완료: {path} (문서 {len(self)}개)")
+
+    @classmethod
+    def load(cls, path: str | Path, nprobe: int = 8) -> "LocalVectorIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                vectors=data["matrix"],
+                ids=data["ids"].tolist(),
+                sources=json.loads(str(data["sources"])),
+                nprobe=nprobe,
+                centroids=data["centroids"] if "centroids" in data.files else None,
+                assignments=data["assignments"] if "assignments" in data.files else None,
+            )
+
+    @classmethod
+    def from_elasticsearch(
+        cls,
+        es,
+        index: str,
+        field: str = "embedding",
+        nlist: int = 0,
+        nprobe: int = 8,
+        page_size: int = 500,
+    ) -> "LocalVectorIndex":
+        """
+        ES 인덱스를 scan해서 embedding 필드를 모두 읽어 온다.
+        (source에서 embedding 필드는 제외하고 보관)
+        """
+        from elasticsearch import helpers
+
+        ids: List[str] = []
+        sources: List[Dict[str, Any]] = []
+        vectors: List[List[float]] = []
+        for doc in helpers.scan(es, index=index, query={"query": {"match_all": {}}}, size=page_size):
+            src = doc.get("_source", {})
+            vector = src.pop(field, None)
+            if not vector:
+                continue
+            ids.append(doc["_id"])
+            sources.append(src)
+            vectors.append(vector)
+
+        if not vectors:
+            raise RuntimeError(f"'{index}' 인덱스에서 '{field}' 필드를 가진 문서를 찾지 못했습니다.")
+        logger.info(f"[LocalVectorIndex] ES에서 임베딩 {len(vectors)}개 로드 완료 (index={index})")
+        return cls(np.asarray(vectors, dtype=np.float32), ids, sources, nlist=nlist, nprobe=nprobe)
+
+
+# -----------------------------
+# 프로세스 전역 인덱스 (DENSE_BACKEND=local 일 때 사용)
+# -----------------------------
+_LOCAL_INDEX: Optional[LocalVectorIndex] = None
+_LOCAL_INDEX_LOCK = threading.Lock()
+
+
+def dense_backend() -> str:
+    """
+    DENSE_BACKEND 환경변수: es (기본값) | local
+    """
+    return os.getenv("DENSE_BACKEND", "es").strip().lower()
+
+
+def local_vector_index_loaded() -> bool:
+    """
+    로컬 벡터 인덱스가 이미 메모리에 있는지 (없으면 첫 조회에서 파일 로드 또는 ES scan)
+    """
+    return _LOCAL_INDEX is not None
+
+
+def warm_local_vector_index() -> None:
+    """
+    앱 시작 시 호출: DENSE_BACKEND=local이면 로컬 벡터 인덱스를 미리 만든다.
+    (실패해도 첫 검색 때 다시 시도하므로 경고만 남긴다)
+    """
+    if dense_backend() != "local":
+        return
+    try:
+        get_local_vector_index()
+    except Exception as e:
+        logger.warning(f"[LocalVectorIndex] 로컬 벡터 인덱스를 미리 만들지 못했습니다: {e}")
+
+
+def get_local_vector_index(refresh: bool = False) -> LocalVectorIndex:
+    """
+    로컬 벡터 인덱스를 한 번만 만들어서 재사용한다.
+
+    - LOCAL_VECTOR_INDEX_PATH 파일이 있으면 그 파일에서 로드
+    - 없으면 ES_INDEX를 scan해서 만들고, 경로가 지정돼 있으면 파일로 저장
+    - LOCAL_VECTOR_NLIST > 0 이면 IVF 인덱스 사용 (LOCAL_VECTOR_NPROBE개 클러스터 탐색)
+    """
+    global _LOCAL_INDEX
+    if _LOCAL_INDEX is not None and not refresh:
+        return _LOCAL_INDEX
+
+    with _LOCAL_INDEX_LOCK:
+        if _LOCAL_INDEX is not None and not refresh:
+            return _LOCAL_INDEX
+
+        # 상대 경로는 저장소 루트 기준 ("" 이면 파일로 저장하지 않고 매번 ES에서 만든다)
+        path = os.getenv("LOCAL_VECTOR_INDEX_PATH", "data/cache/vectors.npz")
+        if path and not Path(path).is_absolute():
+            path = str(Path(__file__).resolve().parent.parent / path)
+        nlist = int(os.getenv("LOCAL_VECTOR_NLIST", "0"))
+        nprobe = int(os.getenv("LOCAL_VECTOR_NPROBE", "8"))
+
+        if path and Path(path).exists() and not refresh:
+            index = LocalVectorIndex.load(path, nprobe=nprobe)
+            if nlist > 0 and index.centroids is None:
+                index.build_ivf(nlist)
+            logger.info(f"[LocalVectorIndex] 파일에서 로드: {path} (문서 {len(index)}개, 차원 {index.dim})")
+        else:
+            from .es_search import get_es_client
+
+            index = LocalVectorIndex.from_elasticsearch(
+                get_es_client(),
+                os.getenv("ES_INDEX", "restaurant_docs"),
+                nlist=nlist,
+                nprobe=nprobe,
+            )
+            if path:
+                index.save(path)
+
+        _LOCAL_INDEX = index
+        return index